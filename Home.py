@@ -1,10 +1,10 @@
 import streamlit as st
+from page_cache import apply_css
 
 st.set_page_config(page_title="CPU Scheduler", layout="wide")
 
 # Load custom CSS
-with open("style.css") as f:
-    st.markdown(f"<style>{f.read()}</style>", unsafe_allow_html=True)
+apply_css()
 
 # ---------------------- HEADER --------------------------
 st.title("⚙️ CPU Scheduler Simulation Suite")
@@ -0,0 +1,208 @@
+# batch.py
+import numpy as np
+import pandas as pd
+
+from energy_module import DEFAULT_MODEL
+from process_table import round2
+
+POLICIES = {"RR": False, "EARR": True}
+
+
+def _policy_name(policy):
+    if isinstance(policy, bool):
+        return "EARR" if policy else "RR"
+    name = str(policy).upper()
+    if name not in POLICIES:
+        raise ValueError(f"Unknown policy {policy!r}; expected one of {sorted(POLICIES)}")
+    return name
+
+
+def _pad_workloads(workloads):
+    """Stack workloads into (W, N) arrival/burst arrays sorted by arrival."""
+    sizes = np.array([len(w) for w in workloads], dtype=np.int64)
+    width = max(1, int(sizes.max(initial=0)))
+    arrival = np.full((len(workloads), width), np.inf)
+    burst = np.zeros((len(workloads), width))
+
+    for w, procs in enumerate(workloads):
+        a = np.array([p["arrival"] for p in procs], dtype=float)
+        b = np.array([p["burst"] for p in procs], dtype=float)
+        order = np.argsort(a, kind="stable")
+        arrival[w, :len(procs)] = a[order]
+        burst[w, :len(procs)] = b[order]
+
+    return arrival, burst, sizes
+
+
+def _add_ticks(t, k):
+    # scheduler._add_ticks over arrays: t + 1 + 1 + ... (k times),
+    # exact up to each power of two, rounded on the crossing tick
+    t, k = t.copy(), k.copy()
+    while True:
+        live = k > 0
+        if not live.any():
+            return t
+        tl, kl = t[live], k[live]
+        edge = np.where(tl > 0, np.ldexp(1.0, np.frexp(tl)[1]), 1.0)
+        exact = np.minimum(kl - 1, np.maximum(0, np.ceil(edge - tl) - 1))
+        t[live] = (tl + exact) + 1
+        k[live] = kl - exact - 1
+
+
+def _idle_until(start, due):
+    """scheduler.idle_until() over arrays."""
+    k = np.maximum(1, np.ceil(due - start))
+    t = _add_ticks(start, k)
+    while True:
+        back = (k > 1) & (_add_ticks(start, k - 1) >= due)
+        if not back.any():
+            break
+        k -= back
+        t = _add_ticks(start, k)
+    while True:
+        short = t < due
+        if not short.any():
+            return t
+        k += short
+        t = _add_ticks(start, k)
+
+
+def simulate_batch(workloads, quanta=(2,), policies=("RR", "EARR"), model=None):
+    """Simulate every (workload, quantum, policy) combination at once.
+
+       All configurations advance in lockstep: each step dispatches one
+       slice (or one idle jump) for every unfinished configuration using
+       NumPy arrays for the ready queues, remaining cycles, clocks and
+       energy. Results match RoundRobinScheduler.simulate() per config.
+
+       Returns a DataFrame with one row per configuration."""
+    model = DEFAULT_MODEL if model is None else model
+    policies = [_policy_name(p) for p in policies]
+    quanta = list(quanta)
+    arrival, burst, sizes = _pad_workloads(workloads)
+    W, N = arrival.shape
+
+    # Configuration grid: workload-major, then quantum, then policy
+    wid, qid, pid = np.meshgrid(np.arange(W), np.arange(len(quanta)),
+                                np.arange(len(policies)), indexing="ij")
+    wid, qid, pid = wid.ravel(), qid.ravel(), pid.ravel()
+    B = wid.size
+
+    quantum = np.asarray(quanta, dtype=float)[qid]
+    aware = np.array([POLICIES[p] for p in policies])[pid]
+    n = sizes[wid]
+    arr = arrival[wid]
+
+    # Frequency (and its power) chosen by pick_freq for every queue length
+    freq_lut = np.array([model.freq_levels[model.pick_level(q)] for q in range(N + 1)])
+    power_lut = model.power(freq_lut)
+    f_high = model.freq_levels[model.highest]
+    p_high = model.power(f_high)
+
+    # Per-configuration state, indexed by row. Rows of finished
+    # configurations are frozen and dropped in bulk once enough of them
+    # accumulate, so every step works on dense arrays.
+    cfg = np.flatnonzero(n > 0)
+    arr_rows = np.concatenate([arr[cfg], np.full((cfg.size, 1), np.inf)], axis=1)
+    remaining = burst[wid[cfg]].copy()
+    completion = np.zeros((cfg.size, N))
+    q = quantum[cfg]
+    ea = aware[cfg]
+    time = np.zeros(cfg.size)
+    energy = np.zeros(cfg.size)
+    nxt = np.zeros(cfg.size, dtype=np.int64)
+    next_arr = arr_rows[:, 0].copy()
+    live = np.ones(cfg.size, dtype=bool)
+
+    # Ready queues as ring buffers of process indices
+    cap = 1 << max(0, N - 1).bit_length()
+    mask = cap - 1
+    queue = np.zeros((cfg.size, cap), dtype=np.int64)
+    head = np.zeros(cfg.size, dtype=np.int64)
+    size = np.zeros(cfg.size, dtype=np.int64)
+
+    out_energy = np.zeros(B)
+    out_completion = np.zeros((B, N))
+
+    def flush(keep):
+        gone = ~keep
+        out_energy[cfg[gone]] = energy[gone]
+        out_completion[cfg[gone]] = completion[gone]
+
+    while cfg.size:
+        rows = np.arange(cfg.size)
+
+        # Add new arrivals
+        can = next_arr <= time
+        while can.any():
+            r = np.flatnonzero(can)
+            queue[r, (head[r] + size[r]) & mask] = nxt[r]
+            size[r] += 1
+            nxt[r] += 1
+            next_arr[r] = arr_rows[r, nxt[r]]
+            can[r] = next_arr[r] <= time[r]
+
+        # Nothing left to do
+        empty = size == 0
+        live &= ~(empty & np.isinf(next_arr))
+        if not live.any():
+            break
+        if live.sum() < 0.75 * cfg.size:
+            flush(live)
+            cfg, arr_rows, remaining, completion = cfg[live], arr_rows[live], remaining[live], completion[live]
+            q, ea, time, energy, nxt, next_arr = q[live], ea[live], time[live], energy[live], nxt[live], next_arr[live]
+            queue, head, size, empty = queue[live], head[live], size[live], empty[live]
+            live = live[live]
+            rows = np.arange(cfg.size)
+
+        # CPU idle: jump to the next arrival in whole ticks
+        stall = empty | ~live
+        idle = empty & live
+        if idle.any():
+            time[idle] = _idle_until(time[idle], next_arr[idle])
+
+        busy = ~stall
+        current = queue[rows, head]
+        head += busy
+        head &= mask
+        size -= busy
+
+        # Frequency selection
+        freq = np.where(ea, freq_lut[size], f_high)
+        P = np.where(ea, power_lut[size], p_high)
+
+        flat = rows * N + current
+        rem = remaining.ravel()
+        cycles_done = np.where(busy, np.minimum(rem[flat], q * freq), 0.0)
+        exec_time = cycles_done / freq
+
+        time += exec_time
+        rem_now = rem[flat] - cycles_done
+        rem[flat] = rem_now
+        energy += P * exec_time
+
+        left = rem_now > 0
+        done = busy & ~left
+        completion.ravel()[flat[done]] = time[done]
+        back = np.flatnonzero(busy & left)
+        queue[back, (head[back] + size[back]) & mask] = current[back]
+        size[back] += 1
+
+    flush(np.zeros(cfg.size, dtype=bool))
+    energy, completion = out_energy, out_completion
+
+    # Waiting & turnaround, rounded like simulate()
+    valid = np.arange(N) < n[:, None]
+    raw = np.where(valid, completion - arr, 0.0)
+    turnaround = round2(raw)
+    waiting = np.maximum(0.0, round2(raw - burst[wid])) + 0.0
+    count = np.maximum(n, 1)
+
+    return pd.DataFrame({
+        "workload": wid,
+        "quantum": np.asarray(quanta)[qid],
+        "policy": np.asarray(policies)[pid],
+        "energy": energy,
+        "avg_waiting": np.where(valid, waiting, 0).sum(axis=1) / count,
+        "avg_turnaround": turnaround.sum(axis=1) / count,
+    })
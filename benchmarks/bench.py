@@ -0,0 +1,299 @@
+# benchmarks/bench.py
+"""Benchmarks for the scheduler core, power model and renderers, with
+   stored baselines and a regression check.
+
+       python -m benchmarks.bench                   # quick tier vs baseline
+       python -m benchmarks.bench --tier full       # up to 10M processes
+       python -m benchmarks.bench -k poisson --save # refresh some baselines
+
+   Every case runs in a fresh worker process. Its peak memory is the
+   tracemalloc peak of one extra, untimed run (workload included), so
+   interpreter and import overhead do not count and tracing does not
+   slow the timed runs. Timings are the best of --repeat runs; small
+   cases are looped for a stable reading.
+
+   The exit status is 1 when any metric regresses past --threshold.
+   Baselines record the machine they were saved on; on another machine
+   only peak memory is checked and timings are reported alone. Keep a
+   local baseline with --baseline PATH --save for timing checks."""
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+import timeit
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+
+TIERS = {
+    "quick": (10, 1_000, 100_000),
+    "full": (10, 1_000, 100_000, 1_000_000, 10_000_000),
+}
+PATTERNS = ("poisson", "bursty", "sparse")
+POLICIES = {"RR": False, "EARR": True}
+RENDER_SIZES = {"quick": (10_000,), "full": (10_000, 1_000_000)}
+
+# Metric -> True if higher is better
+DIRECTIONS = {"events_per_s": True, "seconds": False, "peak_mb": False, "ns_per_call": False}
+
+
+# ---------------------------------------------------------------------------
+# SYNTHETIC WORKLOADS
+# ---------------------------------------------------------------------------
+def make_workload(pattern, n, seed=0, load=0.7):
+    """A ProcessTable of `n` jobs with 1-9 cycle bursts.
+
+       poisson -- Poisson arrivals at `load` of the top speed
+       bursty  -- MMPP arrivals (quiet / 10x busy periods), same load
+       sparse  -- Poisson at 5% load, so most events are idle jumps"""
+    from workload import generate_table
+
+    options = {"burst": "uniform", "burst_range": (1, 9), "seed": seed, "load": load}
+    if pattern == "poisson":
+        return generate_table(n, "poisson", **options)
+    if pattern == "bursty":
+        return generate_table(n, "mmpp", **options)
+    if pattern == "sparse":
+        return generate_table(n, "poisson", **{**options, "load": 0.05})
+    raise ValueError(f"Unknown pattern {pattern!r}; expected one of {PATTERNS}")
+
+
+# ---------------------------------------------------------------------------
+# CASES (each runs in its own worker process)
+# ---------------------------------------------------------------------------
+def _peak_mb(func):
+    """Peak traced allocation (MB) while func() runs."""
+    tracemalloc.start()
+    try:
+        func()
+        return tracemalloc.get_traced_memory()[1] / 2 ** 20
+    finally:
+        tracemalloc.stop()
+
+
+def bench_simulate(pattern, n, policy, repeat, min_time=0.2):
+    from scheduler import RoundRobinScheduler
+
+    def once(seed):
+        table = make_workload(pattern, n, seed=seed)
+        sched = RoundRobinScheduler(table, energy_aware=POLICIES[policy], record_trace=False)
+        return sched, sched.advance()
+
+    # Peak memory covers building the workload table and simulating it,
+    # measured after a warm-up run has done the lazy imports
+    once(0)
+    peak = _peak_mb(lambda: once(0))
+    best = None
+    for i in range(repeat):
+        # Small workloads are run again until min_time has elapsed
+        seconds = events = runs = 0
+        while runs == 0 or seconds < min_time:
+            table = make_workload(pattern, n, seed=i)
+            sched = RoundRobinScheduler(table, energy_aware=POLICIES[policy], record_trace=False)
+            t0 = time.perf_counter()
+            events += sched.advance()
+            seconds += time.perf_counter() - t0
+            runs += 1
+            del sched, table
+        if best is None or events / seconds > best[0]:
+            best = (events / seconds, seconds / runs, events // runs)
+    rate, seconds, events = best
+    return {"seconds": seconds, "events": events, "events_per_s": rate, "peak_mb": peak}
+
+
+def bench_render(kind, n, backend, repeat):
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    from scheduler import RoundRobinScheduler
+    from visualization import Visualizer
+
+    if backend == "plotly":
+        # Server-side cost of a client-rendered chart: building the
+        # figure and serializing it for the browser
+        from interactive import InteractiveVisualizer as Visualizer
+
+    # Roughly n slices: about two slices per job at quantum 2
+    rr = RoundRobinScheduler(make_workload("poisson", max(1, n // 2)))
+    rr.simulate()
+    earr = RoundRobinScheduler(make_workload("poisson", max(1, n // 2)), energy_aware=True)
+    earr.simulate()
+
+    def render():
+        if kind == "gantt":
+            fig = Visualizer.plot_gantt_chart(earr.gantt, "EARR")
+        else:
+            fig = Visualizer.plot_power_trace(rr.power_trace, earr.power_trace)
+        if backend == "plotly":
+            fig.to_json()
+        else:
+            fig.canvas.draw()
+            plt.close(fig)
+
+    render()
+    peak = _peak_mb(render)
+    best = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        render()
+        seconds = time.perf_counter() - t0
+        best = seconds if best is None else min(best, seconds)
+    return {"seconds": best, "slices": len(earr.trace), "peak_mb": peak}
+
+
+def bench_micro(name, repeat):
+    import energy_module
+
+    if name == "power":
+        stmt, number = "power(1.5)", 1_000_000
+    else:
+        stmt, number = "pick_freq(4)", 1_000_000
+    t = min(timeit.repeat(stmt, globals=vars(energy_module), number=number, repeat=repeat))
+    return {"ns_per_call": t / number * 1e9}
+
+
+def cases(tier):
+    for name in ("power", "pick_freq"):
+        yield f"micro/{name}", bench_micro, (name,)
+    for pattern in PATTERNS:
+        for n in TIERS[tier]:
+            for policy in POLICIES:
+                yield f"simulate/{pattern}/{n}/{policy}", bench_simulate, (pattern, n, policy)
+    for kind in ("gantt", "power"):
+        for n in RENDER_SIZES[tier]:
+            yield f"render/{kind}/{n}", bench_render, (kind, n, "matplotlib")
+    import interactive
+
+    if interactive.available():
+        for kind in ("gantt", "power"):
+            for n in RENDER_SIZES[tier]:
+                yield f"render/plotly/{kind}/{n}", bench_render, (kind, n, "plotly")
+
+
+# ---------------------------------------------------------------------------
+# BASELINES
+# ---------------------------------------------------------------------------
+def machine_info():
+    """What timings depend on: CPU, core count and the Python / NumPy build."""
+    import numpy as np
+
+    cpu = platform.processor()
+    try:
+        with open("/proc/cpuinfo") as f:
+            cpu = next(line.split(":", 1)[1].strip() for line in f
+                       if line.startswith("model name"))
+    except (OSError, StopIteration):
+        pass
+    return {"arch": platform.machine(), "cpu": cpu or "unknown", "cpus": os.cpu_count(),
+            "python": platform.python_version(), "numpy": np.__version__}
+
+
+def compare(name, result, baseline, threshold, timings=True):
+    """Regressed metrics of one case, as (metric, baseline, now) tuples.
+       With timings=False only memory is compared."""
+    base = baseline.get(name)
+    if base is None:
+        return []
+    regressions = []
+    for metric, higher_better in DIRECTIONS.items():
+        if metric not in result or metric not in base:
+            continue
+        if not timings and metric != "peak_mb":
+            continue
+        # Throughput already covers the wall time of simulate cases
+        if metric == "seconds" and "events_per_s" in result:
+            continue
+        old, new = base[metric], result[metric]
+        # Ignore memory noise below a couple of MB
+        if metric == "peak_mb" and new < 2:
+            continue
+        if higher_better and new < old * (1 - threshold):
+            regressions.append((metric, old, new))
+        elif not higher_better and new > old * (1 + threshold):
+            regressions.append((metric, old, new))
+    return regressions
+
+
+def load_baseline(path):
+    """(machine info, results) of a saved baseline; ({}, {}) when there is none."""
+    if not os.path.exists(path):
+        return {}, {}
+    with open(path) as f:
+        data = json.load(f)
+    machine = data.get("machine")
+    # Older files only stored the architecture
+    if not isinstance(machine, dict):
+        machine = {"arch": machine, "python": data.get("python")}
+    return machine, data["results"]
+
+
+def save_baseline(path, results):
+    machine, merged = load_baseline(path)
+    # Results from another machine are not comparable: start over
+    if machine != machine_info():
+        merged = {}
+    merged.update(results)
+    with open(path, "w") as f:
+        json.dump({"machine": machine_info(), "results": dict(sorted(merged.items()))},
+                  f, indent=2)
+        f.write("\n")
+
+
+def _fmt(result):
+    parts = []
+    for key in ("events_per_s", "seconds", "ns_per_call", "peak_mb"):
+        if key in result:
+            parts.append(f"{key}={result[key]:,.3f}" if key != "events_per_s"
+                         else f"{key}={result[key]:,.0f}")
+    return " ".join(parts)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.bench",
+                                     description=__doc__.splitlines()[0])
+    parser.add_argument("--tier", choices=sorted(TIERS), default="quick")
+    parser.add_argument("-k", dest="filter", help="only cases whose name contains this")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--baseline", default=BASELINE)
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="allowed relative slowdown / growth (default 0.25)")
+    parser.add_argument("--save", action="store_true", help="store results as the new baseline")
+    parser.add_argument("--json", help="also write results to this file")
+    args = parser.parse_args(argv)
+
+    machine, baseline = load_baseline(args.baseline)
+    same_machine = machine == machine_info()
+    if baseline and not same_machine:
+        print(f"baseline was saved on {machine}, not {machine_info()}:\n"
+              "checking peak memory only (re-save with --save for timing checks)\n")
+    results = {}
+    failed = []
+    for name, func, params in cases(args.tier):
+        if args.filter and args.filter not in name:
+            continue
+        # A pool per case, so every case gets a fresh worker process
+        with ProcessPoolExecutor(max_workers=1) as pool:
+            result = pool.submit(func, *params, args.repeat).result()
+        results[name] = result
+        regressions = compare(name, result, baseline, args.threshold, timings=same_machine)
+        status = "REGRESSED" if regressions else ("ok" if name in baseline else "new")
+        print(f"{name:34} {_fmt(result):60} {status}", flush=True)
+        for metric, old, new in regressions:
+            print(f"    {metric}: baseline {old:,.3f} -> {new:,.3f}")
+            failed.append(name)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+    if args.save:
+        save_baseline(args.baseline, results)
+        print(f"baseline saved to {args.baseline}")
+        return 0
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,233 @@
+# disciplines.py
+import heapq
+import itertools
+import math
+from collections import deque
+
+
+class Discipline:
+    """Base class for ready-queue policies run by scheduler.Scheduler.
+
+       reset() is called with the process table and the scheduler's
+       quantum before a run. The engine then calls push() for each
+       arrival, pop() for the next job to run, time_slice() for how long
+       it may run, and requeue() if it is not finished after running
+       `ran` time units. With `preemptive` set, a slice also ends at the
+       next arrival so the new job can be considered.
+
+       A discipline that also needs to see slices that finish a job
+       defines complete(row, ran); the engine skips the call otherwise."""
+
+    name = "discipline"
+    preemptive = False
+    complete = None
+
+    def reset(self, table, quantum):
+        self.table = table
+        self.quantum = quantum
+
+    def push(self, row):
+        raise NotImplementedError
+
+    def pop(self):
+        raise NotImplementedError
+
+    def time_slice(self, row):
+        return self.quantum
+
+    def requeue(self, row, ran):
+        self.push(row)
+
+    def __repr__(self):
+        return f"{type(self).__name__}()"
+
+
+# ---------------------------------------------------------------------------
+# BUILT-IN DISCIPLINES
+# ---------------------------------------------------------------------------
+class RoundRobinDiscipline(Discipline):
+    """FIFO ready queue, one quantum per turn."""
+
+    name = "rr"
+
+    def reset(self, table, quantum):
+        super().reset(table, quantum)
+        queue = deque()
+        # Bound deque methods: RR is the hot path
+        self.push = queue.append
+        self.pop = queue.popleft
+
+    def requeue(self, row, ran):
+        self.push(row)
+
+
+class SRTFDiscipline(Discipline):
+    """Shortest remaining time first: a heap keyed by remaining cycles.
+       Preemptive, so a shorter arrival takes over at once."""
+
+    name = "srtf"
+    preemptive = True
+
+    def reset(self, table, quantum):
+        super().reset(table, quantum)
+        self._heap = []
+        self._seq = itertools.count()
+        self._remaining = table._cols["remaining"]
+
+    def push(self, row):
+        heapq.heappush(self._heap, (self._remaining[row], next(self._seq), row))
+
+    def pop(self):
+        return heapq.heappop(self._heap)[2]
+
+    def time_slice(self, row):
+        return math.inf
+
+
+class MLFQDiscipline(Discipline):
+    """Multilevel feedback queue with `levels` FIFO queues.
+
+       New jobs enter the top queue; level i runs quantum * 2**i per
+       turn, and a job still unfinished after its whole slice drops
+       one level. Every `boost_period` of CPU time all jobs return to
+       the top queue so long jobs cannot starve.
+
+       The top queue is a chain of deques, so a boost moves each lower
+       queue into it whole, in O(levels) however many jobs are queued."""
+
+    name = "mlfq"
+
+    def __init__(self, levels=3, boost_period=100.0):
+        self.levels = levels
+        self.boost_period = boost_period
+
+    def reset(self, table, quantum):
+        super().reset(table, quantum)
+        self._top = deque([deque()])
+        self._queues = [None] + [deque() for _ in range(self.levels - 1)]
+        self._slices = [quantum * 2 ** i for i in range(self.levels)]
+        self._level = 0
+        self._until_boost = self.boost_period
+
+    def push(self, row):
+        self._top[-1].append(row)
+
+    def pop(self):
+        top = self._top
+        while len(top) > 1 and not top[0]:
+            top.popleft()
+        if top[0]:
+            self._level = 0
+            return top[0].popleft()
+        for level in range(1, self.levels):
+            queue = self._queues[level]
+            if queue:
+                self._level = level
+                return queue.popleft()
+        raise IndexError("pop from an empty MLFQ")
+
+    def time_slice(self, row):
+        return self._slices[self._level]
+
+    def requeue(self, row, ran):
+        # Only a job that used its whole slice drops a level; one cut
+        # short (a power cap's max_slice) keeps its level. The slice is
+        # rebuilt from cycles / freq, so allow for rounding.
+        level = self._level
+        if ran >= self._slices[level] * (1 - 1e-9):
+            level = min(level + 1, self.levels - 1)
+        if level == 0:
+            self._top[-1].append(row)
+        else:
+            self._queues[level].append(row)
+        self._charge(ran)
+
+    def complete(self, row, ran):
+        self._charge(ran)
+
+    def _charge(self, ran):
+        # Boost on CPU time, whether or not the slice finished its job
+        self._until_boost -= ran
+        if self._until_boost <= 0:
+            for level in range(1, self.levels):
+                if self._queues[level]:
+                    self._top.append(self._queues[level])
+                    self._queues[level] = deque()
+            self._until_boost = self.boost_period
+
+
+class CFSDiscipline(Discipline):
+    """Completely-fair-scheduler style: the job with the least virtual
+       runtime runs next (a heap keyed by vruntime).
+
+       Each turn lasts latency / jobs-in-system, but at least
+       `min_granularity`. New jobs start at the queue's minimum
+       vruntime, so they neither starve others nor get starved."""
+
+    name = "cfs"
+
+    def __init__(self, latency=8.0, min_granularity=1.0):
+        self.latency = latency
+        self.min_granularity = min_granularity
+
+    def reset(self, table, quantum):
+        super().reset(table, quantum)
+        self._heap = []
+        self._seq = itertools.count()
+        self._min_vruntime = 0.0
+        self._vruntime = 0.0
+
+    def push(self, row):
+        heapq.heappush(self._heap, (self._min_vruntime, next(self._seq), row))
+
+    def pop(self):
+        self._vruntime, _, row = heapq.heappop(self._heap)
+        self._min_vruntime = max(self._min_vruntime, self._vruntime)
+        return row
+
+    def time_slice(self, row):
+        return max(self.min_granularity, self.latency / (len(self._heap) + 1))
+
+    def requeue(self, row, ran):
+        vruntime = self._vruntime + ran
+        heap = self._heap
+        heapq.heappush(heap, (vruntime, next(self._seq), row))
+        self._min_vruntime = max(self._min_vruntime, heap[0][0])
+
+
+DISCIPLINES = {d.name: d for d in (RoundRobinDiscipline, SRTFDiscipline,
+                                   MLFQDiscipline, CFSDiscipline)}
+
+
+def get_discipline(discipline):
+    """A Discipline instance from an instance, class or registered name."""
+    if isinstance(discipline, Discipline):
+        return discipline
+    if isinstance(discipline, type) and issubclass(discipline, Discipline):
+        return discipline()
+    try:
+        return DISCIPLINES[discipline]()
+    except KeyError:
+        raise ValueError(f"Unknown discipline {discipline!r}; expected one of {sorted(DISCIPLINES)}") from None
+
+
+def compare_disciplines(processes, disciplines=tuple(DISCIPLINES), quantum=2,
+                        energy_aware=True, model=None, governor=None):
+    """Run one workload under each discipline with the same DVFS
+       governor; returns a DataFrame of energy and timing metrics."""
+    import pandas as pd
+    from scheduler import Scheduler
+
+    rows = []
+    for d in disciplines:
+        d = get_discipline(d)
+        sched = Scheduler(processes, discipline=d, quantum=quantum, energy_aware=energy_aware,
+                          model=model, governor=governor, record_trace=False)
+        sched.simulate()
+        n = max(1, sched.n_completed)
+        rows.append({"discipline": d.name, "energy": sched.energy,
+                     "avg_waiting": sched.total_waiting / n,
+                     "avg_turnaround": sched.total_turnaround / n,
+                     "makespan": sched.time,
+                     "edp": sched.energy * sched.total_turnaround / n})
+    return pd.DataFrame(rows)
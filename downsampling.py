@@ -0,0 +1,54 @@
+# downsampling.py
+import numpy as np
+
+
+def compress_steps(time, value):
+    """Drop samples that repeat the next sample's value.
+
+       Power traces are steps: each (time, value) sample holds `value`
+       since the previous sample, so only the last sample of a run of
+       equal values is needed, plus the very first sample to anchor the
+       line. Lossless. Returns the kept indices."""
+    value = np.asarray(value)
+    if len(value) < 2:
+        return np.arange(len(value))
+    keep = np.ones(len(value), dtype=bool)
+    keep[1:-1] = value[1:-1] != value[2:]
+    return np.flatnonzero(keep)
+
+
+def _first_in_bucket(mask, bucket):
+    idx = np.flatnonzero(mask)
+    _, first = np.unique(bucket[idx], return_index=True)
+    return idx[first]
+
+
+def minmax_downsample(time, value, max_points=4000):
+    """Indices of at most `max_points` samples that keep the shape of
+       a step trace: equal-value runs are collapsed first, then time is
+       split into max_points / 4 buckets and each bucket keeps its
+       first, last, lowest and highest sample, so every spike and dip
+       (and every DVFS transition at plot resolution) stays visible."""
+    time = np.asarray(time, dtype=float)
+    value = np.asarray(value, dtype=float)
+    idx = compress_steps(time, value)
+    if len(idx) <= max_points:
+        return idx
+
+    t, v = time[idx], value[idx]
+    n_buckets = max(1, max_points // 4)
+    span = t[-1] - t[0]
+    bucket = np.minimum(((t - t[0]) / span * n_buckets).astype(np.int64), n_buckets - 1) \
+        if span > 0 else np.zeros(len(t), dtype=np.int64)
+
+    # Time is sorted, so buckets are contiguous runs
+    starts = np.flatnonzero(np.r_[True, bucket[1:] != bucket[:-1]])
+    ends = np.r_[starts[1:], len(t)] - 1
+    run = np.repeat(np.arange(len(starts)), np.diff(np.r_[starts, len(t)]))
+    lo = np.minimum.reduceat(v, starts)[run]
+    hi = np.maximum.reduceat(v, starts)[run]
+
+    keep = np.unique(np.concatenate([starts, ends,
+                                     _first_in_bucket(v == lo, run),
+                                     _first_in_bucket(v == hi, run)]))
+    return idx[keep]
@@ -0,0 +1,96 @@
+# energy_accounting.py
+from trace_recorder import IDLE
+
+
+class EnergyReport:
+    """Energy of one run, integrated over its whole power trace.
+
+       total        -- busy + idle + transition energy
+       busy / idle  -- energy of running and idle segments
+       transitions  -- number of frequency changes (idle counts as a level)
+       per_process  -- {pid: energy}, busy energy plus the transitions
+                       into that process's slices
+       residency    -- {level: time}, with "IDLE" for idle time
+       level_energy -- {level: energy}, likewise"""
+
+    def __init__(self, total, busy, idle, transitions, transition_energy,
+                 per_process, residency, level_energy):
+        self.total = total
+        self.busy = busy
+        self.idle = idle
+        self.transitions = transitions
+        self.transition_energy = transition_energy
+        self.per_process = per_process
+        self.residency = residency
+        self.level_energy = level_energy
+
+    def to_frame(self):
+        """Per-level residency and energy as a DataFrame."""
+        import pandas as pd
+
+        return pd.DataFrame({"time": self.residency, "energy": self.level_energy})
+
+    def __repr__(self):
+        return (f"EnergyReport(total={self.total:.4f}, busy={self.busy:.4f}, "
+                f"idle={self.idle:.4f}, transitions={self.transitions})")
+
+
+def total_energy(run):
+    """Everything a run drew, idle time and switches included.
+
+       A TraceFile answers from its header (the whole run, even for a
+       window view). A Scheduler accounts its trace, or falls back to
+       its busy-only `energy` when it kept none."""
+    # trace_io imports this module
+    from trace_io import TraceFile
+
+    if isinstance(run, TraceFile):
+        return run.total_energy
+    if run.trace is None:
+        return run.energy
+    return run.energy_report().total
+
+
+def account(trace, model):
+    """Integrate a TraceRecorder's segments into an EnergyReport.
+
+       Each segment contributes duration x power; every change of level
+       between consecutive segments costs model.switch_energy. One
+       vectorized pass, linear in the number of segments."""
+    import numpy as np
+
+    start, end = trace.column("start"), trace.column("end")
+    pid, level, power = trace.column("pid"), trace.column("level"), trace.column("power")
+    duration = end - start
+    energy = duration * power
+    busy = level != IDLE
+
+    switches = np.zeros(len(level), dtype=bool)
+    switches[1:] = level[1:] != level[:-1]
+    n_switches = int(switches.sum())
+    switch_energy = n_switches * model.switch_energy
+
+    # Per process: its slices, plus the switches into them
+    n_pids = len(trace.pids)
+    attributed = energy[busy] + switches[busy] * model.switch_energy
+    by_pid = np.bincount(pid[busy], weights=attributed, minlength=n_pids)
+
+    # Per level, with idle in its own bucket
+    n_levels = len(trace.levels)
+    slot = np.where(busy, level, n_levels)
+    time_by_level = np.bincount(slot, weights=duration, minlength=n_levels + 1)
+    energy_by_level = np.bincount(slot, weights=energy, minlength=n_levels + 1)
+    labels = list(trace.levels) + ["IDLE"]
+
+    busy_energy = float(energy[busy].sum())
+    idle_energy = float(energy[~busy].sum())
+    return EnergyReport(
+        total=busy_energy + idle_energy + switch_energy,
+        busy=busy_energy,
+        idle=idle_energy,
+        transitions=n_switches,
+        transition_energy=switch_energy,
+        per_process=dict(zip(trace.pids, by_pid.tolist())),
+        residency=dict(zip(labels, time_by_level.tolist())),
+        level_energy=dict(zip(labels, energy_by_level.tolist())),
+    )
@@ -17,3 +17,53 @@ def pick_freq(queue_len):
         return "MED"
     else:
         return "HIGH"
+
+
+class PowerModel:
+    """Power model for one CPU: a table of frequency levels
+       plus the k and P_IDLE constants of power(), and the energy
+       one frequency switch costs (used by energy_accounting).
+
+       switch_energy defaults to 0: power() is a unitless textbook
+       curve with no measured transition cost to scale one against,
+       and a made-up default would shift every reported total. Set it
+       from a real platform's DVFS latency x power to count switches."""
+
+    def __init__(self, freq_levels=None, k=k, p_idle=P_IDLE, switch_energy=0.0):
+        self.freq_levels = dict(FREQ_LEVELS if freq_levels is None else freq_levels)
+        self.k = k
+        self.p_idle = p_idle
+        self.switch_energy = switch_energy
+
+        # pick_freq speaks LOW/MED/HIGH; map those onto the slowest,
+        # middle and fastest entries of an arbitrary level table.
+        ordered = sorted(self.freq_levels, key=self.freq_levels.get)
+        self.lowest = ordered[0]
+        self.highest = ordered[-1]
+        self._pick_map = {"LOW": ordered[0],
+                          "MED": ordered[(len(ordered) - 1) // 2],
+                          "HIGH": ordered[-1]}
+
+    def power(self, freq):
+        return self.k * (freq ** 3) + self.p_idle
+
+    def pick_level(self, queue_len):
+        """pick_freq() applied to this model's level table."""
+        return self._pick_map[pick_freq(queue_len)]
+
+    def to_dict(self):
+        d = {"freq_levels": self.freq_levels, "k": self.k, "p_idle": self.p_idle}
+        # Only when set, so sweep keys made before it existed still match
+        if self.switch_energy:
+            d["switch_energy"] = self.switch_energy
+        return d
+
+    def __eq__(self, other):
+        return isinstance(other, PowerModel) and self.to_dict() == other.to_dict()
+
+    def __repr__(self):
+        return (f"PowerModel(freq_levels={self.freq_levels}, k={self.k}, "
+                f"p_idle={self.p_idle}, switch_energy={self.switch_energy})")
+
+
+DEFAULT_MODEL = PowerModel()
@@ -0,0 +1,250 @@
+# governors.py
+import math
+
+
+class GovernorState:
+    """What the scheduler knows when it picks a frequency for a slice.
+
+       Updated in place before every dispatch:
+           time        -- current simulated time
+           queue_len   -- jobs still waiting in the ready queue
+           remaining   -- cycles left on the job about to run
+           backlog     -- cycles left on all jobs in the system
+           busy_time   -- total time the CPU has spent running so far
+           slack       -- time to the job's deadline minus its runtime
+                          at top speed (inf when it has no deadline)
+           level       -- label chosen for the previous slice (or None)"""
+
+    __slots__ = ("time", "queue_len", "remaining", "backlog",
+                 "busy_time", "slack", "level")
+
+    def __init__(self):
+        self.time = 0
+        self.queue_len = 0
+        self.remaining = 0
+        self.backlog = 0
+        self.busy_time = 0
+        self.slack = math.inf
+        self.level = None
+
+
+class Governor:
+    """Base class for DVFS governors.
+
+       reset() is called with the scheduler's PowerModel before a run;
+       select() returns a label from its frequency table for each slice.
+
+       A governor enforcing a budget also defines throttle(state),
+       called before each dispatch: it returns a time to hold the CPU
+       idle until, or None to go ahead. Such a governor sets max_slice
+       in select() to cap how long the slice may run. A governor keeping
+       accounts may define finish(state), called once with the final
+       time and busy time when the run ends."""
+
+    name = "governor"
+    throttle = None
+    finish = None
+    max_slice = math.inf
+
+    def reset(self, model):
+        self.model = model
+        self.levels = sorted(model.freq_levels, key=model.freq_levels.get)
+        self.freqs = [model.freq_levels[label] for label in self.levels]
+        self.f_max = self.freqs[-1]
+
+    def select(self, state):
+        raise NotImplementedError
+
+    def ceil_level(self, freq):
+        """Slowest level running at least `freq` (the fastest if none does)."""
+        for label, f in zip(self.levels, self.freqs):
+            if f >= freq:
+                return label
+        return self.levels[-1]
+
+    def __repr__(self):
+        return f"{type(self).__name__}()"
+
+
+class _WindowedGovernor(Governor):
+    """Re-evaluates once per sampling period from the busy fraction of
+       the period just ended, holding its level in between."""
+
+    def __init__(self, sampling_period=10.0):
+        self.sampling_period = sampling_period
+
+    def reset(self, model):
+        super().reset(model)
+        self._t0 = 0
+        self._busy0 = 0
+        self._level = self.levels[-1]
+
+    def select(self, state):
+        elapsed = state.time - self._t0
+        if elapsed >= self.sampling_period:
+            load = (state.busy_time - self._busy0) / elapsed
+            self._level = self.update(load, state)
+            self._t0, self._busy0 = state.time, state.busy_time
+        return self._level
+
+    def update(self, load, state):
+        raise NotImplementedError
+
+
+# ---------------------------------------------------------------------------
+# BUILT-IN GOVERNORS
+# ---------------------------------------------------------------------------
+class PerformanceGovernor(Governor):
+    """Always the fastest level (plain Round Robin)."""
+
+    name = "performance"
+
+    def select(self, state):
+        return self.levels[-1]
+
+
+class QueueLengthGovernor(Governor):
+    """The original EARR heuristic: pick_freq() on the ready-queue length."""
+
+    name = "queue_length"
+
+    def select(self, state):
+        return self.model.pick_level(state.queue_len)
+
+
+class OndemandGovernor(_WindowedGovernor):
+    """Linux ondemand: jump to the top level when load exceeds
+       `up_threshold`, otherwise run at load * f_max."""
+
+    name = "ondemand"
+
+    def __init__(self, up_threshold=0.8, sampling_period=10.0):
+        super().__init__(sampling_period)
+        self.up_threshold = up_threshold
+
+    def update(self, load, state):
+        if load > self.up_threshold:
+            return self.levels[-1]
+        return self.ceil_level(load * self.f_max)
+
+
+class ConservativeGovernor(_WindowedGovernor):
+    """Linux conservative: step one level up above `up_threshold` load
+       and one level down below `down_threshold`."""
+
+    name = "conservative"
+
+    def __init__(self, up_threshold=0.8, down_threshold=0.2, sampling_period=10.0):
+        super().__init__(sampling_period)
+        self.up_threshold = up_threshold
+        self.down_threshold = down_threshold
+
+    def update(self, load, state):
+        i = self.levels.index(self._level)
+        if load > self.up_threshold:
+            i = min(i + 1, len(self.levels) - 1)
+        elif load < self.down_threshold:
+            i = max(i - 1, 0)
+        return self.levels[i]
+
+
+class SchedutilGovernor(Governor):
+    """Linux schedutil: frequency-invariant utilization tracked as a
+       decaying average (half-life `halflife`), next freq = 1.25 * util * f_max."""
+
+    name = "schedutil"
+
+    def __init__(self, halflife=32.0, headroom=1.25):
+        self.halflife = halflife
+        self.headroom = headroom
+
+    def reset(self, model):
+        super().reset(model)
+        self._util = 1.0
+        self._t0 = 0
+        self._busy0 = 0
+        self._level = self.levels[-1]
+
+    def select(self, state):
+        elapsed = state.time - self._t0
+        if elapsed > 0:
+            # Busy time in the last interval, scaled by the speed it ran at
+            f_prev = self.model.freq_levels[self._level]
+            sample = (state.busy_time - self._busy0) / elapsed * f_prev / self.f_max
+            decay = 0.5 ** (elapsed / self.halflife)
+            self._util = decay * self._util + (1 - decay) * min(1.0, sample)
+            self._t0, self._busy0 = state.time, state.busy_time
+        self._level = self.ceil_level(self.headroom * self._util * self.f_max)
+        return self._level
+
+
+class EWMAPredictiveGovernor(Governor):
+    """Predicts demand (cycles arriving per unit time) with an EWMA and
+       runs at the slowest level that keeps up with it while draining
+       the current backlog within `horizon`. Jobs with no slack left
+       run at the top level."""
+
+    name = "ewma_predictive"
+
+    def __init__(self, alpha=0.2, horizon=20.0):
+        self.alpha = alpha
+        self.horizon = horizon
+
+    def reset(self, model):
+        super().reset(model)
+        self._rate = None
+        self._t0 = 0
+        self._backlog0 = 0
+        self._busy0 = 0
+
+    def select(self, state):
+        if state.slack <= 0:
+            return self.levels[-1]
+
+        elapsed = state.time - self._t0
+        if elapsed > 0:
+            # Cycles that arrived = backlog growth + cycles executed
+            executed = (state.busy_time - self._busy0) * self.model.freq_levels[state.level or self.levels[-1]]
+            arrived = max(0.0, state.backlog - self._backlog0 + executed)
+            rate = arrived / elapsed
+            self._rate = rate if self._rate is None else self.alpha * rate + (1 - self.alpha) * self._rate
+            self._t0, self._backlog0, self._busy0 = state.time, state.backlog, state.busy_time
+
+        demand = (self._rate or 0.0) + state.backlog / self.horizon
+        return self.ceil_level(demand)
+
+
+GOVERNORS = {g.name: g for g in (PerformanceGovernor, QueueLengthGovernor,
+                                 OndemandGovernor, ConservativeGovernor,
+                                 SchedutilGovernor, EWMAPredictiveGovernor)}
+
+
+def get_governor(governor):
+    """A Governor instance from an instance, class or registered name."""
+    if isinstance(governor, Governor):
+        return governor
+    if isinstance(governor, type) and issubclass(governor, Governor):
+        return governor()
+    try:
+        return GOVERNORS[governor]()
+    except KeyError:
+        raise ValueError(f"Unknown governor {governor!r}; expected one of {sorted(GOVERNORS)}") from None
+
+
+def compare_governors(processes, governors=tuple(GOVERNORS), quantum=2, model=None):
+    """Run one workload under each governor; returns a DataFrame of
+       energy, average turnaround and energy-delay product."""
+    import pandas as pd
+    from scheduler import RoundRobinScheduler
+
+    rows = []
+    for g in governors:
+        g = get_governor(g)
+        sched = RoundRobinScheduler(processes, quantum=quantum, model=model,
+                                    governor=g, record_trace=False)
+        sched.simulate()
+        avg_turn = sched.total_turnaround / max(1, sched.n_completed)
+        rows.append({"governor": g.name, "energy": sched.energy,
+                     "avg_turnaround": avg_turn, "makespan": sched.time,
+                     "edp": sched.energy * avg_turn})
+    return pd.DataFrame(rows)
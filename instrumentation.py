@@ -0,0 +1,219 @@
+# instrumentation.py
+from time import perf_counter
+
+COUNTERS = ("arrivals", "dispatches", "preemptions", "expiries",
+            "idle_jumps", "switches", "completions")
+PHASES = ("admission", "queue", "frequency", "energy", "trace", "engine")
+EVENTS = ("arrival", "slice", "preempt", "switch", "idle", "complete")
+
+
+class Instrumentation:
+    """Opt-in counters, phase timers and event hooks for one Scheduler
+       run. Pass it as Scheduler(..., instrument=Instrumentation()); a
+       scheduler without one runs the plain loop.
+
+       counters -- arrivals, dispatches, completions, idle_jumps;
+                   preemptions (slices cut short by an arriving job),
+                   expiries (slices that used their whole time slice
+                   and left work behind) and switches (frequency
+                   changes between consecutive segments, idle counting
+                   as a level, as in energy_accounting)
+       phases   -- wall seconds spent in arrival admission, ready-queue
+                   operations, governor selection, power() and trace
+                   appends; "engine" is the rest of advance()
+       events   -- (kind, start, end, pid, level, power) tuples for the
+                   Chrome trace, at most `max_events` of them
+
+       Hooks registered with on() get a dict per event:
+           arrival  -- time, pid
+           slice    -- start, end, pid, level, power, cycles
+           preempt  -- time, pid
+           switch   -- time, old, new
+           idle     -- start, end
+           complete -- time, pid"""
+
+    def __init__(self, timers=True, record_events=True, max_events=1_000_000):
+        self.timers = timers
+        self.max_events = max_events if record_events else 0
+        self.counters = dict.fromkeys(COUNTERS, 0)
+        self.phases = dict.fromkeys(PHASES, 0.0)
+        self.events = []
+        self.dropped = 0
+        # One (wall start, wall end, events, phase seconds) per advance() call
+        self.calls = []
+        self._hooks = {name: [] for name in EVENTS}
+        self._level = None
+        self._origin = None
+        self._call = None
+
+    # -----------------------------------------------------------------------
+    # HOOKS
+    # -----------------------------------------------------------------------
+    def on(self, event, callback):
+        """Call `callback(info)` on every `event`. Returns the callback."""
+        if event not in self._hooks:
+            raise ValueError(f"Unknown event {event!r}; expected one of {EVENTS}")
+        self._hooks[event].append(callback)
+        return callback
+
+    def off(self, event, callback):
+        self._hooks[event].remove(callback)
+
+    def _fire(self, event, **info):
+        for callback in self._hooks[event]:
+            callback(info)
+
+    def _record(self, kind, start, end, pid=None, level=None, power=None):
+        if len(self.events) < self.max_events:
+            self.events.append((kind, start, end, pid, level, power))
+        else:
+            self.dropped += 1
+
+    # -----------------------------------------------------------------------
+    # ENGINE SIDE (called by Scheduler.advance)
+    # -----------------------------------------------------------------------
+    def timed(self, phase, func):
+        """`func`, with its wall time added to `phase`."""
+        phases = self.phases
+
+        def wrapper(*args):
+            t0 = perf_counter()
+            result = func(*args)
+            phases[phase] += perf_counter() - t0
+            return result
+        return wrapper
+
+    def timed_iter(self, phase, iterator):
+        """`iterator`, with the time spent producing each item added to
+           `phase`. Nothing is read ahead."""
+        phases = self.phases
+        while True:
+            t0 = perf_counter()
+            item = next(iterator, None)
+            phases[phase] += perf_counter() - t0
+            if item is None:
+                return
+            yield item
+
+    def begin(self):
+        now = perf_counter()
+        if self._origin is None:
+            self._origin = now
+        self._call = (now, dict(self.phases))
+
+    def end(self, count):
+        start, before = self._call
+        now = perf_counter()
+        spent = {phase: self.phases[phase] - before[phase] for phase in PHASES}
+        spent["engine"] = (now - start) - sum(spent.values())
+        self.phases["engine"] += spent["engine"]
+        self.calls.append((start - self._origin, now - self._origin, count, spent))
+        self._call = None
+
+    def arrival(self, time, pid):
+        self.counters["arrivals"] += 1
+        self._record("arrival", time, time, pid)
+        if self._hooks["arrival"]:
+            self._fire("arrival", time=time, pid=pid)
+
+    def idle(self, start, end, power):
+        self.counters["idle_jumps"] += 1
+        self._switch(start, "IDLE")
+        self._record("idle", start, end, power=power)
+        if self._hooks["idle"]:
+            self._fire("idle", start=start, end=end)
+
+    def slice(self, start, end, pid, level, power, cycles, preempted, finished):
+        counters = self.counters
+        counters["dispatches"] += 1
+        self._switch(start, level)
+        self._record("slice", start, end, pid, level, power)
+        if self._hooks["slice"]:
+            self._fire("slice", start=start, end=end, pid=pid, level=level,
+                       power=power, cycles=cycles)
+        if finished:
+            counters["completions"] += 1
+            if self._hooks["complete"]:
+                self._fire("complete", time=end, pid=pid)
+        elif preempted:
+            counters["preemptions"] += 1
+            if self._hooks["preempt"]:
+                self._fire("preempt", time=end, pid=pid)
+        else:
+            counters["expiries"] += 1
+
+    def _switch(self, time, level):
+        old = self._level
+        self._level = level
+        if old is not None and old != level:
+            self.counters["switches"] += 1
+            if self._hooks["switch"]:
+                self._fire("switch", time=time, old=old, new=level)
+
+    # -----------------------------------------------------------------------
+    # REPORTING
+    # -----------------------------------------------------------------------
+    def summary(self):
+        """Counters and phase seconds as one flat dict."""
+        out = dict(self.counters)
+        out.update({f"{phase}_s": seconds for phase, seconds in self.phases.items()})
+        out["events_dropped"] = self.dropped
+        return out
+
+    def to_chrome_trace(self, path=None, time_scale=1000.0):
+        """The run as Chrome trace / Perfetto JSON (open it in
+           ui.perfetto.dev or chrome://tracing).
+
+           Process 1 is the simulated CPU: one track of slices and idle
+           segments, a power counter and arrival markers, with simulated
+           time multiplied by `time_scale` to give microseconds. Process
+           2 is the simulator itself, in wall-clock time: one span per
+           advance() call with its phase breakdown. Written to `path`
+           when given; the trace dict is returned either way."""
+        out = [
+            {"ph": "M", "pid": 1, "name": "process_name", "args": {"name": "Simulated CPU"}},
+            {"ph": "M", "pid": 1, "tid": 1, "name": "thread_name", "args": {"name": "CPU"}},
+            {"ph": "M", "pid": 1, "tid": 2, "name": "thread_name", "args": {"name": "arrivals"}},
+            {"ph": "M", "pid": 2, "name": "process_name", "args": {"name": "Simulator (wall clock)"}},
+        ]
+        last_power = None
+        for kind, start, end, pid, level, power in self.events:
+            ts = start * time_scale
+            if kind == "arrival":
+                out.append({"ph": "i", "s": "t", "pid": 1, "tid": 2, "ts": ts,
+                            "name": f"arrive {pid}"})
+                continue
+            if kind == "slice":
+                out.append({"ph": "X", "pid": 1, "tid": 1, "ts": ts,
+                            "dur": (end - start) * time_scale, "name": str(pid),
+                            "cat": "slice", "args": {"level": level, "power": power}})
+            else:
+                out.append({"ph": "X", "pid": 1, "tid": 1, "ts": ts,
+                            "dur": (end - start) * time_scale, "name": "idle", "cat": "idle"})
+            if power != last_power:
+                out.append({"ph": "C", "pid": 1, "ts": ts, "name": "power", "args": {"W": power}})
+                last_power = power
+
+        for start, end, count, spent in self.calls:
+            args = {f"{phase}_ms": seconds * 1e3 for phase, seconds in spent.items()}
+            args["events"] = count
+            out.append({"ph": "X", "pid": 2, "tid": 1, "ts": start * 1e6,
+                        "dur": (end - start) * 1e6, "name": "advance", "args": args})
+
+        trace = {"traceEvents": out, "displayTimeUnit": "ms", "otherData": self.summary()}
+        if path is not None:
+            import json
+
+            with open(path, "w") as f:
+                json.dump(trace, f)
+        return trace
+
+    def __getstate__(self):
+        # Callbacks are often lambdas; register them again after restore()
+        state = self.__dict__.copy()
+        state["_hooks"] = {name: [] for name in EVENTS}
+        return state
+
+    def __repr__(self):
+        counts = ", ".join(f"{k}={v}" for k, v in self.counters.items())
+        return f"Instrumentation({counts})"
@@ -0,0 +1,197 @@
+# interactive.py
+"""Plotly backend for the Visualizer charts.
+
+   InteractiveVisualizer has the same static methods as
+   visualization.Visualizer but returns Plotly figures. Nothing is
+   rasterized on the server: traces are WebGL (scattergl) and carry
+   compact NumPy columns, which Plotly 6 ships to the browser as
+   base64 typed arrays rather than JSON number lists. Pan, zoom and
+   hover then run entirely client-side, so far more points are sent
+   than the matplotlib charts draw.
+
+   Plotly is optional: available() says whether it is installed, and
+   building a figure without it raises ImportError."""
+import importlib.util
+
+import numpy as np
+
+from downsampling import minmax_downsample
+from energy_accounting import total_energy
+
+COLORS = {"IDLE": "gray", "LOW": "green", "MED": "orange", "HIGH": "red"}
+RR_COLOR, EARR_COLOR = "#1f77b4", "#ff7f0e"
+
+
+def available():
+    """True when plotly is installed."""
+    return importlib.util.find_spec("plotly") is not None
+
+
+def _go():
+    try:
+        import plotly.graph_objects as go
+    except ImportError:
+        raise ImportError("Interactive charts need plotly (pip install plotly)") from None
+    return go
+
+
+class InteractiveVisualizer:
+
+    @staticmethod
+    def _power_columns(power_trace, max_points):
+        # Same step-preserving downsampling as the matplotlib charts,
+        # with a much larger budget: the browser does the drawing
+        from visualization import Visualizer
+
+        df = Visualizer._power_frame(power_trace)
+        time = df["time"].to_numpy(dtype=np.float64)
+        power = df["power"].to_numpy(dtype=np.float64)
+        keep = minmax_downsample(time, power, max_points)
+        return time[keep], power[keep].astype(np.float32)
+
+    @staticmethod
+    def _power_traces(go, power_trace_rr, power_trace_earr, max_points, legend=True):
+        traces = []
+        for trace, name, color, dash in ((power_trace_rr, "Traditional RR", RR_COLOR, "dash"),
+                                         (power_trace_earr, "Energy-Aware RR", EARR_COLOR, "solid")):
+            time, power = InteractiveVisualizer._power_columns(trace, max_points)
+            # Each sample holds its power since the previous one
+            traces.append(go.Scattergl(x=time, y=power, name=name, mode="lines",
+                                       line=dict(shape="vh", color=color, dash=dash),
+                                       showlegend=legend))
+        return traces
+
+    # -----------------------------------------------------------------------
+    # POWER TRACE (RR vs EARR)
+    # -----------------------------------------------------------------------
+    @staticmethod
+    def plot_power_trace(power_trace_rr, power_trace_earr, max_points=200_000):
+        go = _go()
+        fig = go.Figure(InteractiveVisualizer._power_traces(
+            go, power_trace_rr, power_trace_earr, max_points))
+        fig.update_layout(title="Power Consumption Over Time", xaxis_title="Time (ms)",
+                          yaxis_title="Power (W)", hovermode="x", dragmode="zoom")
+        return fig
+
+    # -----------------------------------------------------------------------
+    # ENERGY BAR COMPARISON
+    # -----------------------------------------------------------------------
+    @staticmethod
+    def plot_energy_bar(energy_rr, energy_earr):
+        go = _go()
+        fig = go.Figure(go.Bar(x=["Traditional RR", "Energy-Aware RR"],
+                               y=[energy_rr, energy_earr], marker_color=["red", "green"]))
+        fig.update_layout(title="Total Energy Consumption Comparison",
+                          yaxis_title="Energy (Joules)")
+        return fig
+
+    # -----------------------------------------------------------------------
+    # GANTT CHART (with DVFS frequency colors)
+    # -----------------------------------------------------------------------
+    @staticmethod
+    def gantt_traces(gantt, pixels=4000, max_rows=2000, max_segments=200_000):
+        """One scattergl trace spec per frequency level, plus the row
+           labels. Every rectangle is a thick line segment from start to
+           end, segments separated by NaN, so a level is a single
+           float64 x column and a float32 y column however many slices
+           it has."""
+        from visualization import Visualizer
+
+        start, end, row, level, row_labels, level_labels = Visualizer.gantt_segments(
+            gantt, pixels=pixels, max_rows=max_rows, max_segments=max_segments)
+        traces = []
+        for i, label in enumerate(level_labels):
+            mine = level == i
+            n = int(mine.sum())
+            if not n:
+                continue
+            x = np.full(3 * n, np.nan)
+            x[0::3], x[1::3] = start[mine], end[mine]
+            y = np.full(3 * n, np.nan, dtype=np.float32)
+            y[0::3] = y[1::3] = row[mine]
+            traces.append({"name": str(label), "x": x, "y": y,
+                           "color": COLORS.get(str(label), "blue")})
+        return traces, row_labels
+
+    @staticmethod
+    def _gantt_figure_traces(go, gantt, legend=True):
+        traces, row_labels = InteractiveVisualizer.gantt_traces(gantt)
+        # Bars about as thick as a row, within what WebGL lines allow
+        width = max(1.0, min(12.0, 300.0 / max(1, len(row_labels))))
+        out = [go.Scattergl(x=t["x"], y=t["y"], name=t["name"], mode="lines",
+                            line=dict(color=t["color"], width=width), connectgaps=False,
+                            legendgroup=t["name"], showlegend=legend,
+                            hovertemplate="t=%{x:.2f}<extra>" + t["name"] + "</extra>")
+               for t in traces]
+        return out, row_labels
+
+    @staticmethod
+    def _row_axis(row_labels):
+        step = max(1, len(row_labels) // 20)
+        ticks = np.arange(0, len(row_labels), step)
+        return dict(tickvals=ticks, ticktext=[str(row_labels[i]) for i in ticks],
+                    range=[-0.5, len(row_labels) - 0.5], autorange="reversed")
+
+    @staticmethod
+    def plot_gantt_chart(gantt, title):
+        go = _go()
+        traces, row_labels = InteractiveVisualizer._gantt_figure_traces(go, gantt)
+        fig = go.Figure(traces)
+        fig.update_layout(title=f"Gantt Chart - {title}", xaxis_title="Time (ms)",
+                          yaxis_title="Process ID", dragmode="zoom")
+        if row_labels:
+            fig.update_yaxes(**InteractiveVisualizer._row_axis(row_labels))
+        return fig
+
+    # -----------------------------------------------------------------------
+    # 2x2 FULL DASHBOARD (Power, Energy, Performance, Summary Table)
+    # -----------------------------------------------------------------------
+    @staticmethod
+    def generate_dashboard(rr, earr, completed_rr, completed_earr, max_points=200_000):
+        go = _go()
+        from plotly.subplots import make_subplots
+
+        def avg_metrics(completed):
+            avg_wait = sum(p.waiting for p in completed) / len(completed)
+            avg_turn = sum(p.turnaround for p in completed) / len(completed)
+            return avg_wait, avg_turn
+
+        avg_wait_rr, avg_turn_rr = avg_metrics(completed_rr)
+        avg_wait_earr, avg_turn_earr = avg_metrics(completed_earr)
+        # Idle and switch energy included
+        energy_rr, energy_earr = total_energy(rr), total_energy(earr)
+
+        fig = make_subplots(
+            rows=2, cols=2,
+            specs=[[{"type": "xy"}, {"type": "xy"}], [{"type": "xy"}, {"type": "table"}]],
+            subplot_titles=("Power Consumption Over Time", "Total Energy Consumption",
+                            "Performance Comparison", "Summary Table"))
+
+        for trace in InteractiveVisualizer._power_traces(go, rr.power_trace, earr.power_trace,
+                                                         max_points):
+            fig.add_trace(trace, row=1, col=1)
+        fig.update_xaxes(title_text="Time (ms)", row=1, col=1)
+        fig.update_yaxes(title_text="Power (W)", row=1, col=1)
+
+        fig.add_trace(go.Bar(x=["Traditional RR", "EARR"], y=[energy_rr, energy_earr],
+                             marker_color=["red", "green"], showlegend=False), row=1, col=2)
+        fig.update_yaxes(title_text="Energy (J)", row=1, col=2)
+
+        labels = ["Avg Waiting", "Avg Turnaround"]
+        fig.add_trace(go.Bar(x=labels, y=[avg_wait_rr, avg_turn_rr], name="Traditional RR",
+                             marker_color=RR_COLOR, showlegend=False), row=2, col=1)
+        fig.add_trace(go.Bar(x=labels, y=[avg_wait_earr, avg_turn_earr], name="EARR",
+                             marker_color=EARR_COLOR, showlegend=False), row=2, col=1)
+        fig.update_yaxes(title_text="Time (ms)", row=2, col=1)
+
+        fig.add_trace(go.Table(
+            header=dict(values=["Metric", "Traditional RR", "Energy-Aware RR"]),
+            cells=dict(values=[
+                ["Avg Waiting Time", "Avg Turnaround Time", "Total Energy (J)"],
+                [round(avg_wait_rr, 2), round(avg_turn_rr, 2), round(energy_rr, 2)],
+                [round(avg_wait_earr, 2), round(avg_turn_earr, 2), round(energy_earr, 2)],
+            ])), row=2, col=2)
+
+        fig.update_layout(title="Energy-Aware Round Robin vs Traditional Round Robin",
+                          barmode="group", height=800)
+        return fig
@@ -0,0 +1,205 @@
+# main.py
+"""Headless entry point: run RR / EARR (or a sweep) on workload files
+   and print metrics as JSON or CSV.
+
+       python -m main run jobs.csv --policy RR EARR --quantum 2
+       python -m main run jobs.jsonl --csv --plot figures/
+       python -m main run jobs.csv --save-trace runs/
+       python -m main sweep a.csv b.csv --quanta 1 2 4 --out sweep.csv
+
+   Workloads are streamed, but `run` records each run's whole trace
+   by default, to report total energy (idle time and frequency
+   switches included): memory then grows with the number of slices,
+   about 34 bytes each. Memory stays flat, following only the jobs in
+   the system, with --no-total-energy (and no --plot or --save-trace).
+
+   Only the scheduler is imported up front; NumPy is loaded when the
+   first metrics are computed, and matplotlib only for --plot."""
+import argparse
+import csv
+import json
+import os
+import sys
+
+POLICIES = {"RR": False, "EARR": True}
+METRICS = ["workload", "policy", "quantum", "discipline", "governor", "n_completed",
+           "energy", "total_energy", "avg_waiting", "avg_turnaround", "makespan"]
+
+
+def _number(text):
+    # Integral values stay ints, so sweep keys match programmatic ones
+    value = float(text)
+    return int(value) if value.is_integer() else value
+
+
+# ---------------------------------------------------------------------------
+# RUN
+# ---------------------------------------------------------------------------
+def run_workload(path, policy, quantum=2, discipline="rr", governor=None,
+                 fmt=None, record_trace=False):
+    """Simulate one workload file under one policy; returns the scheduler.
+
+       The trace is streamed in arrival order and completed jobs are not
+       kept, so without `record_trace` memory follows the number of jobs
+       in the system."""
+    from scheduler import Scheduler
+    from workload import stream_workload
+
+    sched = Scheduler(stream_workload(path, fmt=fmt), discipline=discipline,
+                      quantum=quantum, energy_aware=POLICIES[policy], governor=governor,
+                      keep_completed=False, record_trace=record_trace)
+    sched.simulate()
+    return sched
+
+
+def metrics_row(path, policy, sched):
+    n = max(1, sched.n_completed)
+    return {
+        "workload": path,
+        "policy": policy,
+        "quantum": sched.quantum,
+        "discipline": sched.discipline.name,
+        "governor": sched.governor.name,
+        "n_completed": sched.n_completed,
+        "energy": sched.energy,
+        # Idle and switch energy need the trace; None when not recorded
+        "total_energy": sched.energy_report().total if sched.trace is not None else None,
+        "avg_waiting": sched.total_waiting / n,
+        "avg_turnaround": sched.total_turnaround / n,
+        "makespan": sched.time,
+    }
+
+
+def save_figures(runs, out_dir):
+    """Write power, energy and gantt figures for RR vs EARR runs."""
+    import matplotlib
+    matplotlib.use("Agg")
+    from visualization import Visualizer
+
+    os.makedirs(out_dir, exist_ok=True)
+    for path, scheds in runs.items():
+        name = os.path.splitext(os.path.basename(path))[0]
+        rr, earr = scheds.get("RR"), scheds.get("EARR")
+        if rr is not None and earr is not None:
+            Visualizer.plot_power_trace(rr.power_trace, earr.power_trace).savefig(
+                os.path.join(out_dir, f"{name}_power.png"))
+            Visualizer.plot_energy_bar(rr.energy_report().total,
+                                       earr.energy_report().total).savefig(
+                os.path.join(out_dir, f"{name}_energy.png"))
+        for policy, sched in scheds.items():
+            Visualizer.plot_gantt_chart(sched.gantt, policy).savefig(
+                os.path.join(out_dir, f"{name}_gantt_{policy.lower()}.png"))
+
+
+def save_trace(path, policy, sched, out_dir):
+    """Write one run as a memory-mappable trace file (see trace_io)."""
+    from trace_io import write_trace
+
+    os.makedirs(out_dir, exist_ok=True)
+    name = os.path.splitext(os.path.basename(path))[0]
+    meta = {"workload": path, "policy": policy, "quantum": sched.quantum,
+            "discipline": sched.discipline.name, "governor": sched.governor.name}
+    return write_trace(os.path.join(out_dir, f"{name}_{policy.lower()}.trace"), sched, meta)
+
+
+def cmd_run(args):
+    rows = []
+    runs = {}
+    record = bool(args.plot or args.total_energy or args.save_trace)
+    # A governor replaces what the policies differ in, so it runs once
+    # per workload and its rows are labelled with its name
+    labels = [args.governor] if args.governor else args.policy
+    for path in args.workloads:
+        for label in labels:
+            policy = "RR" if args.governor else label
+            sched = run_workload(path, policy, quantum=args.quantum,
+                                 discipline=args.discipline, governor=args.governor,
+                                 fmt=args.format, record_trace=record)
+            rows.append(metrics_row(path, label, sched))
+            if args.save_trace:
+                save_trace(path, label, sched, args.save_trace)
+            if args.plot:
+                runs.setdefault(path, {})[label] = sched
+    write_rows(rows, args.out, args.csv)
+    if args.plot:
+        save_figures(runs, args.plot)
+    return 0
+
+
+# ---------------------------------------------------------------------------
+# SWEEP
+# ---------------------------------------------------------------------------
+def cmd_sweep(args):
+    from sweep import run_sweep, sweep_grid
+    from workload import read_trace
+
+    process_sets = {path: list(read_trace(path, fmt=args.format)) for path in args.workloads}
+    aware = [POLICIES[p] for p in args.policy]
+    n = run_sweep(sweep_grid(process_sets, args.quanta, energy_aware=aware),
+                  args.out, workers=args.workers)
+    print(json.dumps({"simulated": n, "out": args.out}))
+    return 0
+
+
+# ---------------------------------------------------------------------------
+# OUTPUT & ARGUMENTS
+# ---------------------------------------------------------------------------
+def write_rows(rows, out=None, as_csv=False):
+    f = sys.stdout if out in (None, "-") else open(out, "w", newline="")
+    try:
+        if as_csv:
+            writer = csv.DictWriter(f, fieldnames=METRICS)
+            writer.writeheader()
+            writer.writerows(rows)
+        else:
+            json.dump(rows, f, indent=2)
+            f.write("\n")
+    finally:
+        if f is not sys.stdout:
+            f.close()
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="python -m main", description=__doc__.splitlines()[0])
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("workloads", nargs="+", help="CSV or JSONL job traces")
+    common.add_argument("--format", choices=("csv", "jsonl"),
+                        help="trace format (default: from the file extension)")
+    common.add_argument("--policy", nargs="+", choices=sorted(POLICIES), default=["RR", "EARR"])
+
+    run = sub.add_parser("run", parents=[common], help="simulate workloads, print metrics")
+    run.add_argument("--quantum", type=_number, default=2)
+    run.add_argument("--discipline", default="rr", help="rr, srtf, mlfq or cfs")
+    run.add_argument("--governor", help="DVFS governor name; replaces --policy, one run each")
+    run.add_argument("--total-energy", action=argparse.BooleanOptionalAction, default=True,
+                     help="record the trace to report idle and switch energy too "
+                          "(default; memory grows with the run, so use --no-total-energy "
+                          "on huge traces)")
+    run.add_argument("--csv", action="store_true", help="CSV instead of JSON")
+    run.add_argument("--out", help="output file (default: stdout)")
+    run.add_argument("--plot", metavar="DIR", help="also write figures to DIR")
+    run.add_argument("--save-trace", metavar="DIR",
+                     help="also write each run's trace to DIR (open with trace_io.TraceFile)")
+    run.set_defaults(func=cmd_run)
+
+    sweep = sub.add_parser("sweep", parents=[common], help="resumable quantum x policy sweep")
+    sweep.add_argument("--quanta", type=_number, nargs="+", default=[2])
+    sweep.add_argument("--out", required=True, help="results CSV (appended to, resumable)")
+    sweep.add_argument("--workers", type=int)
+    sweep.set_defaults(func=cmd_sweep)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    try:
+        return args.func(args)
+    except (OSError, ValueError) as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,358 @@
+# montecarlo.py
+import math
+from statistics import NormalDist
+
+import numpy as np
+
+from batch import POLICIES
+from energy_accounting import total_energy
+
+METRICS = ("energy", "avg_waiting", "avg_turnaround", "makespan")
+# Per-job distributions kept as quantile sketches
+JOB_METRICS = ("waiting", "turnaround")
+
+
+# ---------------------------------------------------------------------------
+# STREAMING STATISTICS
+# ---------------------------------------------------------------------------
+def _t_quantile(p, df):
+    """Student t quantile, from the normal one by the Cornish-Fisher
+       expansion (within 1% for df >= 3, exact as df grows)."""
+    z = NormalDist().inv_cdf(p)
+    if df <= 0 or math.isinf(df):
+        return z
+    z3, z5, z7 = z ** 3, z ** 5, z ** 7
+    return (z + (z3 + z) / (4 * df) + (5 * z5 + 16 * z3 + 3 * z) / (96 * df ** 2)
+            + (3 * z7 + 19 * z5 + 17 * z3 - 15 * z) / (384 * df ** 3))
+
+
+class Welford:
+    """Running mean and variance in O(1) memory (Welford's algorithm),
+       mergeable across workers (Chan et al.)."""
+
+    def __init__(self):
+        self.n = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+
+    def add(self, x):
+        self.n += 1
+        delta = x - self.mean
+        self.mean += delta / self.n
+        self._m2 += delta * (x - self.mean)
+
+    def merge(self, other):
+        n = self.n + other.n
+        if n:
+            delta = other.mean - self.mean
+            self._m2 += other._m2 + delta ** 2 * self.n * other.n / n
+            self.mean += delta * other.n / n
+            self.n = n
+        return self
+
+    @property
+    def variance(self):
+        return self._m2 / (self.n - 1) if self.n > 1 else 0.0
+
+    @property
+    def std(self):
+        return math.sqrt(self.variance)
+
+    def half_width(self, confidence=0.95):
+        """Half-width of the t confidence interval of the mean (inf below 2 samples)."""
+        if self.n < 2:
+            return math.inf
+        return _t_quantile(0.5 + confidence / 2, self.n - 1) * self.std / math.sqrt(self.n)
+
+    def interval(self, confidence=0.95):
+        h = self.half_width(confidence)
+        return (self.mean - h, self.mean + h)
+
+    def __repr__(self):
+        return f"Welford(n={self.n}, mean={self.mean:.6g}, std={self.std:.6g})"
+
+
+class QuantileSketch:
+    """Quantiles of a non-negative stream in bounded memory.
+
+       Values go into log-spaced buckets (as in DDSketch), so every
+       quantile is within `relative_accuracy` of the true value whatever
+       the distribution, and the sketch only grows with the log of the
+       value range. Values are added a whole array at a time; sketches
+       with the same accuracy merge exactly."""
+
+    def __init__(self, relative_accuracy=0.01):
+        self.relative_accuracy = relative_accuracy
+        self._gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self._gamma)
+        self._counts = np.zeros(0, dtype=np.int64)
+        self._offset = 0        # bucket index of _counts[0]
+        self.zeros = 0          # values too small to bucket (<= 1e-9)
+        self.count = 0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def _grow(self, lo, hi):
+        if not len(self._counts):
+            self._counts = np.zeros(hi - lo + 1, dtype=np.int64)
+            self._offset = lo
+            return
+        new_lo = min(lo, self._offset)
+        new_hi = max(hi, self._offset + len(self._counts) - 1)
+        if new_lo == self._offset and new_hi == self._offset + len(self._counts) - 1:
+            return
+        counts = np.zeros(new_hi - new_lo + 1, dtype=np.int64)
+        start = self._offset - new_lo
+        counts[start:start + len(self._counts)] = self._counts
+        self._counts, self._offset = counts, new_lo
+
+    def add(self, values):
+        v = np.asarray(values, dtype=float).ravel()
+        if not len(v):
+            return
+        if v.min() < 0:
+            raise ValueError("QuantileSketch only takes non-negative values")
+        self.count += len(v)
+        self.min = min(self.min, float(v.min()))
+        self.max = max(self.max, float(v.max()))
+        positive = v[v > 1e-9]
+        self.zeros += len(v) - len(positive)
+        if not len(positive):
+            return
+        index = np.ceil(np.log(positive) / self._log_gamma).astype(np.int64)
+        lo, hi = int(index.min()), int(index.max())
+        self._grow(lo, hi)
+        start = lo - self._offset
+        self._counts[start:start + hi - lo + 1] += np.bincount(index - lo, minlength=hi - lo + 1)
+
+    def merge(self, other):
+        if other.relative_accuracy != self.relative_accuracy:
+            raise ValueError("Only sketches with the same relative_accuracy merge")
+        if len(other._counts):
+            lo = other._offset
+            hi = lo + len(other._counts) - 1
+            self._grow(lo, hi)
+            start = lo - self._offset
+            self._counts[start:start + len(other._counts)] += other._counts
+        self.zeros += other.zeros
+        self.count += other.count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        return self
+
+    def quantile(self, q):
+        """Approximate `q`-quantile (0 <= q <= 1); nan when empty."""
+        if not self.count:
+            return math.nan
+        rank = q * (self.count - 1)
+        if rank < self.zeros:
+            return max(0.0, self.min)
+        cumulative = np.cumsum(self._counts)
+        i = int(np.searchsorted(cumulative, rank - self.zeros, side="right"))
+        i = min(i, len(self._counts) - 1)
+        value = 2 * self._gamma ** (i + self._offset) / (self._gamma + 1)
+        return min(max(value, self.min), self.max)
+
+    def __len__(self):
+        return self.count
+
+    def __repr__(self):
+        return f"QuantileSketch(count={self.count}, buckets={len(self._counts)})"
+
+
+# ---------------------------------------------------------------------------
+# PAIRED REPLICATIONS
+# ---------------------------------------------------------------------------
+def replicate(seed, num_process, quantum=2, arrival="periodic", burst="uniform",
+              relative_accuracy=0.01, options=None):
+    """One paired replication: RR and EARR on the same seeded workload
+       (common random numbers). Returns {policy: {metric: value}} plus
+       per-policy sketches of job waiting and turnaround. Energy is the
+       whole run's, idle time and frequency switches included (see
+       energy_accounting.total_energy), as on the Simulator page."""
+    from process_table import ProcessTable
+    from scheduler import RoundRobinScheduler
+    from workload import generate_arrays
+
+    arrivals, bursts = generate_arrays(num_process, arrival, burst, seed=seed, **(options or {}))
+    out = {"seed": seed}
+    for policy, aware in POLICIES.items():
+        table = ProcessTable.from_arrays(range(num_process), arrivals, bursts)
+        # The trace is only kept long enough to account idle and switch energy
+        sched = RoundRobinScheduler(table, quantum=quantum, energy_aware=aware)
+        done = sched.simulate()
+        n = max(1, sched.n_completed)
+        sketches = {}
+        for name in JOB_METRICS:
+            sketch = QuantileSketch(relative_accuracy)
+            sketch.add(table.column(name)[done])
+            sketches[name] = sketch
+        out[policy] = {
+            "energy": total_energy(sched),
+            "avg_waiting": sched.total_waiting / n,
+            "avg_turnaround": sched.total_turnaround / n,
+            "makespan": sched.time,
+            "sketches": sketches,
+        }
+    return out
+
+
+def _replicate_many(seeds, *args):
+    return [replicate(seed, *args) for seed in seeds]
+
+
+class MonteCarloResult:
+    """Streaming aggregates of paired RR / EARR replications.
+
+       stats[policy][metric] and diff[metric] (EARR - RR, per
+       replication) are Welford aggregates; sketches[policy][metric]
+       hold the per-job waiting / turnaround distributions of every
+       replication pooled together, and sketches[policy]["energy"]
+       the per-replication energies. No individual run is kept."""
+
+    def __init__(self, confidence=0.95, relative_accuracy=0.01):
+        self.confidence = confidence
+        self.stats = {p: {m: Welford() for m in METRICS} for p in POLICIES}
+        self.diff = {m: Welford() for m in METRICS}
+        self.sketches = {p: {m: QuantileSketch(relative_accuracy)
+                             for m in JOB_METRICS + ("energy",)} for p in POLICIES}
+        self.converged = False
+
+    @property
+    def runs(self):
+        return self.diff["energy"].n
+
+    def add(self, rep):
+        for policy in POLICIES:
+            run = rep[policy]
+            for metric in METRICS:
+                self.stats[policy][metric].add(run[metric])
+            for name, sketch in run["sketches"].items():
+                self.sketches[policy][name].merge(sketch)
+            self.sketches[policy]["energy"].add(run["energy"])
+        for metric in METRICS:
+            self.diff[metric].add(rep["EARR"][metric] - rep["RR"][metric])
+
+    def relative_half_width(self, metric):
+        """Half-width of the EARR - RR interval, relative to the larger of
+           the RR mean and the mean difference. A metric RR keeps near 0
+           (waiting on a lightly loaded CPU) is then judged against the
+           size of the effect rather than never converging."""
+        base = max(abs(self.stats["RR"][metric].mean), abs(self.diff[metric].mean))
+        h = self.diff[metric].half_width(self.confidence)
+        return h / base if base else math.inf
+
+    def summary(self):
+        """One row per metric: both means, the paired difference and its
+           confidence interval, and whether that interval excludes 0."""
+        import pandas as pd
+
+        rows = []
+        for metric in METRICS:
+            rr, earr, diff = self.stats["RR"][metric], self.stats["EARR"][metric], self.diff[metric]
+            h = diff.half_width(self.confidence)
+            rows.append({
+                "metric": metric,
+                "rr_mean": rr.mean,
+                "earr_mean": earr.mean,
+                "diff_mean": diff.mean,
+                "diff_low": diff.mean - h,
+                "diff_high": diff.mean + h,
+                "rel_change": diff.mean / rr.mean if rr.mean else math.nan,
+                "significant": abs(diff.mean) > h,
+                "runs": diff.n,
+            })
+        return pd.DataFrame(rows)
+
+    def quantiles(self, qs=(0.5, 0.9, 0.95, 0.99)):
+        """Sketch quantiles per policy and metric, as a DataFrame."""
+        import pandas as pd
+
+        rows = []
+        for policy, sketches in self.sketches.items():
+            for metric, sketch in sketches.items():
+                row = {"policy": policy, "metric": metric, "count": sketch.count}
+                row.update({f"p{round(q * 100):d}": sketch.quantile(q) for q in qs})
+                rows.append(row)
+        return pd.DataFrame(rows)
+
+    def __repr__(self):
+        return f"MonteCarloResult(runs={self.runs}, converged={self.converged})"
+
+
+def run_monte_carlo(num_process, quantum=2, arrival="periodic", burst="uniform",
+                    confidence=0.95, rel_width=0.02, stop_on=("energy", "avg_turnaround"),
+                    min_runs=10, max_runs=1000, seed=0, workers=None, chunksize=8,
+                    relative_accuracy=0.01, on_progress=None, **options):
+    """Paired RR / EARR replications until the confidence intervals are
+       narrow enough.
+
+       Replication r runs both policies on the workload generated from
+       seed + r (`options` go to workload.generate_arrays). After each
+       one, the run stops once, for every metric in `stop_on`, the
+       `confidence` interval of the EARR - RR difference has a
+       half-width of at most `rel_width` times the RR mean (or the mean
+       difference, if larger) -- but not before `min_runs`, and never
+       past `max_runs`. Pairing cancels the workload-to-workload
+       variance both policies share, so the difference converges far
+       sooner than either mean.
+
+       With `workers`, replications run in a process pool, `chunksize`
+       per task, with the next round already running while one is
+       folded in; results are still folded in seed order and the
+       stopping point is the same as a serial run (a few replications
+       past it are computed and dropped). on_progress(result) is
+       called after each replication. Returns a MonteCarloResult."""
+    result = MonteCarloResult(confidence, relative_accuracy)
+    args = (num_process, quantum, arrival, burst, relative_accuracy, options)
+
+    def done():
+        if result.runs < min_runs:
+            return False
+        return all(result.relative_half_width(m) <= rel_width for m in stop_on)
+
+    def fold(reps):
+        for rep in reps:
+            result.add(rep)
+            if on_progress is not None:
+                on_progress(result)
+            if done() or result.runs >= max_runs:
+                return True
+        return False
+
+    r = 0
+    if workers is None or workers <= 1:
+        while r < max_runs and not fold([replicate(seed + r, *args)]):
+            r += 1
+    else:
+        from collections import deque
+        from concurrent.futures import ProcessPoolExecutor
+
+        def submit(r, size):
+            # Interleaved seeds, so the chunks of a round take about as long
+            n_chunks = -(-size // chunksize)
+            return [pool.submit(_replicate_many, list(range(seed + r + i, seed + r + size,
+                                                            n_chunks)), *args)
+                    for i in range(n_chunks)]
+
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            rounds = deque()
+            while True:
+                # Keep two rounds in flight: all of min_runs at first,
+                # then `chunksize` replications per worker
+                while len(rounds) < 2 and r < max_runs:
+                    size = max(workers * chunksize, min_runs - r)
+                    size = min(size, max_runs - r)
+                    rounds.append(submit(r, size))
+                    r += size
+                if not rounds:
+                    break
+                futures = rounds.popleft()
+                by_seed = {rep["seed"]: rep for f in futures for rep in f.result()}
+                if fold([by_seed[s] for s in sorted(by_seed)]):
+                    break
+            for futures in rounds:
+                for f in futures:
+                    f.cancel()
+    result.converged = done()
+    return result
@@ -0,0 +1,363 @@
+# multicore.py
+import copy
+import heapq
+import math
+from array import array
+from collections import deque
+
+from energy_accounting import account
+from governors import GovernorState
+from scheduler import RoundRobinScheduler, idle_until
+from trace_recorder import TraceRecorder
+
+PLACEMENTS = ("least_loaded", "round_robin", "packed")
+
+
+class _CoreHeap:
+    """The core with the smallest key (lowest core number on ties),
+       when keys change one core at a time.
+
+       Each change pushes a fresh (key, core) entry; stale entries are
+       dropped when they reach the top, and the heap is rebuilt once
+       they outnumber the cores a few times over. O(log cores) per
+       change instead of a scan of every core per lookup."""
+
+    def __init__(self, keys):
+        self.keys = list(keys)
+        self._rebuild()
+
+    def _rebuild(self):
+        self._heap = [(key, core) for core, key in enumerate(self.keys)]
+        heapq.heapify(self._heap)
+
+    def set(self, core, key):
+        if self.keys[core] != key:
+            self.keys[core] = key
+            heapq.heappush(self._heap, (key, core))
+            if len(self._heap) > 4 * len(self.keys) + 64:
+                self._rebuild()
+
+    def top(self):
+        heap, keys = self._heap, self.keys
+        while heap[0][0] != keys[heap[0][1]]:
+            heapq.heappop(heap)
+        return heap[0][1]
+
+
+class MultiCoreScheduler(RoundRobinScheduler):
+    """Round Robin over `n_cores` cores, each with its own ready queue,
+       clock, DVFS level and power trace.
+
+       The simulation is event-driven: a heap holds the time at which
+       each busy core finishes its current slice, and idle cores sleep
+       until an arrival is placed on them, so cost grows with the number
+       of slices, not with simulated time or core count.
+
+       placement -- where arriving jobs are queued:
+           "least_loaded"  core with the fewest queued + running jobs
+           "round_robin"   cores in turn
+           "packed"        lowest-numbered core with fewer than
+                           `pack_limit` jobs (consolidation)
+       stealing  -- an idle core takes the newest job from the longest
+                    other queue instead of sleeping. That includes a
+                    job just placed on a core that is still waking up
+                    (cores wake on whole ticks): a busy core freeing up
+                    before the tick runs it sooner, and it counts as a
+                    migration. Under light load most migrations are
+                    these.
+
+       Every core runs its own copy of the DVFS governor. advance(),
+       steps(), progress() and checkpoint() / restore() work as on the
+       single-core engine, an event being one core decision.
+
+       Placement and stealing find their core by a scan of the per-core
+       lists, or from `heap_cores` cores up, by heaps kept as loads and
+       queues change (same choices, O(log cores) per event)."""
+
+    heap_cores = 64
+
+    def __init__(self, processes, n_cores=4, quantum=2, energy_aware=False,
+                 model=None, placement="least_loaded", stealing=True,
+                 pack_limit=3, keep_completed=True, record_trace=True, governor=None):
+        if placement not in PLACEMENTS:
+            raise ValueError(f"Unknown placement {placement!r}; expected one of {PLACEMENTS}")
+        super().__init__(processes, quantum=quantum, energy_aware=energy_aware,
+                         model=model, keep_completed=keep_completed, record_trace=False,
+                         governor=governor)
+        self.n_cores = n_cores
+        self.placement = placement
+        self.stealing = stealing
+        self.pack_limit = pack_limit
+
+        self.core_time = [0] * n_cores
+        self.core_energy = [0] * n_cores
+        self.migrations = 0
+        self.core_traces = None
+        if record_trace:
+            self.core_traces = [TraceRecorder(self.model.freq_levels)
+                                for _ in range(n_cores)]
+
+    @property
+    def gantt(self):
+        raise AttributeError("MultiCoreScheduler keeps one trace per core; "
+                             "use core_traces[i].gantt")
+
+    @property
+    def power_trace(self):
+        raise AttributeError("MultiCoreScheduler keeps one trace per core; "
+                             "use core_traces[i].power_trace")
+
+    def energy_report(self):
+        """One EnergyReport per core."""
+        if self.core_traces is None:
+            raise ValueError("energy_report() needs a run with record_trace=True")
+        return [account(trace, self.model) for trace in self.core_traces]
+
+    # -----------------------------------------------------------------------
+    # PLACEMENT & STEALING
+    # -----------------------------------------------------------------------
+    def _loaded(self, core):
+        # Keep the placement heap in step with load[core]. Packing fills
+        # the lowest-numbered core under the limit first (key -1), then
+        # falls back to the least loaded.
+        n = self._load[core]
+        self._by_load.set(core, -1 if n < self._pack_below else n)
+
+    def _place(self, load):
+        if self.placement == "round_robin":
+            core = self._rr_next
+            self._rr_next = (core + 1) % self.n_cores
+            return core
+        if self._by_load is not None:
+            return self._by_load.top()
+        if self.placement == "packed":
+            for core, n in enumerate(load):
+                if n < self.pack_limit:
+                    return core
+        return load.index(min(load))
+
+    def _steal(self, queues, load, backlog, thief):
+        by_queue = self._by_queue
+        if by_queue is not None:
+            # Longest queue: the smallest -len
+            victim = by_queue.top()
+        else:
+            lengths = list(map(len, queues))
+            victim = lengths.index(max(lengths))
+        if not queues[victim]:
+            return None
+        row = queues[victim].pop()
+        load[victim] -= 1
+        load[thief] += 1
+        if by_queue is not None:
+            by_queue.set(victim, -len(queues[victim]))
+        if self._by_load is not None:
+            self._loaded(victim)
+            self._loaded(thief)
+        cycles = self.table._cols["remaining"][row]
+        backlog[victim] -= cycles
+        backlog[thief] += cycles
+        self.migrations += 1
+        return row
+
+    # -----------------------------------------------------------------------
+    # SIMULATION
+    # -----------------------------------------------------------------------
+    def _begin(self):
+        n_cores = self.n_cores
+        self._queues = [deque() for _ in range(n_cores)]
+        self._load = [0] * n_cores          # queued + running jobs per core
+        self._running = [None] * n_cores
+        self._idle = set(range(n_cores))
+        self._events = []                   # (time, core) when a core next decides
+        self._done = array("l")
+        self._rr_next = 0
+        self._governors = [copy.deepcopy(self.governor) for _ in range(n_cores)]
+        for g in self._governors:
+            g.reset(self.model)
+        self._states = [GovernorState() for _ in range(n_cores)]
+        self._backlog = [0] * n_cores       # cycles queued + running per core
+        # Heaps over load and queue length for placement and stealing;
+        # below `heap_cores` cores a scan of the lists is cheaper
+        self._pack_below = self.pack_limit if self.placement == "packed" else 0
+        self._by_load = self._by_queue = None
+        if n_cores >= self.heap_cores:
+            if self.placement != "round_robin":
+                self._by_load = _CoreHeap([-1 if 0 < self._pack_below else 0] * n_cores)
+            if self.stealing:
+                self._by_queue = _CoreHeap([0] * n_cores)
+        self._busy = [0] * n_cores
+        self._queued = 0
+        self._free = []
+        self._consumed = 0
+        self._last_arrival = None
+        self._arrival_iter = self._arrivals(self._free)
+        self._nxt = next(self._arrival_iter, None)
+        self._started = True
+
+    def _wake(self, core, t):
+        # Idle cores wake on whole ticks, like the single-core model
+        self._idle.discard(core)
+        start = self.core_time[core]
+        at = start if t <= start else idle_until(start, t)
+        if self.core_traces is not None and at > start:
+            self.core_traces[core].record_idle(start, at, self.model.p_idle)
+        self.core_time[core] = at
+        heapq.heappush(self._events, (at, core))
+
+    def _admit(self, row, t):
+        load = self._load
+        core = self._place(load)
+        queue = self._queues[core]
+        queue.append(row)
+        load[core] += 1
+        if self._by_load is not None:
+            self._loaded(core)
+        if self._by_queue is not None:
+            self._by_queue.set(core, -len(queue))
+        self._backlog[core] += self.table._cols["remaining"][row]
+        if core in self._idle:
+            self._wake(core, t)
+        elif self.stealing and self._idle:
+            # Let a sleeping core come and take the new work
+            self._wake(min(self._idle), t)
+
+    def advance(self, events=None, until=None):
+        """Run for at most `events` core decisions (a slice starting,
+           or a core going idle), or until the next one is due at or
+           after `until`. Returns the events processed."""
+        if self.finished:
+            return 0
+        if not self._started:
+            self._begin()
+
+        queues, load, running = self._queues, self._load, self._running
+        idle, heap, done = self._idle, self._events, self._done
+        governors, states = self._governors, self._states
+        backlog, busy = self._backlog, self._busy
+        admit, loaded = self._admit, self._loaded
+        by_load, by_queue = self._by_load, self._by_queue
+        queue_keys = None if by_queue is None else by_queue.keys
+
+        model = self.model
+        traces = self.core_traces
+        core_time = self.core_time
+        table = self.table
+        pids = table.pids
+        arrival = table._cols["arrival"]
+        deadline = table._cols["deadline"]
+        remaining = table._cols["remaining"]
+        completion = table._cols["completion"]
+        f_max = governors[0].f_max
+
+        recycle = self._source is not None and not self.keep_completed
+        free = self._free
+        arrivals = self._arrival_iter
+        nxt = self._nxt
+
+        limit = -1 if events is None else events
+        until = math.inf if until is None else until
+        count = 0
+
+        while True:
+            t_core = heap[0][0] if heap else math.inf
+
+            # Arrivals before the next core decision go straight to queues
+            if nxt is not None and idle and arrival[nxt] < t_core:
+                admit(nxt, arrival[nxt])
+                nxt = next(arrivals, None)
+                continue
+
+            if not heap:
+                if nxt is None:
+                    break
+                admit(nxt, arrival[nxt])
+                nxt = next(arrivals, None)
+                continue
+
+            # Pause between events
+            if count == limit or t_core >= until:
+                break
+            count += 1
+
+            t, core = heapq.heappop(heap)
+            queue = queues[core]
+            self.time = t
+
+            # Finish the slice that just ended on this core
+            row = running[core]
+            if row is not None:
+                running[core] = None
+                if remaining[row] > 0:
+                    queue.append(row)
+                else:
+                    completion[row] = t
+                    load[core] -= 1
+                    if by_load is not None:
+                        loaded(core)
+                    if recycle:
+                        self._complete_row(row)
+                        free.append(row)
+                    else:
+                        done.append(row)
+
+            # Add new arrivals
+            while nxt is not None and arrival[nxt] <= t:
+                admit(nxt, arrival[nxt])
+                nxt = next(arrivals, None)
+
+            if queue:
+                row = queue.popleft()
+                # Unchanged when the slice before went back on this queue
+                if queue_keys is not None and queue_keys[core] != -len(queue):
+                    by_queue.set(core, -len(queue))
+            elif self.stealing:
+                row = self._steal(queues, load, backlog, core)
+            else:
+                row = None
+
+            if row is None:
+                idle.add(core)
+                continue
+
+            # Per-core frequency selection
+            rem = remaining[row]
+            state = states[core]
+            state.time = t
+            state.queue_len = len(queue)
+            state.remaining = rem
+            state.backlog = backlog[core]
+            state.busy_time = busy[core]
+            state.slack = deadline[row] - t - rem / f_max
+            freq_label = state.level = governors[core].select(state)
+            freq = model.freq_levels[freq_label]
+            P = model.power(freq)
+
+            max_cycles = self.quantum * freq
+            cycles_done = min(rem, max_cycles)
+            exec_time = cycles_done / freq
+            remaining[row] -= cycles_done
+            backlog[core] -= cycles_done
+            busy[core] += exec_time
+
+            end = t + exec_time
+            core_time[core] = end
+            self.core_energy[core] += P * exec_time
+            self.energy += P * exec_time
+            if traces is not None:
+                traces[core].record(t, end, pids[row], freq_label, P)
+
+            running[core] = row
+            heapq.heappush(heap, (end, core))
+
+        self._nxt = nxt
+        self._queued = sum(load)
+        if not heap and nxt is None:
+            self.time = max(core_time)
+            for core, governor in enumerate(governors):
+                if governor.finish is not None:
+                    states[core].time = core_time[core]
+                    states[core].busy_time = busy[core]
+                    governor.finish(states[core])
+            self._result = self._finish(done)
+        return count
@@ -0,0 +1,223 @@
+# page_cache.py
+import os
+from types import SimpleNamespace
+
+import streamlit as st
+
+import interactive
+from batch import POLICIES
+from energy_accounting import total_energy
+from scheduler import RoundRobinScheduler
+
+# When set (e.g. http://127.0.0.1:8765), runs go to the simulation
+# service (python -m service) and the pages only poll it
+SERVICE_URL = os.environ.get("EARR_SERVICE")
+
+# "plotly" draws charts in the browser (see interactive.py);
+# "matplotlib" renders them on the server. Plotly when installed.
+CHARTS = os.environ.get("EARR_CHARTS") or ("plotly" if interactive.available() else "matplotlib")
+
+
+# ---------------------------------------------------------------------------
+# SHARED CSS
+# ---------------------------------------------------------------------------
+@st.cache_resource
+def load_css(path="style.css"):
+    with open(path) as f:
+        return f.read()
+
+
+def apply_css():
+    st.markdown(f"<style>{load_css()}</style>", unsafe_allow_html=True)
+
+
+# ---------------------------------------------------------------------------
+# SEEDED SIMULATIONS
+# ---------------------------------------------------------------------------
+def make_workload(seed, num_process, arrival="periodic", burst="uniform"):
+    """The Simulator page's workload, reproducible from `seed`: one
+       arrival per tick on average, bursts averaging 5 cycles. The
+       defaults are the original one-job-per-tick, 2-8 cycle workload."""
+    from workload import generate_workload
+
+    return generate_workload(num_process, arrival, burst, rate=1.0, seed=seed)
+
+
+def simulation_spec(seed, num_process, quantum, arrival, burst, policy):
+    """The service job for the same run as make_workload() + simulation()."""
+    return {"kind": "simulate", "policy": policy, "quantum": quantum,
+            "workload": {"generate": {"n": num_process, "arrival": arrival, "burst": burst,
+                                      "rate": 1.0, "seed": seed}}}
+
+
+@st.cache_resource
+def service_client():
+    from service import ServiceClient
+
+    return ServiceClient(SERVICE_URL)
+
+
+def wait_for_service(key, on_progress=None, poll=0.2):
+    """Submit the RR and EARR runs for `key` to the service and poll
+       until both finish, calling on_progress(fraction) meanwhile. The
+       service dedupes, so simulation() then finds them done."""
+    import time
+
+    client = service_client()
+    ids = [client.submit(simulation_spec(*key, policy))["id"] for policy in POLICIES]
+    while True:
+        jobs = [client.job(jid) for jid in ids]
+        failed = [job for job in jobs if job["status"] == "failed"]
+        if failed:
+            raise RuntimeError(failed[0]["error"])
+        if on_progress is not None:
+            fractions = [1.0 if job["status"] == "done" else job["progress"].get("fraction") or 0.0
+                         for job in jobs]
+            on_progress(sum(fractions) / len(fractions))
+        if all(job["status"] == "done" for job in jobs):
+            return
+        time.sleep(poll)
+
+
+@st.cache_resource(max_entries=32)
+def simulation(seed, num_process, quantum, arrival, burst, policy):
+    """(scheduler, completed) for one run, shared by every session.
+       Treat both as read-only. With a service, the "scheduler" is the
+       run's memory-mapped TraceFile (same energy, time, gantt and
+       power_trace) and completed holds plain records."""
+    if SERVICE_URL:
+        from trace_io import TraceFile
+
+        result = service_client().run(
+            simulation_spec(seed, num_process, quantum, arrival, burst, policy))
+        return (TraceFile(result["trace"]),
+                [SimpleNamespace(**p) for p in result.get("processes", [])])
+
+    sched = RoundRobinScheduler(make_workload(seed, num_process, arrival, burst),
+                                quantum=quantum, energy_aware=POLICIES[policy])
+    return sched, sched.simulate()
+
+
+@st.cache_data(max_entries=256)
+def summary(seed, num_process, quantum, arrival, burst, policy):
+    """Plain-data metrics of one run, small enough for session state."""
+    sched, completed = simulation(seed, num_process, quantum, arrival, burst, policy)
+    n = max(1, len(completed))
+    return {
+        "energy": sched.energy,
+        "total_energy": total_energy(sched),
+        "makespan": sched.time,
+        "avg_waiting": sum(p.waiting for p in completed) / n,
+        "avg_turnaround": sum(p.turnaround for p in completed) / n,
+        "processes": [{"pid": p.pid, "arrival": p.arrival, "burst": p.burst,
+                       "completion": p.completion, "waiting": p.waiting,
+                       "turnaround": p.turnaround} for p in completed],
+    }
+
+
+# ---------------------------------------------------------------------------
+# FIGURES
+# ---------------------------------------------------------------------------
+FIGURES = ("power", "energy", "gantt_rr", "gantt_earr", "dashboard")
+
+
+def _visualizer():
+    if CHARTS == "plotly":
+        return interactive.InteractiveVisualizer
+    from visualization import Visualizer
+
+    return Visualizer
+
+
+def _release(fig):
+    # Unregister matplotlib figures from pyplot so evicted ones can be
+    # freed; a closed figure still renders.
+    if CHARTS != "plotly":
+        import matplotlib.pyplot as plt
+
+        plt.close(fig)
+    return fig
+
+
+def show(fig, where=st):
+    """Draw a figure from figure() / window_figure() in `where`."""
+    if CHARTS == "plotly":
+        where.plotly_chart(fig, width="stretch", config={"scrollZoom": True})
+    else:
+        where.pyplot(fig, width="stretch")
+
+
+@st.cache_resource(max_entries=64)
+def figure(kind, seed, num_process, quantum, arrival, burst):
+    """A cached figure comparing RR and EARR for one input."""
+    return _release(_build_figure(kind, seed, num_process, quantum, arrival, burst))
+
+
+def _build_figure(kind, seed, num_process, quantum, arrival, burst):
+    Visualizer = _visualizer()
+
+    rr, completed_rr = simulation(seed, num_process, quantum, arrival, burst, "RR")
+    earr, completed_earr = simulation(seed, num_process, quantum, arrival, burst, "EARR")
+    if kind == "power":
+        return Visualizer.plot_power_trace(rr.power_trace, earr.power_trace)
+    if kind == "energy":
+        return Visualizer.plot_energy_bar(total_energy(rr), total_energy(earr))
+    if kind == "gantt_rr":
+        return Visualizer.plot_gantt_chart(rr.gantt, "Traditional RR")
+    if kind == "gantt_earr":
+        return Visualizer.plot_gantt_chart(earr.gantt, "Energy-Aware RR")
+    if kind == "dashboard":
+        return Visualizer.generate_dashboard(rr, earr, completed_rr, completed_earr)
+    raise ValueError(f"Unknown figure {kind!r}; expected one of {FIGURES}")
+
+
+# ---------------------------------------------------------------------------
+# SAVED RUNS
+# ---------------------------------------------------------------------------
+@st.cache_resource(max_entries=8)
+def open_trace(path):
+    """A memory-mapped TraceFile, opened once per path (see trace_io)."""
+    from trace_io import TraceFile
+
+    return TraceFile(path)
+
+
+@st.cache_resource(max_entries=8)
+def open_index(path):
+    """A TraceIndex over a saved run, for O(log n) window queries."""
+    from trace_index import TraceIndex
+
+    return TraceIndex(open_trace(path))
+
+
+@st.cache_resource(max_entries=32)
+def window_figure(kind, path_rr, path_earr, t0, t1):
+    """Power or gantt figure of two saved runs over [t0, t1)."""
+    Visualizer = _visualizer()
+
+    rr = open_trace(path_rr).window(t0, t1)
+    earr = open_trace(path_earr).window(t0, t1)
+    if kind == "power":
+        fig = Visualizer.plot_power_trace(rr.power_trace, earr.power_trace)
+    elif kind == "gantt_rr":
+        fig = Visualizer.plot_gantt_chart(rr.gantt, "Traditional RR")
+    elif kind == "gantt_earr":
+        fig = Visualizer.plot_gantt_chart(earr.gantt, "Energy-Aware RR")
+    else:
+        raise ValueError(f"Unknown figure {kind!r}; expected power, gantt_rr or gantt_earr")
+    return _release(fig)
+
+
+# ---------------------------------------------------------------------------
+# MONTE CARLO
+# ---------------------------------------------------------------------------
+@st.cache_data(max_entries=32, show_spinner="Running paired RR / EARR replications...")
+def monte_carlo(num_process, quantum, arrival, burst, confidence, rel_width, max_runs):
+    """Confidence intervals of RR vs EARR over many seeded workloads
+       like the Simulator's (see montecarlo.run_monte_carlo)."""
+    from montecarlo import run_monte_carlo
+
+    result = run_monte_carlo(num_process, quantum, arrival, burst, confidence=confidence,
+                             rel_width=rel_width, max_runs=max_runs, rate=1.0)
+    return {"runs": result.runs, "converged": result.converged,
+            "summary": result.summary(), "quantiles": result.quantiles()}
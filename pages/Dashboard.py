@@ -1,12 +1,8 @@
 import streamlit as st
-from scheduler import RoundRobinScheduler
-from visualization import Visualizer
-import pandas as pd
-import random
+from page_cache import apply_css, figure, monte_carlo, open_index, open_trace, show, window_figure
 
 # Load shared CSS
-with open("style.css") as f:
-    st.markdown(f"<style>{f.read()}</style>", unsafe_allow_html=True)
+apply_css()
 
 
 st.title("📊 Full Comparative Dashboard")
@@ -14,14 +10,87 @@ st.write("---")
 
 st.info("💡 Run the simulation from the **Simulator page**. This page only shows the full dashboard.")
 
-if "last_rr" in st.session_state:
-    rr = st.session_state["last_rr"]
-    earr = st.session_state["last_earr"]
-    completed_rr = st.session_state["last_rr_completed"]
-    completed_earr = st.session_state["last_earr_completed"]
-
-    fig = Visualizer.generate_dashboard(rr, earr, completed_rr, completed_earr)
-    st.pyplot(fig, use_container_width=True)
+if "last_run" in st.session_state:
+    fig = figure("dashboard", *st.session_state["last_run"]["key"])
+    show(fig)
 
 else:
     st.warning("⚠️ No simulation found. Please run a simulation first.")
+
+
+# ---------------- MONTE CARLO ----------------
+# Paired RR / EARR runs on fresh seeded workloads with the last
+# simulation's settings, stopped once the intervals are narrow enough.
+if "last_run" in st.session_state:
+    st.write("---")
+    st.subheader("🎲 Monte Carlo Confidence Intervals")
+
+    _, num_process, quantum, arrival, burst = st.session_state["last_run"]["key"]
+    c1, c2, c3 = st.columns(3)
+    confidence = c1.selectbox("Confidence", [0.90, 0.95, 0.99], index=1,
+                              format_func=lambda c: f"{c:.0%}")
+    rel_width = c2.slider("Target CI Half-Width (% of RR)", 0.5, 10.0, 2.0, step=0.5) / 100
+    max_runs = c3.number_input("Max Replications", 10, 2000, 200, step=10)
+
+    if st.button("Run Monte Carlo"):
+        st.session_state["monte_carlo"] = (num_process, quantum, arrival, burst,
+                                           confidence, rel_width, int(max_runs))
+
+    if st.session_state.get("monte_carlo", (None,))[:4] == (num_process, quantum, arrival, burst):
+        mc = monte_carlo(*st.session_state["monte_carlo"])
+        rows = mc["summary"].set_index("metric")
+        if mc["converged"]:
+            st.success(f"✅ Converged after {mc['runs']} paired replications.")
+        else:
+            st.warning(f"⚠️ Stopped at {mc['runs']} replications before reaching the target width.")
+
+        m1, m2, m3 = st.columns(3)
+        for col, metric, unit in ((m1, "energy", "J"), (m2, "avg_waiting", ""),
+                                  (m3, "avg_turnaround", "")):
+            row = rows.loc[metric]
+            col.metric(f"EARR − RR {metric.replace('_', ' ')}",
+                       f"{row['diff_mean']:+.2f} {unit}".strip(),
+                       f"{row['rel_change']:+.1%}", delta_color="inverse")
+            col.caption(f"CI [{row['diff_low']:+.2f}, {row['diff_high']:+.2f}]"
+                        + ("" if row["significant"] else " — not significant"))
+
+        st.dataframe(mc["summary"], hide_index=True, width="stretch")
+        st.caption("Per-job waiting / turnaround quantiles (all replications pooled) "
+                   "and per-replication energy quantiles:")
+        st.dataframe(mc["quantiles"], hide_index=True, width="stretch")
+
+
+# ---------------- SAVED RUNS ----------------
+# Traces written by `python -m main run ... --save-trace DIR` are
+# memory-mapped, so only the selected window is read from disk.
+st.write("---")
+st.subheader("💾 Saved Runs")
+
+c1, c2 = st.columns(2)
+path_rr = c1.text_input("RR trace file", placeholder="runs/jobs_rr.trace")
+path_earr = c2.text_input("EARR trace file", placeholder="runs/jobs_earr.trace")
+
+if path_rr and path_earr:
+    try:
+        rr_file, earr_file = open_trace(path_rr), open_trace(path_earr)
+    except (OSError, ValueError) as e:
+        st.error(f"Could not open trace: {e}")
+    else:
+        rr_sum, earr_sum = rr_file.summary(), earr_file.summary()
+        m1, m2, m3 = st.columns(3)
+        m1.metric("RR Energy", f"{rr_sum['total_energy']:.2f} J")
+        m2.metric("EARR Energy", f"{earr_sum['total_energy']:.2f} J")
+        m3.metric("Energy Saved", f"{rr_sum['total_energy'] - earr_sum['total_energy']:.2f} J")
+
+        end = float(max(rr_file.span[1], earr_file.span[1], 1.0))
+        t0, t1 = st.slider("Time Window", 0.0, end, (0.0, end))
+        rr_index, earr_index = open_index(path_rr), open_index(path_earr)
+        w1, w2, w3, w4 = st.columns(4)
+        w1.metric("RR Window Energy", f"{rr_index.energy(t0, t1):.2f} J")
+        w2.metric("EARR Window Energy", f"{earr_index.energy(t0, t1):.2f} J")
+        w3.metric("RR Utilization", f"{rr_index.utilization(t0, t1):.0%}")
+        w4.metric("EARR Utilization", f"{earr_index.utilization(t0, t1):.0%}")
+        show(window_figure("power", path_rr, path_earr, t0, t1))
+        g1, g2 = st.columns(2)
+        show(window_figure("gantt_rr", path_rr, path_earr, t0, t1), g1)
+        show(window_figure("gantt_earr", path_rr, path_earr, t0, t1), g2)
@@ -1,15 +1,13 @@
 import streamlit as st
-from scheduler import RoundRobinScheduler
-from visualization import Visualizer
+from page_cache import SERVICE_URL, apply_css, figure, show, summary, wait_for_service
+from workload import ARRIVALS, BURSTS
 import pandas as pd
-import random
 
 st.title("🧮 CPU Scheduler Simulator — RR vs EARR")
 st.write("---")
 
 # Load shared CSS
-with open("style.css") as f:
-    st.markdown(f"<style>{f.read()}</style>", unsafe_allow_html=True)
+apply_css()
 
 
 # ---------------- SIDEBAR ----------------
@@ -17,41 +15,47 @@ with st.sidebar:
     st.header("⚙️ Simulation Settings")
     num_process = st.number_input("Number of Processes", 3, 20, 6)
     quantum = st.slider("Time Quantum", 1, 20, 3)
+    seed = st.number_input("Workload Seed", 0, 1_000_000, 0)
+    arrival = st.selectbox("Arrival Pattern", ARRIVALS, index=0)
+    burst = st.selectbox("Burst Distribution", BURSTS, index=0)
     st.markdown("---")
     run_btn = st.button("🚀 Run Simulation")
 
 
 # ----------- RUN SIMULATION ------------
+# Runs and figures are cached by their inputs and policy; the session
+# only keeps the inputs and a small summary of each run.
 if run_btn:
-
-    # Randomly generate processes
-    process_data = [
-        {"pid": f"P{i+1}", "arrival": i, "burst": random.randint(2, 8)}
-        for i in range(num_process)
-    ]
-
-    rr = RoundRobinScheduler(process_data, quantum=quantum, energy_aware=False)
-    earr = RoundRobinScheduler(process_data, quantum=quantum, energy_aware=True)
-
-    completed_rr = rr.simulate()
-    completed_earr = earr.simulate()
-
-    # SAVE for dashboard page
-    st.session_state["last_rr"] = rr
-    st.session_state["last_earr"] = earr
-    st.session_state["last_rr_completed"] = completed_rr
-    st.session_state["last_earr_completed"] = completed_earr
+    key = (int(seed), int(num_process), int(quantum), arrival, burst)
+    if SERVICE_URL:
+        # Runs happen in the service's workers; this session only polls
+        bar = st.progress(0.0, text="Simulating…")
+        wait_for_service(key, lambda f: bar.progress(min(f, 1.0), text=f"Simulating… {f:.0%}"))
+        bar.empty()
+    st.session_state["last_run"] = {
+        "key": key,
+        "rr": summary(*key, "RR"),
+        "earr": summary(*key, "EARR"),
+    }
     st.success("Simulation results saved for Dashboard page!")
 
+if "last_run" in st.session_state:
+    last = st.session_state["last_run"]
+    key = last["key"]
+    rr, earr = last["rr"], last["earr"]
+
     # ----------------------------------------------------
     # METRICS
     # ----------------------------------------------------
     st.subheader("📌 Key Metrics")
 
+    # Whole-run energy: busy slices plus idle time and frequency switches
     col1, col2, col3 = st.columns(3)
-    col1.metric("RR Energy", f"{rr.energy:.2f} J")
-    col2.metric("EARR Energy", f"{earr.energy:.2f} J")
-    col3.metric("Energy Saved", f"{rr.energy - earr.energy:.2f} J")
+    col1.metric("RR Energy", f"{rr['total_energy']:.2f} J")
+    col2.metric("EARR Energy", f"{earr['total_energy']:.2f} J")
+    col3.metric("Energy Saved", f"{rr['total_energy'] - earr['total_energy']:.2f} J")
+    st.caption(f"Including idle and switching energy. Busy slices alone: "
+               f"RR {rr['energy']:.2f} J, EARR {earr['energy']:.2f} J.")
 
     st.write("")
 
@@ -64,13 +68,13 @@ if run_btn:
 
     with cA:
         st.markdown("### ⚡ Power Consumption Over Time")
-        fig1 = Visualizer.plot_power_trace(rr.power_trace, earr.power_trace)
-        st.pyplot(fig1, width="stretch")
+        fig1 = figure("power", *key)
+        show(fig1)
 
     with cB:
         st.markdown("### 🔋 Total Energy Comparison")
-        fig2 = Visualizer.plot_energy_bar(rr.energy, earr.energy)
-        st.pyplot(fig2, width="stretch")
+        fig2 = figure("energy", *key)
+        show(fig2)
 
     # ----------------------------------------------------
     # GANTT CHARTS
@@ -81,13 +85,13 @@ if run_btn:
 
     with g1:
         st.markdown("### RR Gantt Chart")
-        fig3 = Visualizer.plot_gantt_chart(rr.gantt, "Traditional RR")
-        st.pyplot(fig3, width="stretch")
+        fig3 = figure("gantt_rr", *key)
+        show(fig3)
 
     with g2:
         st.markdown("### EARR Gantt Chart")
-        fig4 = Visualizer.plot_gantt_chart(earr.gantt, "Energy-Aware RR")
-        st.pyplot(fig4, width="stretch")
+        fig4 = figure("gantt_earr", *key)
+        show(fig4)
 
     # ----------------------------------------------------
     # SUMMARY TABLE (EARR ONLY)
@@ -124,17 +128,18 @@ if run_btn:
     # ===============================
     st.markdown("### 🟩 Energy-Aware RR (EARR) Summary")
 
+    completed_earr = earr["processes"]
     summary_earr = pd.DataFrame({
-        "Process": [p.pid for p in completed_earr],
-        "Arrival": [round(p.arrival, 2) for p in completed_earr],
-        "Burst": [round(p.burst, 2) for p in completed_earr],
-        "Completion": [round(p.completion, 2) for p in completed_earr],
-        "Waiting": [round(p.waiting, 2) for p in completed_earr],
-        "Turnaround": [round(p.turnaround, 2) for p in completed_earr]
+        "Process": [p["pid"] for p in completed_earr],
+        "Arrival": [round(p["arrival"], 2) for p in completed_earr],
+        "Burst": [round(p["burst"], 2) for p in completed_earr],
+        "Completion": [round(p["completion"], 2) for p in completed_earr],
+        "Waiting": [round(p["waiting"], 2) for p in completed_earr],
+        "Turnaround": [round(p["turnaround"], 2) for p in completed_earr]
     })
 
     summary_earr.loc[len(summary_earr.index)] = [
-        "Total Energy", "", "", "", "", f"{earr.energy:.2f}"
+        "Total Energy", "", "", "", "", f"{earr['total_energy']:.2f}"
     ]
 
     summary_earr = summary_earr.astype(str)
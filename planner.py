@@ -0,0 +1,393 @@
+# planner.py
+import math
+
+from energy_module import DEFAULT_MODEL
+from process_table import ProcessTable
+
+
+class Plan:
+    """An offline frequency schedule for one workload.
+
+       bound    -- the turnaround bound the plan was made for
+       profile  -- (start, end, speed) pieces; plan_schedule() speeds
+                   between two levels are realised by time-sharing them
+       feasible -- False when the bound cannot be met even at the top
+                   frequency (the plan is then the fastest one)"""
+
+    def __init__(self, energy, avg_turnaround, makespan, profile, bound=None, feasible=True):
+        self.energy = energy
+        self.avg_turnaround = avg_turnaround
+        self.makespan = makespan
+        self.profile = profile
+        self.bound = bound
+        self.feasible = feasible
+
+    @property
+    def edp(self):
+        return self.energy * self.avg_turnaround
+
+    def __repr__(self):
+        return (f"Plan(energy={self.energy:.4f}, avg_turnaround={self.avg_turnaround:.4f}, "
+                f"bound={self.bound}, feasible={self.feasible})")
+
+
+def _jobs(processes):
+    if not isinstance(processes, ProcessTable):
+        processes = ProcessTable.from_records(processes)
+    cols = processes._cols
+    order = processes.arrival_order() or range(len(processes))
+    return [cols["arrival"][i] for i in order], [cols["burst"][i] for i in order]
+
+
+# ---------------------------------------------------------------------------
+# ENERGY PER CYCLE WITH DISCRETE LEVELS
+# ---------------------------------------------------------------------------
+class _LevelTable:
+    def __init__(self, model):
+        self.freqs = sorted(model.freq_levels.values())
+        self.powers = [model.power(f) for f in self.freqs]
+        self.f_max = self.freqs[-1]
+
+        # Below the most energy-efficient level, slowing down only
+        # stretches the busy time, so speeds are floored there.
+        self.f_floor = min(self.freqs, key=lambda f: model.power(f) / f)
+
+    def energy_per_cycle(self, s):
+        """Cheapest energy per cycle at average speed s: time-share the
+           two levels around s (the convex hull of the power curve)."""
+        freqs, powers = self.freqs, self.powers
+        if s <= freqs[0]:
+            return powers[0] / freqs[0]
+        for a in range(len(freqs) - 1):
+            fa, fb = freqs[a], freqs[a + 1]
+            if s <= fb:
+                t_b = (1 - fa / s) / (fb - fa)
+                t_a = 1 / s - t_b
+                return powers[a] * t_a + powers[a + 1] * t_b
+        return powers[-1] / freqs[-1]
+
+
+# ---------------------------------------------------------------------------
+# MAXIMUM TURNAROUND BOUND: YDS SPEED SCALING (TAUT STRING)
+# ---------------------------------------------------------------------------
+def _gates(arrival, burst, D):
+    """Vertical gates (x, lo, hi) on cumulative work done: before job j
+       is released at most W[j-1] cycles can be done, and by its
+       deadline arrival + D at least W[j]."""
+    W = [0.0]
+    for b in burst:
+        W.append(W[-1] + b)
+
+    points = {}
+    for j in range(1, len(arrival)):
+        lo, hi = points.get(arrival[j], (-math.inf, math.inf))
+        points[arrival[j]] = (lo, min(hi, W[j]))
+    for j in range(len(arrival)):
+        x = arrival[j] + D
+        lo, hi = points.get(x, (-math.inf, math.inf))
+        points[x] = (max(lo, W[j + 1]), hi)
+
+    end = arrival[-1] + D
+    points[end] = (W[-1], W[-1])
+    return [(x, lo, hi) for x, (lo, hi) in sorted(points.items()) if x <= end]
+
+
+def _taut_string(start, gates):
+    """Shortest path from `start` through the gates.
+
+       For a convex power function this is the minimum-energy
+       cumulative-work curve (YDS speed scaling for agreeable
+       deadlines). Returns the polyline's vertices."""
+    ax, ay = start
+    path = [start]
+    i = 0
+    while True:
+        smin, smax = -math.inf, math.inf
+        il = iu = None
+        bend = None
+        for j in range(i, len(gates)):
+            x, lo, hi = gates[j]
+            dx = x - ax
+            if dx <= 0:
+                # Jobs released together with the first one
+                continue
+            slo = (lo - ay) / dx
+            shi = (hi - ay) / dx
+            if shi < smin:
+                bend = (il, gates[il][0], gates[il][1])
+                break
+            if slo > smax:
+                bend = (iu, gates[iu][0], gates[iu][2])
+                break
+            if slo >= smin:
+                smin, il = slo, j
+            if shi <= smax:
+                smax, iu = shi, j
+        if bend is None:
+            x, lo, _ = gates[-1]
+            path.append((x, lo))
+            return path
+        i, ax, ay = bend[0] + 1, bend[1], bend[2]
+        path.append((ax, ay))
+
+
+def plan_schedule(processes, max_turnaround, model=None):
+    """Minimum-energy plan in which every job finishes within
+       `max_turnaround` of its arrival, or None if that needs more than
+       the top frequency. Jobs run to completion in arrival order."""
+    arrival, burst = _jobs(processes)
+    levels = _LevelTable(DEFAULT_MODEL if model is None else model)
+    if not arrival:
+        return Plan(0.0, 0.0, 0.0, [], bound=max_turnaround)
+
+    path = _taut_string((arrival[0], 0.0), _gates(arrival, burst, max_turnaround))
+
+    # Work-indexed speed pieces of the string
+    pieces = []
+    for (x0, y0), (x1, y1) in zip(path, path[1:]):
+        if y1 > y0:
+            s = (y1 - y0) / (x1 - x0)
+            if s > levels.f_max * (1 + 1e-9):
+                return None
+            pieces.append((y0, y1, max(s, levels.f_floor)))
+
+    # Replay jobs in arrival order through the (floored) pieces
+    energy = 0.0
+    total_turnaround = 0.0
+    profile = []
+    t = 0.0
+    w = 0.0
+    k = 0
+    for r, b in zip(arrival, burst):
+        t = max(t, r)
+        end = w + b
+        while w < end - 1e-12 and k < len(pieces):
+            y0, y1, s = pieces[k]
+            dw = min(end, y1) - w
+            if dw > 0:
+                dt = dw / s
+                if profile and profile[-1][1] == t and profile[-1][2] == s:
+                    profile[-1] = (profile[-1][0], t + dt, s)
+                else:
+                    profile.append((t, t + dt, s))
+                energy += dw * levels.energy_per_cycle(s)
+                t += dt
+                w += dw
+            if w >= y1 - 1e-12:
+                k += 1
+        w = end
+        total_turnaround += t - r
+
+    return Plan(energy, total_turnaround / len(arrival), t, profile, bound=max_turnaround)
+
+
+# ---------------------------------------------------------------------------
+# AVERAGE TURNAROUND BOUND: RE-TIMING EARR'S DISPATCH ORDER (LP)
+# ---------------------------------------------------------------------------
+class _Dispatch:
+    """EARR's dispatch sequence for a workload, cut into segments.
+
+       Consecutive slices are merged unless a job starts or finishes
+       between them, so a segment carries at most one release (its
+       first job's arrival, or -inf) and at most one completion (its
+       last job). Only these events constrain the frequency schedule."""
+
+    def __init__(self, arrival, burst, quantum, model):
+        import numpy as np
+        from scheduler import RoundRobinScheduler
+
+        n = len(arrival)
+        table = ProcessTable.from_arrays(range(n), arrival, burst)
+        earr = RoundRobinScheduler(table, quantum=quantum, energy_aware=True, model=model)
+        earr.simulate()
+        self.energy = earr.energy
+        self.avg_turnaround = float(np.mean(table.column("completion") - table.column("arrival")))
+
+        trace = earr.trace
+        busy = trace.column("pid") >= 0
+        row = trace.column("pid")[busy]
+        freqs = np.array([model.freq_levels[label] for label in trace.levels])
+        cycles = (trace.column("end") - trace.column("start"))[busy] * freqs[trace.column("level")[busy]]
+
+        # pid == row here, so the first / last slice of each job is easy to find
+        first = np.zeros(len(row), dtype=bool)
+        first[np.unique(row, return_index=True)[1]] = True
+        last = np.zeros(len(row), dtype=bool)
+        last[len(row) - 1 - np.unique(row[::-1], return_index=True)[1]] = True
+
+        starts = first.copy()
+        starts[1:] |= last[:-1]
+        seg = np.cumsum(starts) - 1
+        head = np.flatnonzero(starts)
+        tail = np.append(head[1:], len(row)) - 1
+
+        arrival = np.asarray(arrival, dtype=float)
+        self.cycles = np.bincount(seg, weights=cycles)
+        self.release = np.where(first[head], arrival[row[head]], -np.inf)
+        self.finishes = last[tail]
+        self.arrival_sum = float(arrival.sum())
+        self.n_jobs = n
+
+    def fastest(self, f_max):
+        """Average turnaround with every segment at the top frequency."""
+        t = -math.inf
+        total = 0.0
+        for c, r, done in zip(self.cycles.tolist(), self.release.tolist(), self.finishes.tolist()):
+            t = max(t, r) + c / f_max
+            if done:
+                total += t
+        return (total - self.arrival_sum) / self.n_jobs
+
+
+def _solve(dispatch, levels, max_avg_turnaround, price=0.0):
+    """Minimum-energy frequency schedule for the dispatch order as a
+       linear program: per segment, the time spent at each level and
+       the segment's finish time. A `price` also charges that much
+       energy per unit of average turnaround."""
+    import numpy as np
+    try:
+        from scipy import sparse
+        from scipy.optimize import linprog
+    except ImportError:
+        raise ImportError("optimal_plan() and earr_gap() need SciPy (pip install scipy)") from None
+
+    G, L = len(dispatch.cycles), len(levels.freqs)
+    freqs = np.asarray(levels.freqs, dtype=float)
+    n_t = G * L
+    seg = np.repeat(np.arange(G), L)
+    cols_t = np.arange(n_t)
+
+    # Work: sum_a f_a * t[g, a] = cycles[g]
+    A_eq = sparse.csr_matrix((np.tile(freqs, G), (seg, cols_t)), shape=(G, n_t + G))
+
+    # Order: T[g-1] + sum_a t[g, a] <= T[g]
+    rows = [seg, np.arange(G), np.arange(1, G)]
+    cols = [cols_t, n_t + np.arange(G), n_t + np.arange(G - 1)]
+    vals = [np.ones(n_t), -np.ones(G), np.ones(G - 1)]
+    b_ub = [np.zeros(G)]
+
+    # Release: release[g] + sum_a t[g, a] <= T[g]
+    released = np.flatnonzero(np.isfinite(dispatch.release))
+    r = G + np.arange(len(released))
+    rows += [np.repeat(r, L), r]
+    cols += [(released[:, None] * L + np.arange(L)).ravel(), n_t + released]
+    vals += [np.ones(len(released) * L), -np.ones(len(released))]
+    b_ub.append(-dispatch.release[released])
+
+    n_ub = G + len(released)
+    if max_avg_turnaround is not None:
+        # Turnaround: sum of completion times of all jobs
+        done = np.flatnonzero(dispatch.finishes)
+        rows.append(np.full(len(done), n_ub))
+        cols.append(n_t + done)
+        vals.append(np.ones(len(done)))
+        b_ub.append([max_avg_turnaround * dispatch.n_jobs + dispatch.arrival_sum])
+        n_ub += 1
+
+    A_ub = sparse.csr_matrix((np.concatenate(vals), (np.concatenate(rows), np.concatenate(cols))),
+                             shape=(n_ub, n_t + G))
+    c = np.concatenate([np.tile(levels.powers, G), np.zeros(G)])
+    c[n_t:][dispatch.finishes] = price / dispatch.n_jobs
+    bounds = [(0, None)] * n_t + [(None, None)] * G
+    res = linprog(c, A_ub=A_ub, b_ub=np.concatenate(b_ub), A_eq=A_eq,
+                  b_eq=dispatch.cycles, bounds=bounds, method="highs-ipm")
+    if res.status != 0:
+        raise RuntimeError(f"Frequency planning LP failed: {res.message}")
+
+    t = res.x[:n_t].reshape(G, L)
+    T = res.x[n_t:]
+    done = T[dispatch.finishes]
+    avg_turnaround = (done.sum() - dispatch.arrival_sum) / dispatch.n_jobs
+
+    # Fastest level first within each segment
+    profile = []
+    for g in range(G):
+        start = T[g] - t[g].sum()
+        for a in range(L - 1, -1, -1):
+            if t[g, a] > 1e-12:
+                profile.append((start, start + t[g, a], levels.freqs[a]))
+                start += t[g, a]
+    energy = float(c[:n_t] @ res.x[:n_t])
+    return Plan(energy, float(avg_turnaround), float(T.max()), profile, bound=max_avg_turnaround)
+
+
+def optimal_plan(processes, max_avg_turnaround=None, objective="energy", quantum=2, model=None):
+    """Offline baseline: the cheapest frequency schedule for EARR's
+       dispatch order whose average turnaround stays within
+       `max_avg_turnaround`.
+
+       Jobs are served in exactly the order EARR serves them, with the
+       same cycles per slice; only the frequency (and hence the timing)
+       of each slice is chosen, exactly, by linear programming over the
+       discrete levels. `objective` is "energy", or "edp" to minimise
+       energy x average turnaround under the bound. Needs SciPy."""
+    if objective not in ("energy", "edp"):
+        raise ValueError(f"Unknown objective {objective!r}; expected 'energy' or 'edp'")
+    arrival, burst = _jobs(processes)
+    if not arrival:
+        return Plan(0.0, 0.0, 0.0, [], bound=max_avg_turnaround)
+    model = DEFAULT_MODEL if model is None else model
+    levels = _LevelTable(model)
+    dispatch = _Dispatch(arrival, burst, quantum, model)
+    return _optimal(dispatch, levels, max_avg_turnaround, objective)
+
+
+def _optimal(dispatch, levels, max_avg_turnaround, objective):
+    fastest = dispatch.fastest(levels.f_max)
+    if max_avg_turnaround is not None and fastest > max_avg_turnaround * (1 + 1e-9):
+        plan = _solve(dispatch, levels, fastest * (1 + 1e-9))
+        plan.bound, plan.feasible = max_avg_turnaround, False
+        return plan
+
+    if objective == "energy":
+        return _solve(dispatch, levels, max_avg_turnaround)
+
+    # EDP. The least energy E(T) for an average turnaround T is convex
+    # and piecewise linear, and T * E(T) is smallest where the energy
+    # saved per unit of turnaround, -E'(T), equals E / T. Pricing
+    # turnaround at mu and minimising E + mu * T lands on the point
+    # whose slope is -mu, so iterate mu <- E / T from EARR's own ratio
+    # (as in Dinkelbach's method): mu only ever moves one way, and the
+    # run stops as soon as two prices give the same plan, usually
+    # within a handful of LPs.
+    price = dispatch.energy / dispatch.avg_turnaround
+    best = last = None
+    for _ in range(30):
+        plan = _solve(dispatch, levels, max_avg_turnaround, price)
+        if best is None or plan.edp < best.edp:
+            best = plan
+        if last is not None and abs(plan.avg_turnaround - last) <= 1e-9 * last:
+            break
+        last = plan.avg_turnaround
+        price = plan.energy / plan.avg_turnaround
+    best.bound = max_avg_turnaround
+    return best
+
+
+def earr_gap(processes, quantum=2, objective="energy", model=None):
+    """How far EARR's pick_freq heuristic is from the offline optimum on
+       one workload, with the optimum held to EARR's own dispatch order
+       and average turnaround. `gap` is EARR's excess energy (or EDP)
+       relative to the optimum."""
+    if objective not in ("energy", "edp"):
+        raise ValueError(f"Unknown objective {objective!r}; expected 'energy' or 'edp'")
+    arrival, burst = _jobs(processes)
+    model = DEFAULT_MODEL if model is None else model
+    if not arrival:
+        return {"earr_energy": 0.0, "earr_avg_turnaround": 0.0, "optimal_energy": 0.0,
+                "optimal_avg_turnaround": 0.0, "gap": 0.0}
+    dispatch = _Dispatch(arrival, burst, quantum, model)
+    best = _optimal(dispatch, _LevelTable(model), dispatch.avg_turnaround, objective)
+
+    earr_value = dispatch.energy
+    best_value = best.energy
+    if objective == "edp":
+        earr_value *= dispatch.avg_turnaround
+        best_value = best.edp
+    return {
+        "earr_energy": dispatch.energy,
+        "earr_avg_turnaround": dispatch.avg_turnaround,
+        "optimal_energy": best.energy,
+        "optimal_avg_turnaround": best.avg_turnaround,
+        "gap": (earr_value - best_value) / best_value if best_value else 0.0,
+    }
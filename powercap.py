@@ -0,0 +1,242 @@
+# powercap.py
+import math
+from array import array
+
+from governors import Governor
+
+# Relative slack on budget checks, so float round-off is not a violation
+EPS = 1e-9
+
+
+class PowerCapGovernor(Governor):
+    """Runs as fast as a power or energy budget allows.
+
+       watts  -- instantaneous cap: every slice runs at the fastest level
+                 drawing at most `watts` (the slowest level when none
+                 does; each such slice counts as a violation)
+       joules -- energy budget per `window` time units, idle power
+                 included, so it must exceed p_idle * window. Windows
+                 are fixed ([0, w), [w, 2w), ...). Each slice runs at
+                 the fastest level that could run to the end of the
+                 window within what is left, and never past the
+                 window's end. When not even the slowest level
+                 fits, it runs only as long as the budget affords, and
+                 once the budget is down to the idle floor the CPU is
+                 held idle until the next window.
+
+       Both can be given; the stricter one wins. Energy is tracked from
+       the scheduler's busy time, split exactly at window boundaries;
+       frequency-switch energy is not charged (see energy_accounting).
+       Throttling needs the single-core engine: MultiCoreScheduler
+       only uses the frequency choice."""
+
+    name = "power_cap"
+
+    def __init__(self, watts=None, joules=None, window=100.0):
+        if watts is None and joules is None:
+            raise ValueError("PowerCapGovernor needs watts= and/or joules=")
+        if window <= 0:
+            raise ValueError("window must be positive")
+        self.watts = watts
+        self.joules = joules
+        self.window = window
+
+    def reset(self, model):
+        super().reset(model)
+        self._power = [model.power(f) for f in self.freqs]
+        self._p_idle = model.p_idle
+        idle = self._p_idle * self.window
+        if self.joules is not None and self.joules - idle <= EPS * self.joules:
+            # Idling alone would use the whole budget: the CPU could never run
+            raise ValueError(f"joules={self.joules} does not exceed the idle energy of a window "
+                             f"(p_idle {self._p_idle} W x window {self.window} = "
+                             f"{idle})")
+        if self.watts is None:
+            self._top = len(self.levels) - 1
+        else:
+            fits = [i for i, p in enumerate(self._power) if p <= self.watts * (1 + EPS)]
+            self._top = fits[-1] if fits else 0
+        self.max_slice = math.inf
+        self.throttled_time = 0.0
+        self.over_cap = 0       # slices above `watts`
+        self._closed = array("d")   # energy of each finished window
+        self._k = 0             # current window: [k * w, _end)
+        self._end = self.window
+        self._spent = 0.0       # energy spent in it so far
+        self._mark = 0.0        # time accounted up to
+        self._slice = None      # (start, busy_time, power) of the open slice
+
+    @property
+    def window_energy(self):
+        """Energy per window so far, the current window last."""
+        out = array("d", self._closed)
+        out.append(self._spent)
+        return out
+
+    # -----------------------------------------------------------------------
+    # ENERGY BOOKKEEPING
+    # -----------------------------------------------------------------------
+    def _add(self, t0, t1, power):
+        # Time is only ever added in order, so this walks forward from
+        # the current window; a time on a window's end opens the next one
+        while t1 >= self._end:
+            if t0 < self._end:
+                self._spent += (self._end - t0) * power
+                t0 = self._end
+            self._closed.append(self._spent)
+            self._spent = 0.0
+            self._k += 1
+            self._end = (self._k + 1) * self.window
+        if t1 > t0:
+            self._spent += (t1 - t0) * power
+
+    def _catch_up(self, state):
+        # Everything since the last dispatch: the slice it started
+        # (its length is the busy time added since), then idle time
+        now = state.time
+        if self._slice is not None:
+            start, busy0, p = self._slice
+            end = start + (state.busy_time - busy0)
+            self._add(start, end, p)
+            self._mark = end
+            self._slice = None
+        elif now <= self._mark:
+            return
+        self._add(self._mark, now, self._p_idle)
+        self._mark = max(self._mark, now)
+
+    def _budget_left(self, now):
+        # (energy left in the current window above the idle floor, time left)
+        tau = self._end - now
+        return self.joules - self._spent - self._p_idle * tau, tau, self._end
+
+    # -----------------------------------------------------------------------
+    # GOVERNOR API
+    # -----------------------------------------------------------------------
+    def finish(self, state):
+        # Close the books on the last slice
+        self._catch_up(state)
+
+    def throttle(self, state):
+        self._catch_up(state)
+        if self.joules is None:
+            return None
+        spare, tau, end = self._budget_left(state.time)
+        if spare > EPS * self.joules:
+            return None
+        self.throttled_time += tau
+        return end
+
+    def select(self, state):
+        self._catch_up(state)
+        i = self._top
+        self.max_slice = math.inf
+        if self.joules is not None:
+            spare, tau, _ = self._budget_left(state.time)
+            p_idle = self._p_idle
+            # Fastest level that could run until the window ends
+            while i > 0 and (self._power[i] - p_idle) * tau > spare:
+                i -= 1
+            extra = self._power[i] - p_idle
+            if extra * tau > spare and extra > 0:
+                self.max_slice = max(spare, 0.0) / extra
+            else:
+                self.max_slice = tau
+        p = self._power[i]
+        if self.watts is not None and p > self.watts * (1 + EPS):
+            self.over_cap += 1
+        self._slice = (state.time, state.busy_time, p)
+        return self.levels[i]
+
+    # -----------------------------------------------------------------------
+    # REPORTING
+    # -----------------------------------------------------------------------
+    def window_violations(self):
+        """Windows whose energy went over `joules` (0 without a window budget)."""
+        if self.joules is None:
+            return 0
+        limit = self.joules * (1 + EPS)
+        return sum(1 for e in self.window_energy if e > limit)
+
+    def __repr__(self):
+        return f"PowerCapGovernor(watts={self.watts}, joules={self.joules}, window={self.window})"
+
+
+# ---------------------------------------------------------------------------
+# CAPPED RUNS
+# ---------------------------------------------------------------------------
+def run_power_capped(processes, watts=None, joules=None, window=100.0, quantum=2,
+                     discipline="rr", model=None, record_trace=False):
+    """Simulate `processes` under a power cap and report what it cost.
+
+       Returns (scheduler, report). The report is a dict of throughput
+       (jobs and cycles completed per unit time), average and tail
+       (p50/p95/p99) turnaround, energy, average and peak-window power,
+       time held idle by the budget, and violations: slices over
+       `watts` and windows over `joules`."""
+    import numpy as np
+    from scheduler import Scheduler
+
+    governor = PowerCapGovernor(watts=watts, joules=joules, window=window)
+    sched = Scheduler(processes, discipline=discipline, quantum=quantum, model=model,
+                      governor=governor, record_trace=record_trace)
+    sched.simulate()
+
+    done = np.asarray(sched.completed_rows(), dtype=np.int64)
+    turnaround = np.asarray(sched.table.column("turnaround"))[done]
+    cycles = float(np.asarray(sched.table.column("burst"))[done].sum())
+    window_energy = np.frombuffer(governor.window_energy, dtype=float)
+    makespan = sched.time
+    n = sched.n_completed
+    if n:
+        p50, p95, p99 = np.percentile(turnaround, (50, 95, 99))
+    else:
+        p50 = p95 = p99 = 0.0
+
+    report = {
+        "watts": watts,
+        "joules": joules,
+        "window": window,
+        "completed": n,
+        "makespan": makespan,
+        "throughput": n / makespan if makespan else 0.0,
+        "cycles_per_time": cycles / makespan if makespan else 0.0,
+        "avg_turnaround": sched.total_turnaround / n if n else 0.0,
+        "p50_turnaround": float(p50),
+        "p95_turnaround": float(p95),
+        "p99_turnaround": float(p99),
+        "energy": float(window_energy.sum()),
+        "avg_power": float(window_energy.sum()) / makespan if makespan else 0.0,
+        "peak_window_power": float(window_energy.max()) / window if len(window_energy) else 0.0,
+        "throttled_time": governor.throttled_time,
+        "cap_violations": governor.over_cap,
+        "window_violations": governor.window_violations(),
+    }
+    return sched, report
+
+
+def cap_sweep(processes, caps, window=100.0, quantum=2, discipline="rr", model=None):
+    """run_power_capped() for each cap in `caps`, as a DataFrame.
+
+       A cap is watts (a number) or a dict of run_power_capped()
+       budget arguments, e.g. {"joules": 150, "window": 100}. Every cap
+       runs the same jobs, so a stream is read into a list first."""
+    import pandas as pd
+    from process_table import ProcessTable
+
+    if not isinstance(processes, (list, tuple, ProcessTable)):
+        processes = list(processes)
+    rows = []
+    for cap in caps:
+        budget = cap if isinstance(cap, dict) else {"watts": cap}
+        budget = {"window": window, **budget}
+        jobs = processes
+        if isinstance(processes, ProcessTable):
+            # A table is run in place, so each cap gets a fresh copy
+            jobs = ProcessTable.from_arrays(processes.pids, processes.column("arrival"),
+                                            processes.column("burst"),
+                                            processes.column("deadline"))
+        _, report = run_power_capped(jobs, quantum=quantum, discipline=discipline,
+                                     model=model, **budget)
+        rows.append(report)
+    return pd.DataFrame(rows)
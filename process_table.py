@@ -0,0 +1,176 @@
+# process_table.py
+import math
+import operator
+from array import array
+from itertools import islice
+
+COLUMNS = ("arrival", "burst", "deadline", "remaining", "completion", "waiting", "turnaround")
+
+
+def _doubles(values):
+    # NumPy arrays are copied as one buffer rather than element by element
+    if hasattr(values, "dtype"):
+        return array("d", values.astype("=f8", copy=False).tobytes())
+    return array("d", values)
+
+
+def round2(values):
+    """round(v, 2) for every value, exactly as Python rounds.
+
+       np.round scales by 100 first, so a value just below a tie (8.895
+       is really 8.89499...) can round the wrong way. The two only
+       disagree right next to a tie, and those few are redone in Python."""
+    import numpy as np
+
+    values = np.asarray(values, dtype=float)
+    out = np.round(values, 2)
+    flat, scaled = out.reshape(-1), values.reshape(-1) * 100
+    tie = np.abs(scaled - np.floor(scaled) - 0.5) < 1e-9 + 1e-12 * np.abs(scaled)
+    near = np.flatnonzero(tie)
+    if len(near):
+        flat[near] = [round(v, 2) for v in values.reshape(-1)[near].tolist()]
+    return out
+
+
+class ProcessTable:
+    """Struct-of-arrays process store: one typed `array` column per
+       field instead of one Python object per process.
+
+       The scheduler runs directly against the row indices of this
+       table; NumPy views of the columns are used for the vectorized
+       completed-job metrics."""
+
+    def __init__(self):
+        self.pids = []
+        self._cols = {name: array("d") for name in COLUMNS}
+
+    def __len__(self):
+        return len(self.pids)
+
+    def append(self, pid, arrival, burst, deadline=None):
+        """Add a process and return its row index.
+
+           Raises BufferError, leaving the table unchanged, while a
+           column() view is alive (see column())."""
+        cols = self._cols
+        try:
+            cols["arrival"].append(arrival)
+            cols["burst"].append(burst)
+            cols["deadline"].append(math.inf if deadline is None else deadline)
+            cols["remaining"].append(burst)
+            cols["completion"].append(0)
+            cols["waiting"].append(0)
+            cols["turnaround"].append(0)
+        except BufferError:
+            n = len(self.pids)
+            for col in cols.values():
+                if len(col) > n:
+                    col.pop()
+            raise BufferError("Cannot append to the process table while a NumPy view of "
+                              "one of its columns is alive; drop the view or copy it") from None
+        self.pids.append(pid)
+        return len(self.pids) - 1
+
+    def reset(self, row, pid, arrival, burst, deadline=None):
+        """Reuse `row` for a new process (streaming replays recycle rows)."""
+        cols = self._cols
+        self.pids[row] = pid
+        cols["arrival"][row] = arrival
+        cols["burst"][row] = burst
+        cols["deadline"][row] = math.inf if deadline is None else deadline
+        cols["remaining"][row] = burst
+        cols["completion"][row] = 0
+        cols["waiting"][row] = 0
+        cols["turnaround"][row] = 0
+
+    @classmethod
+    def from_records(cls, records):
+        """Build a table from {pid, arrival, burst[, deadline]} dicts."""
+        records = list(records)
+        deadline = None
+        if any(r.get("deadline") is not None for r in records):
+            deadline = [math.inf if r.get("deadline") is None else r["deadline"]
+                        for r in records]
+        return cls.from_arrays([r["pid"] for r in records],
+                               [r["arrival"] for r in records],
+                               [r["burst"] for r in records], deadline)
+
+    @classmethod
+    def from_arrays(cls, pids, arrival, burst, deadline=None):
+        """Build a table from column sequences (lists or NumPy arrays)."""
+        table = cls()
+        table.pids = list(pids)
+        n = len(table.pids)
+        cols = table._cols
+        cols["arrival"] = _doubles(arrival)
+        cols["burst"] = _doubles(burst)
+        cols["deadline"] = array("d", [math.inf]) * n if deadline is None else _doubles(deadline)
+        cols["remaining"] = array("d", cols["burst"])
+        for name in ("completion", "waiting", "turnaround"):
+            cols[name] = array("d", bytes(8 * n))
+        if any(len(cols[name]) != n for name in ("arrival", "burst", "deadline")):
+            raise ValueError("pids, arrival, burst and deadline must have the same length")
+        return table
+
+    # -----------------------------------------------------------------------
+    # VIEWS & METRICS
+    # -----------------------------------------------------------------------
+    def column(self, name):
+        """Writable NumPy view of one column, without copying.
+
+           The view pins the column's buffer, so the table cannot grow
+           while it is alive: append() raises BufferError. Keep views
+           short-lived on a table that is still being filled (a streamed
+           run appends as jobs arrive), or .copy() them."""
+        import numpy as np
+
+        return np.frombuffer(self._cols[name], dtype=np.float64)
+
+    def columns(self):
+        return {name: self.column(name) for name in COLUMNS}
+
+    def arrival_order(self):
+        """Row indices in stable arrival order, or None if already sorted."""
+        arrival = self._cols["arrival"]
+        if all(map(operator.le, arrival, islice(arrival, 1, None))):
+            return None
+        return sorted(range(len(arrival)), key=arrival.__getitem__)
+
+    def compute_metrics(self, rows=None):
+        """Fill turnaround and waiting for completed `rows` (all rows by
+           default) in one vectorized pass, rounded as simulate() always
+           has: turnaround to 2 places, waiting to 2 places and >= 0."""
+        import numpy as np
+
+        c = self.columns()
+        idx = slice(None) if rows is None else np.asarray(rows, dtype=np.intp)
+        raw = c["completion"][idx] - c["arrival"][idx]
+        c["turnaround"][idx] = round2(raw)
+        # + 0.0 turns the -0.0 that rounding a tiny negative gives into 0.0
+        c["waiting"][idx] = np.maximum(0.0, round2(raw - c["burst"][idx])) + 0.0
+
+    def to_processes(self, rows):
+        """Materialize `rows` as Process objects, in the order given."""
+        from scheduler import Process
+
+        cols = self._cols
+        pids = self.pids
+        arrival, burst, deadline = cols["arrival"], cols["burst"], cols["deadline"]
+        completion, waiting, turnaround = cols["completion"], cols["waiting"], cols["turnaround"]
+        out = []
+        append = out.append
+        for i in rows:
+            p = Process(pids[i], arrival[i], burst[i], deadline[i])
+            p.remaining = 0
+            p.completion = completion[i]
+            p.waiting = waiting[i]
+            p.turnaround = turnaround[i]
+            append(p)
+        return out
+
+    def to_frame(self, rows=None):
+        import pandas as pd
+
+        df = pd.DataFrame(self.columns(), copy=False)
+        df.insert(0, "pid", self.pids)
+        return df if rows is None else df.iloc[list(rows)]
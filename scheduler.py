@@ -1,89 +1,496 @@
 # scheduler.py
-from energy_module import power, pick_freq, FREQ_LEVELS, P_IDLE
+import math
+from array import array
+from itertools import islice
+
+from disciplines import RoundRobinDiscipline, get_discipline
+from energy_accounting import account
+from energy_module import DEFAULT_MODEL
+from governors import GovernorState, PerformanceGovernor, QueueLengthGovernor, get_governor
+from instrumentation import Instrumentation
+from process_table import ProcessTable
+from trace_recorder import TraceRecorder
+
+
+def _add_ticks(t, k):
+    # t + 1 + 1 + ... (k times) in floating point, in O(log t) steps.
+    # Adding 1 is exact until the sum crosses a power of two, where it
+    # may round; so jump exactly to just below each power of two and
+    # take the crossing tick on its own.
+    while k > 0:
+        edge = 2.0 ** math.frexp(t)[1] if t > 0 else 1.0
+        exact = min(k - 1, max(0, math.ceil(edge - t) - 1))
+        t = (t + exact) + 1
+        k -= exact + 1
+    return t
+
+
+def idle_until(start, due):
+    """Clock time an idle CPU at `start` wakes up for a job due at
+       `due`: `start` plus the fewest whole ticks (at least one) that
+       reach it. The ticks are added as one-at-a-time `+= 1` steps
+       would add them, bit for bit, so jumping the gap in one go lands
+       on the same time as ticking through it."""
+    k = max(1, math.ceil(due - start))
+    t = _add_ticks(start, k)
+    while k > 1 and _add_ticks(start, k - 1) >= due:
+        k -= 1
+        t = _add_ticks(start, k)
+    while t < due:
+        k += 1
+        t = _add_ticks(start, k)
+    return t
+
 
 class Process:
-    def __init__(self, pid, arrival, burst):
+    __slots__ = ("pid", "arrival", "burst", "deadline", "remaining",
+                 "completion", "waiting", "turnaround")
+
+    def __init__(self, pid, arrival, burst, deadline=math.inf):
         self.pid = pid
         self.arrival = arrival
         self.burst = burst
+        self.deadline = deadline
         self.remaining = burst
         self.completion = 0
         self.waiting = 0
         self.turnaround = 0
 
+    def __repr__(self):
+        return f"Process({self.pid!r}, arrival={self.arrival}, burst={self.burst})"
+
+
+class Scheduler:
+    """Single-core scheduling engine. The ready-queue policy is a
+       Discipline (see disciplines.py); DVFS, energy accounting, traces
+       and metrics are shared by all of them."""
 
-class RoundRobinScheduler:
-    def __init__(self, processes, quantum=2, energy_aware=False):
-        self.processes = [Process(**p) for p in processes]
+    def __init__(self, processes, discipline="rr", quantum=2, energy_aware=False, model=None,
+                 keep_completed=True, record_trace=True, governor=None, instrument=None):
+        # The simulation always runs on the rows of a ProcessTable. A
+        # table is used in place and a list of dicts is loaded into one;
+        # any other iterable is an arrival-ordered stream, appended to
+        # the table lazily as arrivals come due.
+        self._source = None
+        self._as_table = isinstance(processes, ProcessTable)
+        if self._as_table:
+            self.table = processes
+        elif isinstance(processes, (list, tuple)):
+            self.table = ProcessTable.from_records(processes)
+        else:
+            self.table = ProcessTable()
+            self._source = processes
+        self._order = self.table.arrival_order() if self._source is None else None
+
+        self.discipline = get_discipline(discipline)
         self.quantum = quantum
         self.energy_aware = energy_aware
+        self.model = DEFAULT_MODEL if model is None else model
+
+        # energy_aware picks between the two original policies; any
+        # other DVFS governor can be passed in explicitly.
+        if governor is None:
+            governor = QueueLengthGovernor() if energy_aware else PerformanceGovernor()
+        self.governor = get_governor(governor)
+        self.keep_completed = keep_completed
+        # Opt-in counters, phase timers and hooks (instrument=True for defaults)
+        self.instrument = Instrumentation() if instrument is True else instrument
         self.time = 0
         self.energy = 0
-        self.gantt = []
-        self.power_trace = []
-    
+        self._streamed = self._source is not None
+        self._started = False
+        self._consumed = 0
+        self._last_arrival = None
+        self._result = None
+
+        # Running totals, available even when completed processes are dropped
+        self.n_completed = 0
+        self.total_waiting = 0
+        self.total_turnaround = 0
+
+        self.trace = None
+        if record_trace:
+            n = len(self.table)
+            self.trace = TraceRecorder(self.model.freq_levels, self.table.pids,
+                                       capacity=max(16, 4 * n))
+
+    @property
+    def gantt(self):
+        return self.trace.gantt
+
+    @property
+    def power_trace(self):
+        return self.trace.power_trace
+
+    def energy_report(self):
+        """Full energy account of the trace so far: idle time and
+           frequency switches included, per process and per level.
+           `energy` itself still counts busy slices only."""
+        if self.trace is None:
+            raise ValueError("energy_report() needs a run with record_trace=True")
+        return account(self.trace, self.model)
+
+    def _arrivals(self, free):
+        """Yield table rows in arrival order, from the first one not yet
+           taken (so a restored run picks up where it stopped)."""
+        start = self._consumed
+        if self._source is None:
+            rows = range(len(self.table)) if self._order is None else self._order
+            for row in islice(rows, start, None):
+                self._consumed += 1
+                yield row
+            return
+
+        table = self.table
+        last = self._last_arrival
+        for p in islice(self._source, start, None):
+            arrival = p["arrival"]
+            if last is not None and arrival < last:
+                raise ValueError(f"Process {p['pid']!r} arrives at {arrival}, "
+                                 f"before the previous arrival at {last}; "
+                                 f"streamed workloads must be sorted by arrival")
+            last = self._last_arrival = arrival
+            if free:
+                row = free.pop()
+                table.reset(row, p["pid"], arrival, p["burst"], p.get("deadline"))
+            else:
+                row = table.append(p["pid"], arrival, p["burst"], p.get("deadline"))
+            self._consumed += 1
+            yield row
+
+    # -----------------------------------------------------------------------
+    # RUNNING
+    # -----------------------------------------------------------------------
+    def _begin(self):
+        """Set up the state a run carries between advance() calls."""
+        self.discipline.reset(self.table, self.quantum)
+        self.governor.reset(self.model)
+        self._state = GovernorState()
+        self._queued = 0
+        self._backlog = 0
+        self._busy = 0
+        self._done = array("l")
+        self._free = []
+        self._consumed = 0
+        self._last_arrival = None
+        self._arrival_iter = self._arrivals(self._free)
+        self._nxt = next(self._arrival_iter, None)
+        self._started = True
+
+    @property
+    def finished(self):
+        return self._result is not None
+
+    def completed_rows(self):
+        """Table rows of the jobs completed so far, in completion order,
+           as an array("l") copy (rows a keep_completed=False stream has
+           recycled are not included)."""
+        return array("l", self._done) if self._started else array("l")
+
     def simulate(self):
-        queue = []
-        completed = []
-        i = 0
+        """Run to completion.
+
+           Returns the completed processes as Process objects, or, when
+           the scheduler was given a ProcessTable, their row indices in
+           completion order (metrics are written to the table)."""
+        self.advance()
+        return self._result
+
+    def steps(self, events=10_000):
+        """Advance in chunks of `events`, yielding progress() after each."""
+        while not self.finished:
+            self.advance(events=events)
+            yield self.progress()
+
+    def advance(self, events=None, until=None):
+        """Run for at most `events` slices / idle jumps, or until the
+           clock reaches `until` (the slice in progress is finished, so
+           the clock may pass it slightly). Returns the events processed."""
+        if self.finished:
+            return 0
+        if not self._started:
+            self._begin()
+
+        discipline = self.discipline
+        push, pop = discipline.push, discipline.pop
+        time_slice, requeue = discipline.time_slice, discipline.requeue
+        complete = discipline.complete
+        preemptive = discipline.preemptive
+        trace = self.trace
+        model = self.model
+        power = model.power
+        table = self.table
+        pids = table.pids
+        arrival = table._cols["arrival"]
+        deadline = table._cols["deadline"]
+        remaining = table._cols["remaining"]
+        completion = table._cols["completion"]
+
+        governor = self.governor
+        select = governor.select
+        throttle = governor.throttle
+        state = self._state
+        f_max = governor.f_max
+        queued = self._queued
+        backlog = self._backlog
+        busy = self._busy
+        done = self._done
+
+        # A stream whose completed rows are not kept recycles them, so
+        # the table only ever holds the jobs currently in the system.
+        recycle = self._source is not None and not self.keep_completed
+        free = self._free
+        arrivals = self._arrival_iter
+        nxt = self._nxt
+
+        record = record_idle = None
+        if trace is not None:
+            record, record_idle = trace.record, trace.record_idle
+
+        # Instrumented runs time each phase through wrapped callables,
+        # so the plain loop only pays one check per slice and arrival.
+        inst = self.instrument
+        if inst is not None:
+            inst.begin()
+            if inst.timers:
+                timed = inst.timed
+                push, pop = timed("queue", push), timed("queue", pop)
+                time_slice, requeue = timed("queue", time_slice), timed("queue", requeue)
+                if complete is not None:
+                    complete = timed("queue", complete)
+                select = timed("frequency", select)
+                power = timed("energy", power)
+                arrivals = inst.timed_iter("admission", arrivals)
+                if trace is not None:
+                    record, record_idle = timed("trace", record), timed("trace", record_idle)
+
+        limit = -1 if events is None else events
+        until = math.inf if until is None else until
+        count = 0
 
         while True:
 
             # Add new arrivals
-            while i < len(self.processes) and self.processes[i].arrival <= self.time:
-                queue.append(self.processes[i])
-                i += 1
+            while nxt is not None and arrival[nxt] <= self.time:
+                if inst is not None:
+                    inst.arrival(arrival[nxt], pids[nxt])
+                push(nxt)
+                queued += 1
+                backlog += remaining[nxt]
+                nxt = next(arrivals, None)
 
             # Nothing left to do
-            if not queue and i >= len(self.processes):
+            if not queued and nxt is None:
+                break
+
+            # Pause between events
+            if count == limit or self.time >= until:
                 break
+            count += 1
 
-            # CPU idle
-            if not queue:
-                self.time += 1
-                self.power_trace.append((self.time, P_IDLE))
+            # CPU idle: jump straight to the next arrival as one segment.
+            # The clock still moves in whole ticks, as it did when idle
+            # time was advanced one unit per loop iteration.
+            if not queued:
+                start = self.time
+                self.time = idle_until(start, arrival[nxt])
+                if trace is not None:
+                    record_idle(start, self.time, model.p_idle)
+                if inst is not None:
+                    inst.idle(start, self.time, model.p_idle)
                 continue
 
-            current = queue.pop(0)
+            # A budgeted governor may hold the CPU idle with work queued
+            if throttle is not None:
+                state.time = self.time
+                state.busy_time = busy
+                resume = throttle(state)
+                if resume is not None:
+                    start = self.time
+                    self.time = resume
+                    if trace is not None:
+                        record_idle(start, self.time, model.p_idle)
+                    if inst is not None:
+                        inst.idle(start, self.time, model.p_idle)
+                    continue
+
+            current = pop()
+            queued -= 1
 
             # Frequency selection
-            freq_label = pick_freq(len(queue)) if self.energy_aware else "HIGH"
-            freq = FREQ_LEVELS[freq_label]
+            rem = remaining[current]
+            state.time = self.time
+            state.queue_len = queued
+            state.remaining = rem
+            state.backlog = backlog
+            state.busy_time = busy
+            state.slack = deadline[current] - self.time - rem / f_max
+            freq_label = state.level = select(state)
+            freq = model.freq_levels[freq_label]
             P = power(freq)
 
             # --------------------
             # CORRECT DVFS MATH
             # --------------------
-            max_cycles = self.quantum * freq
-            cycles_done = min(current.remaining, max_cycles)
+            budget = time_slice(current)
+            if throttle is not None and governor.max_slice < budget:
+                budget = governor.max_slice
+            preempt_at = None
+            if preemptive and nxt is not None and arrival[nxt] - self.time < budget:
+                budget = preempt_at = arrival[nxt] - self.time
+            max_cycles = budget * freq
+            cycles_done = min(rem, max_cycles)
             exec_time = cycles_done / freq  # REAL time spent
             # --------------------
 
             # Update timeline
-            self.gantt.append((self.time, current.pid, freq_label))
+            start = self.time
             self.time += exec_time
-            current.remaining -= cycles_done
+            if preempt_at is not None and cycles_done < rem:
+                # Land exactly on the arrival that preempts this slice
+                self.time = arrival[nxt]
+            remaining[current] -= cycles_done
+            backlog -= cycles_done
+            busy += exec_time
 
             # Energy
             self.energy += P * exec_time
-            self.power_trace.append((self.time, P))
+            if trace is not None:
+                record(start, self.time, pids[current], freq_label, P)
+            if inst is not None:
+                inst.slice(start, self.time, pids[current], freq_label, P, cycles_done,
+                           preempt_at is not None and cycles_done < rem,
+                           remaining[current] <= 0)
 
-            if current.remaining > 0:
-                queue.append(current)
+            if remaining[current] > 0:
+                requeue(current, exec_time)
+                queued += 1
             else:
-                current.completion = self.time
-                completed.append(current)
+                completion[current] = self.time
+                if complete is not None:
+                    complete(current, exec_time)
+                if recycle:
+                    self._complete_row(current)
+                    free.append(current)
+                else:
+                    done.append(current)
+
+        self._queued = queued
+        self._backlog = backlog
+        self._busy = busy
+        self._nxt = nxt
+        if inst is not None:
+            inst.end(count)
+        if not queued and nxt is None:
+            if governor.finish is not None:
+                state.time = self.time
+                state.busy_time = busy
+                governor.finish(state)
+            self._result = self._finish(done)
+        return count
+
+    def progress(self):
+        """Metrics of the run so far, without disturbing it."""
+        n = self.n_completed
+        total_waiting = self.total_waiting
+        total_turnaround = self.total_turnaround
+        done = self._done if self._started and not self.finished else ()
+        if done:
+            cols = self.table.columns()
+            turnaround = cols["completion"][done] - cols["arrival"][done]
+            n += len(done)
+            total_waiting += float((turnaround - cols["burst"][done]).clip(0).sum())
+            total_turnaround += float(turnaround.sum())
+
+        pending = 0 if not self._started or self._nxt is None else 1
+        return {
+            "time": self.time,
+            "energy": self.energy,
+            "arrived": self._consumed - pending,
+            "queued": self._queued if self._started else 0,
+            "completed": n,
+            "avg_waiting": total_waiting / n if n else 0.0,
+            "avg_turnaround": total_turnaround / n if n else 0.0,
+            "finished": self.finished,
+        }
+
+    # -----------------------------------------------------------------------
+    # CHECKPOINTS
+    # -----------------------------------------------------------------------
+    def checkpoint(self, path):
+        """Save the whole run (table, queues, governor, trace) to `path`."""
+        import os
+        import pickle
+
+        tmp = f"{path}.tmp"
+        with open(tmp, "wb") as f:
+            pickle.dump(self, f, pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+
+    @classmethod
+    def restore(cls, path, source=None):
+        """Load a run saved by checkpoint(). A streamed run needs its
+           `source` again; the records already taken are skipped."""
+        import pickle
+
+        with open(path, "rb") as f:
+            sched = pickle.load(f)
+        if sched._streamed:
+            if source is None:
+                raise ValueError("This run replays a stream; pass the same source to restore()")
+            sched._source = source
+        if sched._started:
+            sched._arrival_iter = sched._arrivals(sched._free)
+        return sched
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        # Generators cannot be pickled; restore() rebuilds them
+        state["_arrival_iter"] = None
+        if self._streamed:
+            state["_source"] = None
+        return state
+
+    def _finish(self, done):
+        """Fill metrics for the completed rows and build simulate()'s result."""
+        table = self.table
+
+        # Waiting & turnaround, vectorized over the completed rows
+        if done:
+            table.compute_metrics(done)
+            waiting, turnaround = table.column("waiting"), table.column("turnaround")
+            self.n_completed += len(done)
+            self.total_waiting += float(waiting[done].sum())
+            self.total_turnaround += float(turnaround[done].sum())
+
+        if self._as_table:
+            return done
+        if not self.keep_completed:
+            return []
+        return table.to_processes(done)
+
+    def _complete_row(self, row):
+        """Scalar metrics for one row that is about to be recycled."""
+        cols = self.table._cols
+        turnaround = cols["completion"][row] - cols["arrival"][row]
+        waiting = max(0, round(turnaround - cols["burst"][row], 2))
+        turnaround = round(turnaround, 2)
+        cols["waiting"][row] = waiting
+        cols["turnaround"][row] = turnaround
+
+        self.n_completed += 1
+        self.total_waiting += waiting
+        self.total_turnaround += turnaround
 
-        # Waiting & turnaround
-        for p in completed:
-            p.turnaround = p.completion - p.arrival
-            p.waiting = p.turnaround - p.burst
 
-            # Clamp negatives due to float precision
-            p.waiting = max(0, round(p.waiting, 2))
-            p.turnaround = round(p.turnaround, 2)
 
-        return completed
+class RoundRobinScheduler(Scheduler):
+    def __init__(self, processes, quantum=2, energy_aware=False, model=None,
+                 keep_completed=True, record_trace=True, governor=None, instrument=None):
+        super().__init__(processes, RoundRobinDiscipline(), quantum=quantum,
+                         energy_aware=energy_aware, model=model,
+                         keep_completed=keep_completed, record_trace=record_trace,
+                         governor=governor, instrument=instrument)
 
 
     # def simulate(self):
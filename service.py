@@ -0,0 +1,592 @@
+# service.py
+"""Local simulation service: an asyncio HTTP/JSON API in front of a
+   pool of worker processes, so simulations run off the web process
+   and in parallel.
+
+       python -m service --port 8765 --workers 4
+
+       POST /jobs               submit a simulate or sweep job
+       GET  /jobs/<id>          its status, progress and result
+       GET  /jobs/<id>/events   progress as JSON lines until it ends
+       GET  /health
+
+   Path workloads are read from the --workload-dir directory only (and
+   refused without one). A job's id is the hash of its normalized
+   request, so identical requests share one run (and its result); a
+   generate workload without a seed is given one first. ServiceClient
+   is the matching urllib client; the Streamlit pages use it when the
+   EARR_SERVICE environment variable points at a running service."""
+import argparse
+import asyncio
+import itertools
+import inspect
+import json
+import os
+import secrets
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from sweep import _digest
+
+POLICIES = {"RR": False, "EARR": True}
+DEFAULT_PORT = 8765
+FINAL = ("done", "failed")
+
+
+# ---------------------------------------------------------------------------
+# JOB SPECS
+# ---------------------------------------------------------------------------
+def normalize(spec, workload_dir=None):
+    """Fill defaults and validate a job request; raises ValueError.
+
+       simulate -- workload: {"generate": {n, arrival, burst, seed, ...}}
+                   (workload.generate_workload options; a missing seed
+                   is drawn here), {"records": [...]}
+                   or {"path": "jobs.csv"}, relative to `workload_dir`;
+                   policy, quantum, discipline, governor
+       sweep    -- workloads: {name: workload}, quanta, policies, plus
+                   the simulate options; run as one simulate job each"""
+    if not isinstance(spec, dict):
+        raise ValueError(f"A job request must be a JSON object, not {type(spec).__name__}")
+    kind = spec.get("kind", "simulate")
+    common = {
+        "discipline": spec.get("discipline", "rr"),
+        "governor": spec.get("governor"),
+    }
+    if kind == "simulate":
+        if spec.get("policy", "RR") not in POLICIES:
+            raise ValueError(f"Unknown policy {spec.get('policy')!r}; "
+                             f"expected one of {sorted(POLICIES)}")
+        return {"kind": kind, "workload": _workload(spec.get("workload"), workload_dir),
+                "policy": spec.get("policy", "RR"), "quantum": _quantum(spec.get("quantum", 2)),
+                **common}
+    if kind == "sweep":
+        workloads = spec.get("workloads")
+        if not isinstance(workloads, dict) or not workloads:
+            raise ValueError("A sweep needs a non-empty 'workloads' object")
+        policies = spec.get("policies", list(POLICIES))
+        quanta = spec.get("quanta", [2])
+        if not isinstance(policies, list) or not isinstance(quanta, list):
+            raise ValueError("A sweep's 'policies' and 'quanta' must be lists")
+        for policy in policies:
+            if policy not in POLICIES:
+                raise ValueError(f"Unknown policy {policy!r}; expected one of {sorted(POLICIES)}")
+        return {"kind": kind,
+                "workloads": {name: _workload(w, workload_dir) for name, w in workloads.items()},
+                "quanta": [_quantum(q) for q in quanta], "policies": policies, **common}
+    raise ValueError(f"Unknown job kind {kind!r}; expected simulate or sweep")
+
+
+def _quantum(quantum):
+    if isinstance(quantum, bool) or not isinstance(quantum, (int, float)) or not quantum > 0:
+        raise ValueError(f"quantum must be a positive number, got {quantum!r}")
+    return quantum
+
+
+def _workload(workload, workload_dir=None):
+    if isinstance(workload, dict) and set(workload) == {"path", "stamp"}:
+        # Already normalized: a sweep's children are submitted this way
+        workload = {"path": workload["path"]}
+    if not isinstance(workload, dict) or len(workload) != 1:
+        raise ValueError("workload must be one of {generate: {...}}, {records: [...]}, {path: ...}")
+    (source, value), = workload.items()
+    if source == "generate":
+        if not isinstance(value, dict) or "n" not in value:
+            raise ValueError("generate workloads need an object with 'n'")
+        unknown = sorted(set(value) - {"n"} - _generate_options())
+        if unknown:
+            raise ValueError(f"Unknown generate options {unknown}; "
+                             f"expected {sorted(_generate_options())}")
+        value = dict(value)
+        if value.get("seed") is None:
+            # An unseeded run is a fresh sample, not a repeat of the last one
+            value["seed"] = secrets.randbits(32)
+        return {"generate": value}
+    if source == "records":
+        if not isinstance(value, list) or not all(isinstance(r, dict) for r in value):
+            raise ValueError("records workloads need a list of {pid, arrival, burst} objects")
+        return {"records": value}
+    if source == "path":
+        path = _workload_path(value, workload_dir)
+        # The file's size and mtime are part of the key, so an edited
+        # trace is simulated again
+        st = os.stat(path)
+        return {"path": path, "stamp": [st.st_size, st.st_mtime_ns]}
+    raise ValueError(f"Unknown workload source {source!r}")
+
+
+def _generate_options():
+    # Keyword options of the generators; `model` is an object, not JSON
+    from workload import generate_arrays, generate_workload
+
+    names = set()
+    for func in (generate_arrays, generate_workload):
+        names.update(name for name, p in inspect.signature(func).parameters.items()
+                     if p.kind is p.POSITIONAL_OR_KEYWORD)
+    return names - {"n", "model"}
+
+
+def _workload_path(path, workload_dir):
+    # Requests may only name files inside workload_dir (links resolved)
+    if workload_dir is None:
+        raise ValueError("path workloads are disabled; start the service with --workload-dir")
+    if not isinstance(path, str):
+        raise ValueError("path workloads need a file name")
+    root = os.path.realpath(workload_dir)
+    full = os.path.realpath(os.path.join(root, path))
+    if os.path.commonpath([root, full]) != root:
+        raise ValueError(f"{path!r} is outside the workload directory")
+    return full
+
+
+def job_id(spec):
+    return _digest(spec)[:16]
+
+
+# ---------------------------------------------------------------------------
+# WORKER SIDE (runs in the process pool)
+# ---------------------------------------------------------------------------
+def run_simulation(spec, jid, data_dir, progress=None, every=20_000, max_processes=10_000):
+    """Simulate one normalized spec, putting (id, progress) on the
+       `progress` queue as it goes. Writes the trace to data_dir and
+       returns the result dict."""
+    from scheduler import Scheduler
+    from trace_io import write_trace
+    from workload import generate_workload, stream_workload
+
+    workload = spec["workload"]
+    total = None
+    keep = True
+    if "generate" in workload:
+        options = dict(workload["generate"])
+        n = options.pop("n")
+        processes, total = generate_workload(n, **options), n
+    elif "records" in workload:
+        processes = workload["records"]
+        total = len(processes)
+    else:
+        # Files are streamed and completed jobs dropped, as in main.py
+        processes, keep = stream_workload(workload["path"]), False
+
+    sched = Scheduler(processes, discipline=spec["discipline"], quantum=spec["quantum"],
+                      energy_aware=POLICIES[spec["policy"]], governor=spec["governor"],
+                      keep_completed=keep)
+    # The first report also tells the service the job has left the queue
+    states = itertools.chain([sched.progress()], sched.steps(events=every))
+    for state in states:
+        if progress is not None:
+            state["fraction"] = state["arrived"] / total if total else None
+            progress.put((jid, state))
+
+    path = write_trace(os.path.join(data_dir, f"{jid}.trace"), sched,
+                       {"policy": spec["policy"], "quantum": spec["quantum"]})
+    done = sched.progress()
+    result = {
+        "policy": spec["policy"],
+        "quantum": spec["quantum"],
+        "discipline": sched.discipline.name,
+        "governor": sched.governor.name,
+        "energy": sched.energy,
+        "total_energy": sched.energy_report().total,
+        "makespan": sched.time,
+        "n_completed": done["completed"],
+        "avg_waiting": done["avg_waiting"],
+        "avg_turnaround": done["avg_turnaround"],
+        "trace": path,
+    }
+    if keep and done["completed"] <= max_processes:
+        frame = sched.table.to_frame(sched.completed_rows())
+        result["processes"] = frame[["pid", "arrival", "burst", "completion",
+                                     "waiting", "turnaround"]].to_dict("records")
+    return result
+
+
+# ---------------------------------------------------------------------------
+# SERVICE
+# ---------------------------------------------------------------------------
+class Job:
+    """One submitted request and what is known about it so far."""
+
+    def __init__(self, jid, spec):
+        self.id = jid
+        self.spec = spec
+        self.status = "queued"
+        self.progress = {}
+        self.result = None
+        self.error = None
+        self.submitted = time.time()
+        self.ended = None
+        # Running sweeps waiting on this job, which keep it from eviction
+        self.pins = 0
+        self.finished = asyncio.Event()
+        self.listeners = []
+
+    def update(self, **fields):
+        for name, value in fields.items():
+            setattr(self, name, value)
+        view = self.to_dict(result=False)
+        for queue in self.listeners:
+            queue.put_nowait(view)
+        if self.status in FINAL:
+            self.ended = time.time()
+            self.finished.set()
+
+    def to_dict(self, result=True):
+        out = {"id": self.id, "kind": self.spec["kind"], "status": self.status,
+               "progress": self.progress, "error": self.error}
+        if result:
+            out["result"] = self.result
+        return out
+
+
+class SimulationService:
+    """Job table, dedupe and the worker pool behind the HTTP API.
+
+       Past `max_jobs`, the longest-finished jobs are forgotten and
+       their traces deleted -- but only once they have been finished for
+       `trace_ttl` seconds (clients may still open the trace) and no
+       running or retained sweep refers to them. Path workloads are
+       resolved inside `workload_dir`. An event stream repeats the job
+       every `heartbeat` seconds while nothing changes, so a client's
+       read timeout only fires when the service is gone."""
+
+    heartbeat = 5.0
+
+    def __init__(self, workers=None, data_dir=None, max_jobs=1000, every=20_000,
+                 workload_dir=None, trace_ttl=3600.0):
+        self.workers = workers or os.cpu_count() or 1
+        self.data_dir = data_dir or os.path.join(tempfile.gettempdir(), "earr_service")
+        self.workload_dir = workload_dir
+        self.max_jobs = max_jobs
+        self.trace_ttl = trace_ttl
+        self.every = every
+        self.jobs = {}
+        self._pool = None
+        self._manager = None
+        self._progress = None
+
+    async def start(self):
+        import multiprocessing
+
+        os.makedirs(self.data_dir, exist_ok=True)
+        self._pool = ProcessPoolExecutor(self.workers)
+        self._manager = multiprocessing.Manager()
+        self._progress = self._manager.Queue()
+        self._pump = asyncio.create_task(self._pump_progress())
+
+    async def close(self):
+        self._progress.put(None)
+        await self._pump
+        self._pool.shutdown(cancel_futures=True)
+        self._manager.shutdown()
+
+    async def _pump_progress(self):
+        # Workers report through a manager queue; a thread blocks on it
+        loop = asyncio.get_running_loop()
+        while True:
+            item = await loop.run_in_executor(None, self._progress.get)
+            if item is None:
+                return
+            jid, state = item
+            job = self.jobs.get(jid)
+            if job is not None and job.status not in FINAL:
+                job.update(status="running", progress=state)
+
+    # -----------------------------------------------------------------------
+    # JOBS
+    # -----------------------------------------------------------------------
+    def submit(self, spec):
+        """The job for `spec`, creating and scheduling it unless an
+           identical one is queued, running or done (failed ones rerun)."""
+        spec = normalize(spec, self.workload_dir)
+        jid = job_id(spec)
+        job = self.jobs.get(jid)
+        if job is not None and job.status != "failed":
+            return job
+        job = self.jobs[jid] = Job(jid, spec)
+        runner = self._simulate if spec["kind"] == "simulate" else self._sweep
+        asyncio.create_task(runner(job))
+        self._evict()
+        return job
+
+    async def _simulate(self, job):
+        loop = asyncio.get_running_loop()
+        try:
+            result = await loop.run_in_executor(self._pool, run_simulation, job.spec, job.id,
+                                                 self.data_dir, self._progress, self.every)
+        except Exception as e:
+            job.update(status="failed", error=f"{type(e).__name__}: {e}")
+        else:
+            job.update(status="done", result=result, progress={**job.progress, "fraction": 1.0})
+
+    async def _sweep(self, job):
+        spec = job.spec
+        points = [(name, quantum, policy)
+                  for name in spec["workloads"] for quantum in spec["quanta"]
+                  for policy in spec["policies"]]
+        children = []
+        try:
+            for name, quantum, policy in points:
+                child = self.submit({"kind": "simulate", "workload": spec["workloads"][name],
+                                     "quantum": quantum, "policy": policy,
+                                     "discipline": spec["discipline"],
+                                     "governor": spec["governor"]})
+                child.pins += 1
+                children.append(child)
+        except (ValueError, OSError) as e:
+            # e.g. a workload file removed since the sweep was submitted
+            for child in children:
+                child.pins -= 1
+            job.update(status="failed", error=f"{type(e).__name__}: {e}")
+            return
+        job.update(status="running", progress={"done": 0, "total": len(children), "fraction": 0.0})
+
+        async def finished(child):
+            await child.finished.wait()
+            done = job.progress["done"] + 1
+            job.update(progress={"done": done, "total": len(children),
+                                 "fraction": done / len(children)})
+
+        try:
+            await asyncio.gather(*(finished(child) for child in children))
+        finally:
+            for child in children:
+                child.pins -= 1
+        failed = [child for child in children if child.status == "failed"]
+        if failed:
+            job.update(status="failed", error=f"{len(failed)} of {len(children)} runs failed: "
+                                              f"{failed[0].error}")
+            return
+        rows = []
+        for (name, _, _), child in zip(points, children):
+            row = {k: v for k, v in child.result.items() if k != "processes"}
+            rows.append({"workload": name, **row})
+        job.update(status="done", result={"rows": rows})
+
+    def _evict(self):
+        # Drop the longest-finished jobs (and their traces) past max_jobs
+        excess = len(self.jobs) - self.max_jobs
+        if excess <= 0:
+            return
+        now = time.time()
+        # Traces listed in a sweep's result rows stay while the sweep does
+        referenced = {row["trace"] for job in self.jobs.values()
+                      if job.spec["kind"] == "sweep" and job.result for row in job.result["rows"]}
+        done = [job for job in self.jobs.values() if job.status in FINAL]
+        for job in sorted(done, key=lambda job: job.ended):
+            if excess <= 0:
+                break
+            if job.pins or now - job.ended < self.trace_ttl:
+                continue
+            trace = (job.result or {}).get("trace")
+            if trace in referenced:
+                continue
+            del self.jobs[job.id]
+            excess -= 1
+            if trace and os.path.exists(trace):
+                os.remove(trace)
+
+    # -----------------------------------------------------------------------
+    # HTTP
+    # -----------------------------------------------------------------------
+    async def serve(self, host="127.0.0.1", port=DEFAULT_PORT):
+        await self.start()
+        server = await asyncio.start_server(self._handle, host, port)
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            await self.close()
+
+    async def _handle(self, reader, writer):
+        try:
+            method, path, body = await _read_request(reader)
+            await self._route(method, path, body, writer)
+        except ValueError as e:
+            _respond(writer, 400, {"error": str(e)})
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        except Exception as e:
+            # A bug in one request must not take the connection handler down
+            _respond(writer, 500, {"error": f"{type(e).__name__}: {e}"})
+        finally:
+            try:
+                await writer.drain()
+                writer.close()
+            except ConnectionError:
+                pass
+
+    async def _route(self, method, path, body, writer):
+        parts = [p for p in path.split("?")[0].split("/") if p]
+        if method == "GET" and parts == ["health"]:
+            counts = {}
+            for job in self.jobs.values():
+                counts[job.status] = counts.get(job.status, 0) + 1
+            _respond(writer, 200, {"status": "ok", "workers": self.workers, "jobs": counts})
+        elif method == "POST" and parts == ["jobs"]:
+            try:
+                spec = json.loads(body or b"{}")
+            except json.JSONDecodeError as e:
+                raise ValueError(f"Request body is not JSON: {e}") from None
+            try:
+                job = self.submit(spec)
+            except OSError as e:
+                raise ValueError(str(e)) from None
+            _respond(writer, 202, job.to_dict())
+        elif method == "GET" and len(parts) in (2, 3) and parts[0] == "jobs":
+            job = self.jobs.get(parts[1])
+            if job is None:
+                _respond(writer, 404, {"error": f"No job {parts[1]!r}"})
+            elif len(parts) == 2:
+                _respond(writer, 200, job.to_dict())
+            elif parts[2] == "events":
+                await self._stream(job, writer)
+            else:
+                _respond(writer, 404, {"error": f"No route {path!r}"})
+        else:
+            _respond(writer, 404, {"error": f"No route {method} {path!r}"})
+
+    async def _stream(self, job, writer):
+        # One JSON line per update, then the final job with its result
+        writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: application/x-ndjson\r\n"
+                     b"Connection: close\r\n\r\n")
+        queue = asyncio.Queue()
+        job.listeners.append(queue)
+        try:
+            writer.write(json.dumps(job.to_dict(result=False)).encode() + b"\n")
+            await writer.drain()
+            while job.status not in FINAL:
+                try:
+                    update = await asyncio.wait_for(queue.get(), self.heartbeat)
+                except asyncio.TimeoutError:
+                    update = job.to_dict(result=False)
+                writer.write(json.dumps(update).encode() + b"\n")
+                await writer.drain()
+            writer.write(json.dumps(job.to_dict()).encode() + b"\n")
+        finally:
+            job.listeners.remove(queue)
+
+
+async def _read_request(reader):
+    line = await reader.readline()
+    if not line:
+        raise ConnectionError("client closed the connection")
+    try:
+        method, path, _ = line.decode("latin-1").split(" ", 2)
+    except ValueError:
+        raise ValueError("Malformed request line") from None
+    length = 0
+    while True:
+        header = await reader.readline()
+        if header in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = header.decode("latin-1").partition(":")
+        if name.strip().lower() == "content-length":
+            length = int(value)
+    body = await reader.readexactly(length) if length else b""
+    return method, path, body
+
+
+def _respond(writer, status, payload):
+    reason = {200: "OK", 202: "Accepted", 400: "Bad Request", 404: "Not Found",
+              500: "Internal Server Error"}[status]
+    body = json.dumps(payload).encode()
+    writer.write(f"HTTP/1.1 {status} {reason}\r\nContent-Type: application/json\r\n"
+                 f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode() + body)
+
+
+# ---------------------------------------------------------------------------
+# CLIENT
+# ---------------------------------------------------------------------------
+class ServiceClient:
+    """Blocking client for a running service (standard library only)."""
+
+    def __init__(self, url=f"http://127.0.0.1:{DEFAULT_PORT}", timeout=10):
+        self.url = url.rstrip("/")
+        self.timeout = timeout
+
+    def _call(self, method, path, payload=None):
+        import urllib.error
+        import urllib.request
+
+        data = None if payload is None else json.dumps(payload).encode()
+        request = urllib.request.Request(self.url + path, data=data, method=method,
+                                         headers={"Content-Type": "application/json"})
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                return json.load(response)
+        except urllib.error.HTTPError as e:
+            raise ValueError(json.load(e).get("error", str(e))) from None
+
+    def health(self):
+        return self._call("GET", "/health")
+
+    def submit(self, spec):
+        """Submit a job; returns its dict (id, status, progress, ...)."""
+        return self._call("POST", "/jobs", spec)
+
+    def job(self, jid):
+        return self._call("GET", f"/jobs/{jid}")
+
+    def events(self, jid, timeout=None):
+        """Yield progress updates as they happen; the last one is the
+           finished job with its result. `timeout` (default: the
+           client's) bounds the wait for each line; the service sends
+           one at least every few seconds while the job runs."""
+        import urllib.request
+
+        timeout = self.timeout if timeout is None else timeout
+        with urllib.request.urlopen(f"{self.url}/jobs/{jid}/events",
+                                    timeout=timeout) as response:
+            for line in response:
+                yield json.loads(line)
+
+    def wait(self, jid, poll=0.2, timeout=None, callback=None):
+        """Poll until the job ends, calling `callback(job)` on each poll;
+           returns its result or raises RuntimeError if it failed."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            job = self.job(jid)
+            if callback is not None:
+                callback(job)
+            if job["status"] == "done":
+                return job["result"]
+            if job["status"] == "failed":
+                raise RuntimeError(job["error"])
+            if deadline is not None and time.monotonic() > deadline:
+                raise TimeoutError(f"Job {jid} still {job['status']} after {timeout}s")
+            time.sleep(poll)
+
+    def run(self, spec, **wait_options):
+        """submit() then wait() for the result."""
+        return self.wait(self.submit(spec)["id"], **wait_options)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m service", description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--workers", type=int, help="worker processes (default: CPU count)")
+    parser.add_argument("--data-dir", help="where run traces are kept")
+    parser.add_argument("--workload-dir",
+                        help="directory path workloads are read from (default: none allowed)")
+    parser.add_argument("--trace-ttl", type=float, default=3600.0,
+                        help="seconds a finished job's trace is kept before it may be "
+                             "evicted (default 3600)")
+    args = parser.parse_args(argv)
+
+    service = SimulationService(workers=args.workers, data_dir=args.data_dir,
+                                workload_dir=args.workload_dir, trace_ttl=args.trace_ttl)
+    print(f"serving on http://{args.host}:{args.port} with {service.workers} workers",
+          file=sys.stderr)
+    try:
+        asyncio.run(service.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
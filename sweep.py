@@ -0,0 +1,138 @@
+# sweep.py
+import csv
+import hashlib
+import itertools
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from energy_module import DEFAULT_MODEL
+from scheduler import RoundRobinScheduler
+
+FIELDS = ["key", "process_set", "n_processes", "quantum", "energy_aware",
+          "freq_levels", "k", "p_idle", "energy", "avg_waiting",
+          "avg_turnaround", "makespan"]
+
+
+def _digest(obj):
+    blob = json.dumps(obj, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(blob.encode()).hexdigest()
+
+
+def config_key(config):
+    """Stable hash of everything that determines a simulation result."""
+    return _digest({
+        "processes": config.get("processes_digest") or _digest(config["processes"]),
+        "quantum": config["quantum"],
+        "energy_aware": bool(config["energy_aware"]),
+        "model": config["model"].to_dict(),
+    })
+
+
+def sweep_grid(process_sets, quanta, energy_aware=(False, True), models=(DEFAULT_MODEL,)):
+    """Yield one config dict per point of the sweep grid.
+
+       `process_sets` is a dict of name -> process list (a plain list is
+       numbered 0, 1, ...). Each process list is hashed once."""
+    if not isinstance(process_sets, dict):
+        process_sets = dict(enumerate(process_sets))
+
+    for name, processes in process_sets.items():
+        digest = _digest(processes)
+        for quantum, aware, model in itertools.product(quanta, energy_aware, models):
+            config = {"process_set": name, "processes": processes,
+                      "processes_digest": digest, "quantum": quantum,
+                      "energy_aware": aware, "model": model}
+            config["key"] = config_key(config)
+            yield config
+
+
+def run_config(config):
+    """Simulate one configuration and return its result row."""
+    sched = RoundRobinScheduler(config["processes"], quantum=config["quantum"],
+                                energy_aware=config["energy_aware"], model=config["model"])
+    completed = sched.simulate()
+    n = max(1, len(completed))
+    model = config["model"]
+    return {
+        "key": config["key"],
+        "process_set": config["process_set"],
+        "n_processes": len(completed),
+        "quantum": config["quantum"],
+        "energy_aware": bool(config["energy_aware"]),
+        "freq_levels": json.dumps(model.freq_levels, sort_keys=True),
+        "k": model.k,
+        "p_idle": model.p_idle,
+        "energy": sched.energy,
+        "avg_waiting": sum(p.waiting for p in completed) / n,
+        "avg_turnaround": sum(p.turnaround for p in completed) / n,
+        "makespan": sched.time,
+    }
+
+
+def _run_chunk(configs):
+    return [run_config(c) for c in configs]
+
+
+def _chunks(items, size):
+    it = iter(items)
+    while True:
+        chunk = list(itertools.islice(it, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def completed_keys(path):
+    """Keys of configurations already stored in a sweep CSV.
+
+       A trailing row cut short by an interrupted run is dropped from
+       the file so appending can carry on cleanly."""
+    if not os.path.exists(path):
+        return set()
+
+    with open(path, "rb+") as f:
+        data = f.read()
+        if data and not data.endswith(b"\n"):
+            f.truncate(data.rfind(b"\n") + 1)
+
+    with open(path, newline="") as f:
+        return {row["key"] for row in csv.DictReader(f)
+                if row.get("makespan") not in (None, "")}
+
+
+def run_sweep(configs, out_path, workers=None, chunksize=32):
+    """Run every config not yet in `out_path`, appending rows as they finish.
+
+       Configs are shipped to a ProcessPoolExecutor in chunks of
+       `chunksize`, so a process list shared by many configs is pickled
+       once per chunk. Returns the number of newly simulated configs."""
+    done = completed_keys(out_path)
+    todo, seen = [], set(done)
+    for config in configs:
+        if config["key"] not in seen:
+            seen.add(config["key"])
+            todo.append(config)
+    if not todo:
+        return 0
+
+    new_file = not os.path.exists(out_path) or os.path.getsize(out_path) == 0
+    with open(out_path, "a", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=FIELDS)
+        if new_file:
+            writer.writeheader()
+
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(_run_chunk, chunk) for chunk in _chunks(todo, chunksize)]
+            for future in as_completed(futures):
+                writer.writerows(future.result())
+                f.flush()
+
+    return len(todo)
+
+
+def load_results(path):
+    import pandas as pd
+
+    # The CSV holds repr() floats; read them back exactly
+    return pd.read_csv(path, float_precision="round_trip")
@@ -0,0 +1,67 @@
+# tests/reference.py
+"""The original Round Robin loop, kept verbatim as the parity reference
+   for the engine: a list queue, pick_freq() on the queue length, and
+   an idle CPU advancing one tick per iteration."""
+import random
+
+from energy_module import FREQ_LEVELS, P_IDLE, pick_freq, power
+
+
+def reference_simulate(processes, quantum=2, energy_aware=False):
+    """(energy, gantt, power_trace, [(pid, completion, waiting, turnaround)])."""
+    procs = [dict(p, remaining=p["burst"]) for p in processes]
+    queue, completed = [], []
+    gantt, power_trace = [], []
+    time = energy = 0
+    i = 0
+    while True:
+        while i < len(procs) and procs[i]["arrival"] <= time:
+            queue.append(procs[i])
+            i += 1
+        if not queue and i >= len(procs):
+            break
+        if not queue:
+            time += 1
+            power_trace.append((time, P_IDLE))
+            continue
+
+        current = queue.pop(0)
+        label = pick_freq(len(queue)) if energy_aware else "HIGH"
+        freq = FREQ_LEVELS[label]
+        P = power(freq)
+        cycles = min(current["remaining"], quantum * freq)
+        exec_time = cycles / freq
+        gantt.append((time, current["pid"], label))
+        time += exec_time
+        current["remaining"] -= cycles
+        energy += P * exec_time
+        power_trace.append((time, P))
+        if current["remaining"] > 0:
+            queue.append(current)
+        else:
+            current["completion"] = time
+            completed.append(current)
+
+    metrics = []
+    for p in completed:
+        turnaround = p["completion"] - p["arrival"]
+        waiting = max(0, round(turnaround - p["burst"], 2))
+        metrics.append((p["pid"], p["completion"], waiting, round(turnaround, 2)))
+    return energy, gantt, power_trace, metrics
+
+
+def random_workload(seed, fractional=True):
+    """A small sorted workload with idle gaps; fractional arrivals and
+       bursts exercise the float paths of the engine."""
+    rng = random.Random(seed)
+    t = 0
+    out = []
+    for i in range(rng.randint(1, 12)):
+        if fractional:
+            t += rng.choice([0, 0.3, 1, 1.7, 2.5, 4, 7.25]) * rng.random() * 2
+            burst = round(rng.uniform(0.5, 9), rng.choice([0, 1, 2]))
+        else:
+            t += rng.choice([0, 1, 2, 5, 9])
+            burst = rng.randint(1, 9)
+        out.append({"pid": f"P{i + 1}", "arrival": round(t, 2), "burst": burst})
+    return out
@@ -0,0 +1,37 @@
+# tests/test_batch.py
+import numpy as np
+import pytest
+
+from batch import _idle_until, simulate_batch
+from reference import random_workload, reference_simulate
+from scheduler import idle_until
+
+
+@pytest.mark.parametrize("fractional", [False, True])
+def test_matches_original_loop(fractional):
+    workloads = [random_workload(seed, fractional) for seed in range(150)]
+    df = simulate_batch(workloads, quanta=(0.7, 1, 2, 3.5))
+    assert len(df) == len(workloads) * 4 * 2
+    for row in df.itertuples():
+        energy, _, _, metrics = reference_simulate(workloads[row.workload], row.quantum,
+                                                   row.policy == "EARR")
+        n = len(metrics)
+        assert row.energy == energy
+        # Averages are summed in a different order, so compare loosely
+        assert row.avg_waiting == pytest.approx(sum(m[2] for m in metrics) / n, abs=1e-9)
+        assert row.avg_turnaround == pytest.approx(sum(m[3] for m in metrics) / n, abs=1e-9)
+
+
+def test_idle_until_matches_scalar():
+    rng = np.random.default_rng(0)
+    start = np.array([round(x, int(d)) for x, d in zip(rng.uniform(0, 3000, 5000),
+                                                       rng.integers(0, 3, 5000))])
+    due = start + rng.choice([1e-9, 0.5, 1.0, 2.5, 40.0, 700.0], 5000)
+    expected = [idle_until(s, d) for s, d in zip(start.tolist(), due.tolist())]
+    assert _idle_until(start, due).tolist() == expected
+
+
+def test_empty_and_single_job_workloads():
+    df = simulate_batch([[], [{"pid": "A", "arrival": 3, "burst": 2}]], policies=("RR",))
+    assert df["energy"].tolist() == [0.0, reference_simulate(
+        [{"pid": "A", "arrival": 3, "burst": 2}])[0]]
@@ -0,0 +1,48 @@
+# tests/test_bench.py
+import json
+
+from benchmarks.bench import (_peak_mb, bench_simulate, compare, load_baseline, machine_info,
+                              save_baseline)
+
+BASE = {"sim": {"events_per_s": 1000.0, "seconds": 1.0, "peak_mb": 10.0}}
+
+
+def test_compare_flags_each_direction():
+    slow = {"events_per_s": 500.0, "seconds": 2.0, "peak_mb": 10.0}
+    assert compare("sim", slow, BASE, 0.25) == [("events_per_s", 1000.0, 500.0)]
+    big = {"events_per_s": 1000.0, "seconds": 1.0, "peak_mb": 20.0}
+    assert compare("sim", big, BASE, 0.25) == [("peak_mb", 10.0, 20.0)]
+    assert compare("sim", {"events_per_s": 900.0, "peak_mb": 11.0}, BASE, 0.25) == []
+    assert compare("other", slow, BASE, 0.25) == []
+
+
+def test_other_machine_checks_memory_only():
+    worse = {"events_per_s": 100.0, "seconds": 9.0, "peak_mb": 30.0}
+    assert compare("sim", worse, BASE, 0.25, timings=False) == [("peak_mb", 10.0, 30.0)]
+
+
+def test_baseline_records_the_machine(tmp_path):
+    path = tmp_path / "baseline.json"
+    assert load_baseline(path) == ({}, {})
+    save_baseline(path, BASE)
+    machine, results = load_baseline(path)
+    assert machine == machine_info() and results == BASE
+    save_baseline(path, {"more": {"seconds": 2.0}})
+    assert set(load_baseline(path)[1]) == {"sim", "more"}
+
+
+def test_old_baselines_are_another_machine(tmp_path):
+    path = tmp_path / "baseline.json"
+    path.write_text(json.dumps({"machine": "x86_64", "python": "3.11.7", "results": BASE}))
+    machine, results = load_baseline(path)
+    assert machine != machine_info() and results == BASE
+    # Saving over them starts a fresh baseline for this machine
+    save_baseline(path, {"more": {"seconds": 2.0}})
+    assert load_baseline(path) == (machine_info(), {"more": {"seconds": 2.0}})
+
+
+def test_peak_memory_excludes_the_interpreter():
+    assert _peak_mb(lambda: bytearray(8 * 2 ** 20)) >= 8
+    assert _peak_mb(lambda: None) < 0.1
+    result = bench_simulate("poisson", 1000, "RR", repeat=1, min_time=0)
+    assert 0 < result["peak_mb"] < 2 and result["events"] > 1000
@@ -0,0 +1,81 @@
+# tests/test_disciplines.py
+from collections import deque
+
+import pytest
+
+from disciplines import DISCIPLINES, Discipline, MLFQDiscipline, compare_disciplines
+from reference import random_workload, reference_simulate
+from scheduler import Scheduler
+
+
+class EagerMLFQ(Discipline):
+    """The textbook MLFQ: a boost moves every queued job to the top."""
+
+    def __init__(self, levels=3, boost_period=100.0):
+        self.levels = levels
+        self.boost_period = boost_period
+
+    def reset(self, table, quantum):
+        super().reset(table, quantum)
+        self.queues = [deque() for _ in range(self.levels)]
+        self.level = 0
+        self.until_boost = self.boost_period
+
+    def push(self, row):
+        self.queues[0].append(row)
+
+    def pop(self):
+        self.level = next(i for i, q in enumerate(self.queues) if q)
+        return self.queues[self.level].popleft()
+
+    def time_slice(self, row):
+        return self.quantum * 2 ** self.level
+
+    def requeue(self, row, ran):
+        self.queues[min(self.level + 1, self.levels - 1)].append(row)
+        self.complete(row, ran)
+
+    def complete(self, row, ran):
+        self.until_boost -= ran
+        if self.until_boost <= 0:
+            for queue in self.queues[1:]:
+                self.queues[0].extend(queue)
+                queue.clear()
+            self.until_boost = self.boost_period
+
+
+def run(processes, discipline):
+    sched = Scheduler(processes, discipline=discipline, quantum=1, energy_aware=True)
+    completed = sched.simulate()
+    return sched.energy, list(sched.gantt), [(p.pid, p.completion) for p in completed]
+
+
+@pytest.mark.parametrize("levels, boost_period", [(1, 5.0), (2, 3.0), (3, 7.5), (4, 20.0)])
+def test_lazy_boost_matches_eager_boost(levels, boost_period):
+    for seed in range(60):
+        processes = random_workload(seed, fractional=True)
+        assert run(processes, MLFQDiscipline(levels, boost_period)) == \
+            run(processes, EagerMLFQ(levels, boost_period)), seed
+
+
+def test_boost_counts_slices_that_finish_jobs():
+    # Every job fits in one slice, so no slice is ever requeued
+    processes = [{"pid": i, "arrival": 0, "burst": 1} for i in range(10)]
+    mlfq = MLFQDiscipline(boost_period=4.0)
+    Scheduler(processes, discipline=mlfq, quantum=2).simulate()
+    # Ten 0.5-long slices: one boost after eight, then 1.0 charged again
+    assert mlfq._until_boost == 3.0
+
+
+def test_rr_discipline_is_the_original_loop():
+    processes = random_workload(12, fractional=True)
+    energy, gantt, _, _ = reference_simulate(processes, 1, True)
+    assert run(processes, "rr")[:2] == (energy, gantt)
+
+
+def test_every_discipline_finishes_every_job():
+    processes = random_workload(3)
+    df = compare_disciplines(processes)
+    assert sorted(df["discipline"]) == sorted(DISCIPLINES)
+    for name in DISCIPLINES:
+        assert len(run(processes, name)[2]) == len(processes)
@@ -0,0 +1,37 @@
+# tests/test_downsampling.py
+import numpy as np
+
+from downsampling import compress_steps, minmax_downsample
+
+
+def step_value(time, value, at):
+    # A sample holds its value since the previous one
+    return value[np.searchsorted(time, at, side="left")]
+
+
+def test_compress_steps_is_lossless():
+    rng = np.random.default_rng(0)
+    time = np.cumsum(rng.uniform(0.1, 1, 2000))
+    value = rng.choice([0.1, 0.6, 1.79, 4.1], 2000, p=[0.7, 0.1, 0.1, 0.1])
+    keep = compress_steps(time, value)
+    assert len(keep) < len(value)
+    probe = np.linspace(time[0], time[-1], 5000)
+    assert np.array_equal(step_value(time[keep], value[keep], probe),
+                          step_value(time, value, probe))
+
+
+def test_minmax_keeps_extremes_and_ends():
+    rng = np.random.default_rng(1)
+    time = np.cumsum(rng.uniform(0.1, 1, 100_000))
+    value = rng.normal(2, 0.5, 100_000)
+    value[31_337] = 50.0
+    value[77_777] = -50.0
+    keep = minmax_downsample(time, value, max_points=800)
+    assert len(keep) <= 800
+    assert {0, 31_337, 77_777, 99_999} <= set(keep.tolist())
+    assert np.all(np.diff(keep) > 0)
+
+
+def test_short_traces_are_untouched():
+    assert minmax_downsample([0, 1, 2], [1.0, 2.0, 3.0]).tolist() == [0, 1, 2]
+    assert minmax_downsample([], []).tolist() == []
@@ -0,0 +1,57 @@
+# tests/test_energy_accounting.py
+import json
+
+import pytest
+
+import main
+from energy_accounting import account, total_energy
+from energy_module import PowerModel
+from reference import random_workload
+from scheduler import RoundRobinScheduler
+from trace_io import TraceFile, write_trace
+
+
+def run(model=None, record_trace=True):
+    sched = RoundRobinScheduler(random_workload(7), quantum=1.3, energy_aware=True,
+                                model=model, record_trace=record_trace)
+    sched.simulate()
+    return sched
+
+
+def test_total_is_busy_plus_idle_plus_switches():
+    model = PowerModel(switch_energy=0.25)
+    sched = run(model)
+    report = account(sched.trace, model)
+    assert report.busy == pytest.approx(sched.energy)
+    idle_time = report.residency["IDLE"]
+    assert idle_time > 0 and report.idle == pytest.approx(idle_time * model.p_idle)
+    assert report.transitions > 0
+    assert report.total == pytest.approx(report.busy + report.idle + 0.25 * report.transitions)
+    assert sum(report.per_process.values()) <= report.total
+    assert total_energy(sched) == report.total
+
+
+def test_total_energy_without_a_trace_is_busy_energy():
+    sched = run(record_trace=False)
+    assert total_energy(sched) == sched.energy
+
+
+def test_trace_file_keeps_the_total(tmp_path):
+    sched = run()
+    path = write_trace(tmp_path / "run.trace", sched)
+    saved = TraceFile(path)
+    assert saved.summary()["total_energy"] == sched.energy_report().total
+    assert total_energy(saved) == sched.energy_report().total
+    # Straight from the header, for the run and for a window of it
+    saved.header["total_energy"] = 123.0
+    assert total_energy(saved) == total_energy(saved.window(0, 1)) == 123.0
+
+
+def test_cli_reports_total_energy_by_default(tmp_path, capsys):
+    jobs = tmp_path / "jobs.jsonl"
+    jobs.write_text("\n".join(json.dumps(p) for p in random_workload(7)))
+    assert main.main(["run", str(jobs)]) == 0
+    rows = json.loads(capsys.readouterr().out)
+    assert all(r["total_energy"] > r["energy"] for r in rows)
+    assert main.main(["run", str(jobs), "--no-total-energy"]) == 0
+    assert all(r["total_energy"] is None for r in json.loads(capsys.readouterr().out))
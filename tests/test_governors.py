@@ -0,0 +1,53 @@
+# tests/test_governors.py
+import pytest
+
+from energy_module import DEFAULT_MODEL
+from governors import (GOVERNORS, Governor, GovernorState, compare_governors,
+                       get_governor)
+from reference import random_workload, reference_simulate
+from scheduler import RoundRobinScheduler
+
+
+def test_default_governors_are_the_original_policies():
+    processes = random_workload(4, fractional=True)
+    for aware, name in ((False, "performance"), (True, "queue_length")):
+        energy, gantt, _, _ = reference_simulate(processes, 2, aware)
+        sched = RoundRobinScheduler(processes, quantum=2, governor=name)
+        sched.simulate()
+        assert sched.energy == energy
+        assert list(sched.gantt) == gantt
+
+
+@pytest.mark.parametrize("name", sorted(GOVERNORS))
+def test_every_governor_picks_a_known_level(name):
+    governor = get_governor(name)
+    governor.reset(DEFAULT_MODEL)
+    state = GovernorState()
+    for t in range(0, 200, 7):
+        state.time, state.busy_time = t, t * 0.6
+        state.queue_len, state.backlog, state.remaining = t % 5, t % 13, 2
+        state.level = governor.select(state)
+        assert state.level in DEFAULT_MODEL.freq_levels
+
+
+def test_ceil_level_and_lookup():
+    governor = get_governor("ondemand")
+    governor.reset(DEFAULT_MODEL)
+    assert governor.ceil_level(0) == governor.levels[0]
+    assert governor.ceil_level(1e9) == governor.levels[-1]
+    assert get_governor(governor) is governor
+    with pytest.raises(ValueError, match="Unknown governor"):
+        get_governor("turbo")
+
+
+def test_custom_governor_plugs_in():
+    class Slowest(Governor):
+        name = "slowest"
+
+        def select(self, state):
+            return self.levels[0]
+
+    processes = random_workload(9)
+    df = compare_governors(processes, governors=(Slowest, "performance"))
+    slow, fast = df.set_index("governor").loc[["slowest", "performance"], "energy"]
+    assert slow < fast
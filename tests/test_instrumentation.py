@@ -0,0 +1,115 @@
+# tests/test_instrumentation.py
+import json
+
+import pytest
+
+from instrumentation import PHASES, Instrumentation
+from reference import random_workload
+from scheduler import RoundRobinScheduler, Scheduler
+from workload import generate_workload
+
+
+def run(processes, instrument=None, **kwargs):
+    sched = Scheduler(processes, instrument=instrument, **kwargs)
+    done = sched.simulate()
+    return sched, [(p.pid, p.completion, p.waiting, p.turnaround) for p in done]
+
+
+@pytest.mark.parametrize("discipline", ["rr", "srtf", "mlfq"])
+def test_instrumented_runs_match_plain_ones(discipline):
+    for seed in range(40):
+        processes = random_workload(seed)
+        plain, expected = run(processes, discipline=discipline, quantum=1.3)
+        inst = Instrumentation()
+        sched, got = run(processes, inst, discipline=discipline, quantum=1.3)
+        assert got == expected, seed
+        assert sched.energy == plain.energy
+        assert list(sched.gantt) == list(plain.gantt)
+
+
+def test_counters_add_up():
+    processes = generate_workload(60, arrival="mmpp", seed=3)
+    inst = Instrumentation()
+    sched, _ = run(processes, inst, discipline="srtf", quantum=2, governor="ondemand")
+    c = inst.counters
+    assert c["arrivals"] == c["completions"] == len(processes)
+    assert c["dispatches"] == len(sched.gantt)
+    assert c["preemptions"] + c["expiries"] + c["completions"] == c["dispatches"]
+    assert c["preemptions"] > 0
+    levels = [label for _, _, label in sched.gantt]
+    assert c["idle_jumps"] == sum(1 for ev in inst.events if ev[0] == "idle")
+    # Consecutive segments on different levels, idle included
+    segments = [ev[4] if ev[0] == "slice" else "IDLE" for ev in inst.events if ev[0] != "arrival"]
+    assert c["switches"] == sum(a != b for a, b in zip(segments, segments[1:]))
+    assert set(levels) <= set(segments)
+
+
+def test_hooks_see_every_event():
+    seen = {"slice": [], "complete": [], "arrival": []}
+    inst = Instrumentation()
+    for name, out in seen.items():
+        inst.on(name, out.append)
+    processes = random_workload(5)
+    sched, metrics = run(processes, inst, quantum=1)
+    assert [(s["start"], s["pid"], s["level"]) for s in seen["slice"]] == list(sched.gantt)
+    assert sorted(e["pid"] for e in seen["arrival"]) == sorted(p["pid"] for p in processes)
+    assert [(e["pid"], e["time"]) for e in seen["complete"]] == [(m[0], m[1]) for m in metrics]
+
+
+def test_off_and_unknown_events():
+    inst = Instrumentation()
+    calls = []
+    inst.off("slice", inst.on("slice", calls.append))
+    run(random_workload(2), inst)
+    assert calls == []
+    with pytest.raises(ValueError):
+        inst.on("tick", calls.append)
+
+
+def test_event_limit_and_disabled_recording():
+    capped = Instrumentation(max_events=5)
+    run(random_workload(4), capped)
+    assert len(capped.events) == 5 and capped.dropped > 0
+    assert capped.summary()["events_dropped"] == capped.dropped
+    off = Instrumentation(record_events=False, timers=False)
+    run(random_workload(4), off)
+    assert off.events == [] and off.counters["dispatches"] > 0
+    assert all(off.phases[p] == 0 for p in PHASES if p != "engine")
+
+
+def test_one_call_per_advance():
+    inst = Instrumentation()
+    sched = RoundRobinScheduler(generate_workload(50, seed=1), instrument=inst)
+    chunks = list(sched.steps(events=20))
+    assert len(inst.calls) == len(chunks)
+    assert sum(count for _, _, count, _ in inst.calls) == inst.counters["dispatches"] + \
+        inst.counters["idle_jumps"]
+    assert all(v >= 0 for v in inst.phases.values())
+
+
+def test_chrome_trace(tmp_path):
+    inst = Instrumentation()
+    sched, _ = run(random_workload(6), inst, quantum=2)
+    path = tmp_path / "run.json"
+    trace = inst.to_chrome_trace(path)
+    assert json.loads(path.read_text()) == json.loads(json.dumps(trace))
+    events = trace["traceEvents"]
+    slices = [e for e in events if e.get("cat") == "slice"]
+    assert [(e["ts"] / 1000, e["name"]) for e in slices] == \
+        [(pytest.approx(t), pid) for t, pid, _ in sched.gantt]
+    assert sum(e["name"] == "advance" for e in events) == len(inst.calls)
+    assert trace["otherData"]["dispatches"] == len(sched.gantt)
+
+
+def test_checkpoint_drops_hooks(tmp_path):
+    inst = Instrumentation()
+    calls = []
+    inst.on("slice", calls.append)
+    sched = RoundRobinScheduler(generate_workload(40, seed=2), instrument=inst)
+    sched.advance(events=10)
+    sched.checkpoint(tmp_path / "run.ckpt")
+    resumed = RoundRobinScheduler.restore(tmp_path / "run.ckpt")
+    before = len(calls)
+    resumed.simulate()
+    assert len(calls) == before
+    assert resumed.instrument.counters["completions"] == 40
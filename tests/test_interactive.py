@@ -0,0 +1,99 @@
+# tests/test_interactive.py
+import importlib.util
+
+import numpy as np
+import pytest
+
+import interactive
+from energy_accounting import total_energy
+from interactive import InteractiveVisualizer, available
+from reference import random_workload
+from scheduler import RoundRobinScheduler
+from visualization import Visualizer
+from workload import generate_table
+
+
+def run(processes, energy_aware=True, **options):
+    sched = RoundRobinScheduler(processes, energy_aware=energy_aware, **options)
+    sched.simulate()
+    return sched
+
+
+def test_available_matches_the_installed_package():
+    assert available() == (importlib.util.find_spec("plotly") is not None)
+
+
+def test_missing_plotly_is_an_import_error(monkeypatch):
+    import builtins
+
+    real_import = builtins.__import__
+
+    def no_plotly(name, *args, **kwargs):
+        if name.startswith("plotly"):
+            raise ImportError(name)
+        return real_import(name, *args, **kwargs)
+
+    monkeypatch.setattr(builtins, "__import__", no_plotly)
+    with pytest.raises(ImportError, match="pip install plotly"):
+        InteractiveVisualizer.plot_energy_bar(1.0, 2.0)
+
+
+def test_gantt_traces_hold_every_segment():
+    sched = run(random_workload(6), quantum=1.3)
+    traces, row_labels = InteractiveVisualizer.gantt_traces(sched.gantt)
+    start, end, row, level, rows, levels = Visualizer.gantt_segments(
+        sched.gantt, pixels=4000, max_rows=2000, max_segments=200_000)
+    assert row_labels == rows
+    assert sorted(t["name"] for t in traces) == sorted(levels)
+    for t in traces:
+        mine = level == levels.index(t["name"])
+        x, y = t["x"], t["y"]
+        assert x.dtype == np.float64 and y.dtype == np.float32 and len(x) == 3 * mine.sum()
+        # start, end, NaN gap per rectangle
+        np.testing.assert_array_equal(x[0::3], start[mine])
+        np.testing.assert_array_equal(x[1::3], end[mine])
+        assert np.isnan(x[2::3]).all() and np.isnan(y[2::3]).all()
+        np.testing.assert_array_equal(y[0::3], row[mine])
+        assert t["color"] == interactive.COLORS[t["name"]]
+
+
+def test_gantt_traces_are_bounded_for_large_runs():
+    sched = run(generate_table(4000, seed=2), quantum=1)
+    traces, row_labels = InteractiveVisualizer.gantt_traces(sched.gantt, pixels=300,
+                                                            max_rows=100, max_segments=5000)
+    assert len(row_labels) <= 100
+    assert sum(len(t["x"]) // 3 for t in traces) <= 100 * 301
+
+
+def test_power_columns_keep_the_steps():
+    sched = run(generate_table(3000, seed=3), quantum=1)
+    time, power = InteractiveVisualizer._power_columns(sched.power_trace, 500)
+    assert len(time) <= 500 and power.dtype == np.float32
+    full = Visualizer._power_frame(sched.power_trace)
+    # The extremes survive downsampling
+    assert power.max() == pytest.approx(full["power"].max())
+    assert power.min() == pytest.approx(full["power"].min())
+    assert np.all(np.diff(time) >= 0)
+
+
+def test_empty_gantt():
+    traces, row_labels = InteractiveVisualizer.gantt_traces([])
+    assert traces == [] and row_labels == []
+
+
+# ---------------------------------------------------------------------------
+# FIGURES (plotly only)
+# ---------------------------------------------------------------------------
+def test_figures():
+    pytest.importorskip("plotly")
+    rr = run(random_workload(2), energy_aware=False, quantum=2)
+    earr = run(random_workload(2), quantum=2)
+    gantt = InteractiveVisualizer.plot_gantt_chart(earr.gantt, "EARR")
+    assert {t.type for t in gantt.data} == {"scattergl"}
+    power = InteractiveVisualizer.plot_power_trace(rr.power_trace, earr.power_trace)
+    assert [t.name for t in power.data] == ["Traditional RR", "Energy-Aware RR"]
+    assert power.data[0].line.shape == "vh"
+    fig = InteractiveVisualizer.generate_dashboard(rr, earr, rr.simulate(), earr.simulate())
+    bars = [t for t in fig.data if t.type == "bar"]
+    assert list(bars[0].y) == [total_energy(rr), total_energy(earr)]
+    fig.to_json()
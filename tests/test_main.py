@@ -0,0 +1,69 @@
+# tests/test_main.py
+import csv
+import io
+import json
+import os
+import subprocess
+import sys
+
+import main
+from reference import random_workload, reference_simulate
+
+
+def workload_file(tmp_path, seed=5, name="jobs.jsonl"):
+    path = tmp_path / name
+    path.write_text("\n".join(json.dumps(p) for p in random_workload(seed)) + "\n")
+    return str(path)
+
+
+def run_cli(capsys, *argv):
+    assert main.main(list(argv)) == 0
+    return capsys.readouterr().out
+
+
+def test_run_matches_the_original_loop(tmp_path, capsys):
+    path = workload_file(tmp_path)
+    rows = json.loads(run_cli(capsys, "run", path, "--quantum", "1.5"))
+    assert [r["policy"] for r in rows] == ["RR", "EARR"]
+    for row in rows:
+        energy, _, _, metrics = reference_simulate(random_workload(5), 1.5,
+                                                   row["policy"] == "EARR")
+        assert row["energy"] == energy
+        assert row["n_completed"] == len(metrics)
+
+
+def test_governor_runs_once_per_workload(tmp_path, capsys):
+    paths = [workload_file(tmp_path, 5, "a.jsonl"), workload_file(tmp_path, 6, "b.jsonl")]
+    rows = json.loads(run_cli(capsys, "run", *paths, "--governor", "ondemand"))
+    assert [(r["workload"], r["policy"], r["governor"]) for r in rows] == \
+        [(paths[0], "ondemand", "ondemand"), (paths[1], "ondemand", "ondemand")]
+
+
+def test_csv_output_and_errors(tmp_path, capsys):
+    path = workload_file(tmp_path)
+    out = run_cli(capsys, "run", path, "--csv", "--policy", "EARR", "--no-total-energy")
+    rows = list(csv.DictReader(io.StringIO(out)))
+    assert len(rows) == 1 and rows[0]["policy"] == "EARR"
+    assert main.main(["run", str(tmp_path / "missing.csv")]) == 1
+    assert main.main(["run", path, "--governor", "turbo"]) == 1
+    assert "Unknown governor" in capsys.readouterr().err
+
+
+def test_sweep_resumes(tmp_path, capsys):
+    path = workload_file(tmp_path)
+    out = str(tmp_path / "sweep.csv")
+    first = json.loads(run_cli(capsys, "sweep", path, "--quanta", "1", "2", "--out", out,
+                               "--workers", "1"))
+    again = json.loads(run_cli(capsys, "sweep", path, "--quanta", "1", "2", "--out", out,
+                               "--workers", "1"))
+    assert (first["simulated"], again["simulated"]) == (4, 0)
+
+
+def test_run_does_not_import_plotting_or_streamlit(tmp_path):
+    path = workload_file(tmp_path)
+    code = ("import sys, main; main.main(['run', %r, '--no-total-energy']);"
+            "sys.stderr.write(' '.join(m for m in ('matplotlib', 'streamlit', 'pandas')"
+            " if m in sys.modules))" % path)
+    done = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True,
+                          cwd=os.path.dirname(os.path.abspath(main.__file__)))
+    assert done.returncode == 0 and done.stderr == ""
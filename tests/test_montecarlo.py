@@ -0,0 +1,101 @@
+# tests/test_montecarlo.py
+import math
+
+import numpy as np
+import pytest
+
+from montecarlo import (MonteCarloResult, QuantileSketch, Welford, _t_quantile, replicate,
+                        run_monte_carlo)
+from process_table import ProcessTable
+from scheduler import RoundRobinScheduler
+from workload import generate_arrays
+
+
+def test_welford_matches_numpy_and_merges():
+    rng = np.random.default_rng(0)
+    x = rng.lognormal(2, 1, 1000)
+    whole, left, right = Welford(), Welford(), Welford()
+    for i, v in enumerate(x):
+        whole.add(v)
+        (left if i < 300 else right).add(v)
+    assert whole.mean == pytest.approx(x.mean()) and whole.variance == pytest.approx(x.var(ddof=1))
+    merged = left.merge(right)
+    assert merged.n == 1000 and merged.mean == pytest.approx(whole.mean)
+    assert merged.variance == pytest.approx(whole.variance)
+    assert Welford().half_width() == math.inf
+
+
+def test_t_quantile_is_close_to_exact():
+    stats = pytest.importorskip("scipy.stats")
+    for df in (3, 5, 10, 30, 200):
+        assert _t_quantile(0.975, df) == pytest.approx(stats.t.ppf(0.975, df), rel=0.01)
+
+
+def test_sketch_quantiles_within_relative_accuracy():
+    rng = np.random.default_rng(1)
+    x = np.concatenate([rng.exponential(5, 20_000), np.zeros(500)])
+    a, b = QuantileSketch(0.01), QuantileSketch(0.01)
+    a.add(x[:7000])
+    b.add(x[7000:])
+    a.merge(b)
+    assert a.count == len(x) and a.zeros == 500
+    for q in (0.01, 0.5, 0.9, 0.99):
+        exact = np.quantile(x, q, method="lower")
+        assert a.quantile(q) == pytest.approx(exact, rel=0.02, abs=1e-9)
+    assert math.isnan(QuantileSketch().quantile(0.5))
+    with pytest.raises(ValueError):
+        a.add([-1.0])
+    with pytest.raises(ValueError):
+        a.merge(QuantileSketch(0.05))
+
+
+def test_replicate_reports_whole_run_energy():
+    rep = replicate(4, 80, quantum=2, options={"rate": 0.05})
+    arrivals, bursts = generate_arrays(80, "periodic", "uniform", seed=4, rate=0.05)
+    for policy, aware in (("RR", False), ("EARR", True)):
+        sched = RoundRobinScheduler(ProcessTable.from_arrays(range(80), arrivals, bursts),
+                                    quantum=2, energy_aware=aware)
+        sched.simulate()
+        report = sched.energy_report()
+        # Idle time is part of it, not just the busy slices
+        assert report.idle > 0
+        assert rep[policy]["energy"] == report.total
+        assert rep[policy]["makespan"] == sched.time
+
+
+def test_relative_width_uses_the_larger_of_rr_mean_and_effect():
+    result = MonteCarloResult()
+    for i in range(20):
+        rep = {"seed": i}
+        for policy, waiting in (("RR", 0.001 * (i % 2)), ("EARR", 10 + 0.1 * (i % 3))):
+            rep[policy] = {"energy": 1.0, "avg_waiting": waiting, "avg_turnaround": waiting,
+                           "makespan": 1.0, "sketches": {}}
+        result.add(rep)
+    diff = result.diff["avg_waiting"]
+    assert result.relative_half_width("avg_waiting") == pytest.approx(diff.half_width() / diff.mean)
+    assert result.relative_half_width("avg_waiting") < 0.02
+
+
+def test_defaults_converge():
+    result = run_monte_carlo(100, max_runs=300)
+    assert result.converged and result.runs < 300
+    summary = result.summary().set_index("metric")
+    assert summary.loc["energy", "significant"] and summary.loc["energy", "diff_mean"] < 0
+
+
+def test_workers_stop_where_a_serial_run_does():
+    seen = []
+    serial = run_monte_carlo(60, rel_width=0.01, min_runs=5, max_runs=120, seed=3,
+                             on_progress=lambda r: seen.append(r.runs))
+    pooled = run_monte_carlo(60, rel_width=0.01, min_runs=5, max_runs=120, seed=3,
+                             workers=2, chunksize=3)
+    assert seen == list(range(1, serial.runs + 1))
+    assert pooled.runs == serial.runs and pooled.converged == serial.converged
+    assert pooled.summary().equals(serial.summary())
+    assert pooled.quantiles().equals(serial.quantiles())
+
+
+def test_run_limits():
+    assert run_monte_carlo(40, rel_width=0, max_runs=7).runs == 7
+    assert run_monte_carlo(40, rel_width=0, max_runs=7, workers=2, chunksize=2).runs == 7
+    assert run_monte_carlo(40, rel_width=1.0, min_runs=12).runs == 12
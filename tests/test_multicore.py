@@ -0,0 +1,100 @@
+# tests/test_multicore.py
+import random
+
+import pytest
+
+from multicore import PLACEMENTS, MultiCoreScheduler, _CoreHeap
+from reference import random_workload, reference_simulate
+
+
+def outcome(sched, completed):
+    return (sched.energy, sched.time, list(sched.core_time), sched.migrations,
+            [(p.pid, p.completion, p.waiting, p.turnaround) for p in completed],
+            [list(t.gantt) for t in sched.core_traces])
+
+
+def test_one_core_matches_the_original_loop():
+    for seed in range(50):
+        processes = random_workload(seed)
+        for aware in (False, True):
+            energy, gantt, _, metrics = reference_simulate(processes, 2, aware)
+            sched = MultiCoreScheduler(processes, n_cores=1, energy_aware=aware)
+            completed = sched.simulate()
+            assert sched.energy == pytest.approx(energy)
+            assert [g[:2] for g in sched.core_traces[0].gantt] == [g[:2] for g in gantt]
+            assert sorted((p.pid, p.completion) for p in completed) == \
+                sorted((pid, c) for pid, c, _, _ in metrics)
+
+
+def test_finished_after_simulate():
+    sched = MultiCoreScheduler(random_workload(1), n_cores=3)
+    assert not sched.finished
+    sched.simulate()
+    assert sched.finished
+    assert sched.advance() == 0
+
+
+@pytest.mark.parametrize("placement", PLACEMENTS)
+def test_steps_match_simulate(placement):
+    processes = random_workload(5, fractional=True)
+    whole = MultiCoreScheduler(processes, n_cores=3, placement=placement, energy_aware=True)
+    expected = outcome(whole, whole.simulate())
+    stepped = MultiCoreScheduler(processes, n_cores=3, placement=placement, energy_aware=True)
+    reports = list(stepped.steps(events=3))
+    assert len(reports) > 2 and reports[-1]["finished"]
+    assert [r["completed"] for r in reports] == sorted(r["completed"] for r in reports)
+    assert reports[-1]["completed"] == len(processes)
+    assert outcome(stepped, stepped._result) == expected
+
+
+def test_checkpoint_resume_matches_uninterrupted(tmp_path):
+    processes = random_workload(8, fractional=True)
+    whole = MultiCoreScheduler(processes, n_cores=2, stealing=False)
+    expected = outcome(whole, whole.simulate())
+    sched = MultiCoreScheduler(processes, n_cores=2, stealing=False)
+    sched.advance(until=whole.time / 2)
+    assert not sched.finished
+    sched.checkpoint(tmp_path / "run.ckpt")
+    resumed = MultiCoreScheduler.restore(tmp_path / "run.ckpt")
+    assert outcome(resumed, resumed.simulate()) == expected
+
+
+def test_core_heap_tracks_changing_keys():
+    rng = random.Random(0)
+    keys = [rng.randrange(5) for _ in range(7)]
+    heap = _CoreHeap(keys)
+    for _ in range(2000):
+        core = rng.randrange(7)
+        keys[core] = max(-1, keys[core] + rng.choice((-1, 1)))
+        heap.set(core, keys[core])
+        # The lowest core among the smallest keys, like list.index(min())
+        assert heap.top() == keys.index(min(keys))
+    assert len(heap._heap) <= 4 * 7 + 64 + 1
+
+
+@pytest.mark.parametrize("placement", PLACEMENTS)
+@pytest.mark.parametrize("stealing", [True, False])
+def test_heaps_choose_like_scans(placement, stealing, monkeypatch):
+    processes = random_workload(11, fractional=True)
+
+    def run(heap_cores):
+        monkeypatch.setattr(MultiCoreScheduler, "heap_cores", heap_cores)
+        sched = MultiCoreScheduler(processes, n_cores=5, placement=placement, stealing=stealing,
+                                   pack_limit=2, energy_aware=True)
+        return outcome(sched, sched.simulate())
+
+    scanned = run(10 ** 9)
+    assert run(0) == scanned
+    assert (scanned[3] > 0) == stealing
+
+
+def test_busy_core_steals_from_a_waking_one():
+    # B lands on idle core 1, which wakes at the next tick (1.0); core 0
+    # is free at 0.8 and takes it first
+    processes = [{"pid": "A", "arrival": 0, "burst": 1.6}, {"pid": "B", "arrival": 0.5, "burst": 1}]
+    sched = MultiCoreScheduler(processes, n_cores=2)
+    done = {p.pid: p.completion for p in sched.simulate()}
+    assert sched.migrations == 1 and list(sched.core_traces[1].gantt) == []
+    assert done["B"] == pytest.approx(1.3)
+    waiting = MultiCoreScheduler(processes, n_cores=2, stealing=False)
+    assert {p.pid: p.completion for p in waiting.simulate()}["B"] == pytest.approx(1.5)
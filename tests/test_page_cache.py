@@ -0,0 +1,34 @@
+# tests/test_page_cache.py
+import pickle
+
+import pytest
+
+pytest.importorskip("streamlit")
+
+import page_cache  # noqa: E402
+from workload import generate_workload  # noqa: E402
+
+KEY = (3, 8, 2, "poisson", "lognormal")
+
+
+def test_summary_is_small_plain_data():
+    summary = page_cache.summary(*KEY, "EARR")
+    sched, completed = page_cache.simulation(*KEY, "EARR")
+    assert summary["energy"] == sched.energy
+    assert summary["total_energy"] >= summary["energy"]
+    assert len(summary["processes"]) == len(completed) == 8
+    # Only plain data goes into session state
+    assert len(pickle.dumps(summary)) < 4096
+
+
+def test_runs_and_figures_are_shared():
+    assert page_cache.simulation(*KEY, "RR") is page_cache.simulation(*KEY, "RR")
+    assert page_cache.figure("energy", *KEY) is page_cache.figure("energy", *KEY)
+    with pytest.raises(ValueError, match="Unknown figure"):
+        page_cache._build_figure("pie", *KEY)
+
+
+def test_service_spec_describes_the_same_workload():
+    spec = page_cache.simulation_spec(*KEY, "RR")
+    assert generate_workload(**spec["workload"]["generate"]) == page_cache.make_workload(
+        KEY[0], KEY[1], KEY[3], KEY[4])
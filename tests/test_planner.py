@@ -0,0 +1,54 @@
+# tests/test_planner.py
+import sys
+
+import pytest
+
+from energy_module import DEFAULT_MODEL
+from planner import (_Dispatch, _jobs, _LevelTable, _solve, earr_gap, optimal_plan,
+                     plan_schedule)
+from workload import generate_table
+
+pytest.importorskip("scipy")
+
+
+def workload(n=150, seed=4):
+    return generate_table(n, seed=seed)
+
+
+def test_max_turnaround_plan_meets_its_bound():
+    jobs = [{"pid": i, "arrival": a, "burst": b}
+            for i, (a, b) in enumerate([(0, 4), (1, 2), (2, 6), (9, 3)])]
+    plan = plan_schedule(jobs, 8)
+    assert plan.feasible and plan.makespan <= 9 + 8 + 1e-9
+    assert plan_schedule(jobs, 8.5).energy <= plan.energy
+    assert plan_schedule(jobs, 1.0) is None
+
+
+def test_optimum_beats_earr_at_its_own_turnaround():
+    gap = earr_gap(workload())
+    assert gap["optimal_avg_turnaround"] <= gap["earr_avg_turnaround"] * (1 + 1e-6)
+    assert gap["optimal_energy"] <= gap["earr_energy"]
+    assert gap["gap"] >= 0
+
+
+def test_edp_plan_is_no_worse_than_any_energy_plan():
+    processes = workload()
+    dispatch = _Dispatch(*_jobs(processes), 2, DEFAULT_MODEL)
+    levels = _LevelTable(DEFAULT_MODEL)
+    best = optimal_plan(processes, objective="edp")
+    fastest = dispatch.fastest(levels.f_max)
+    for k in range(1, 16):
+        bound = fastest * (1 + 0.04 * k)
+        assert best.edp <= _solve(dispatch, levels, bound).edp * (1 + 1e-6)
+
+
+def test_infeasible_bound_gives_the_fastest_plan():
+    plan = optimal_plan(workload(60), max_avg_turnaround=0.1)
+    assert not plan.feasible and plan.bound == 0.1
+
+
+def test_missing_scipy_is_a_clear_import_error(monkeypatch):
+    monkeypatch.setitem(sys.modules, "scipy", None)
+    with pytest.raises(ImportError, match="need SciPy"):
+        optimal_plan(workload(20))
+
@@ -0,0 +1,115 @@
+# tests/test_powercap.py
+import pytest
+
+from disciplines import MLFQDiscipline
+from energy_module import DEFAULT_MODEL
+from multicore import MultiCoreScheduler
+from powercap import EPS, PowerCapGovernor, cap_sweep, run_power_capped
+from process_table import ProcessTable
+from reference import random_workload
+from scheduler import Scheduler
+from workload import generate_workload
+
+PROCESSES = generate_workload(60, arrival="mmpp", seed=8)
+IDLE_WINDOW = DEFAULT_MODEL.p_idle * 100.0
+
+
+@pytest.mark.parametrize("joules", [0, IDLE_WINDOW / 2, IDLE_WINDOW])
+def test_budget_at_or_below_idle_floor_is_rejected(joules):
+    with pytest.raises(ValueError, match="idle energy"):
+        run_power_capped(PROCESSES, joules=joules, window=100.0)
+
+
+def test_budget_just_above_idle_floor_finishes():
+    # Barely any room to run, but every window makes progress
+    jobs = generate_workload(5, seed=1)
+    sched, report = run_power_capped(jobs, joules=IDLE_WINDOW * 1.2, window=100.0)
+    assert sched.finished and report["completed"] == 5
+    assert report["window_violations"] == 0 and report["throttled_time"] > 0
+
+
+def test_watts_cap_keeps_every_slice_under_it():
+    sched, report = run_power_capped(PROCESSES, watts=2.0, record_trace=True)
+    powers = [p for _, p in sched.power_trace]
+    assert max(powers) <= 2.0 and report["cap_violations"] == 0
+    assert report["completed"] == len(PROCESSES)
+    # No level fits: the slowest runs and every slice counts
+    _, report = run_power_capped(PROCESSES, watts=0.01)
+    assert report["cap_violations"] > 0
+
+
+def test_windows_stay_within_the_energy_budget():
+    sched, report = run_power_capped(PROCESSES, joules=150, window=100.0, record_trace=True)
+    governor = sched.governor
+    assert report["window_violations"] == 0
+    assert max(governor.window_energy) <= 150 * (1 + EPS)
+    # finish() accounts for the last slice, so the windows add up to the run
+    assert report["energy"] == pytest.approx(sched.energy_report().total)
+    assert report["peak_window_power"] <= 1.5 * (1 + EPS)
+
+
+def test_finish_hook_runs_once_at_the_end():
+    calls = []
+
+    class Counting(PowerCapGovernor):
+        def finish(self, state):
+            calls.append((state.time, state.busy_time))
+            super().finish(state)
+
+    sched = Scheduler(random_workload(6), governor=Counting(watts=3.0))
+    sched.advance(events=3)
+    assert calls == []
+    sched.simulate()
+    assert len(calls) == 1 and calls[0][0] == sched.time
+    multi = MultiCoreScheduler(PROCESSES, n_cores=2, governor=Counting(joules=300))
+    multi.simulate()
+    assert len(calls) == 3
+
+
+def test_mlfq_demotes_only_after_a_whole_slice():
+    moves = []
+
+    class Watched(MLFQDiscipline):
+        def requeue(self, row, ran):
+            level = self._level
+            super().requeue(row, ran)
+            if level + 1 < self.levels:
+                lower = self._queues[level + 1]
+                moves.append((ran < self._slices[level] * (1 - 1e-9),
+                              bool(lower) and lower[-1] == row))
+
+    sched, report = run_power_capped(PROCESSES, joules=20, window=10.0, quantum=4,
+                                     discipline=Watched(levels=3, boost_period=1e9))
+    assert report["completed"] == len(PROCESSES)
+    cut = [dropped for short, dropped in moves if short]
+    whole = [dropped for short, dropped in moves if not short]
+    # The budget cuts slices short; those jobs keep their level
+    assert cut and not any(cut)
+    assert whole and all(whole)
+
+
+def test_completed_rows_is_a_copy():
+    sched = Scheduler(random_workload(3))
+    assert len(sched.completed_rows()) == 0
+    done = sched.simulate()
+    rows = sched.completed_rows()
+    assert [sched.table.pids[r] for r in rows] == [p.pid for p in done]
+    rows.append(99)
+    assert len(sched.completed_rows()) == len(done)
+
+
+def test_cap_sweep_reuses_streams_and_tables():
+    caps = [3.0, 1.5, {"joules": 200}]
+    listed = cap_sweep(PROCESSES, caps)
+    streamed = cap_sweep(iter(PROCESSES), caps)
+    assert list(streamed["completed"]) == [len(PROCESSES)] * 3
+    assert streamed.equals(listed)
+
+    table = ProcessTable.from_records(PROCESSES)
+    arrival = table.column("arrival").tolist()
+    tabled = cap_sweep(table, caps)
+    assert list(tabled["completed"]) == [len(PROCESSES)] * 3
+    assert list(tabled["energy"]) == pytest.approx(list(listed["energy"]))
+    assert table.column("arrival").tolist() == arrival
+    # The tighter cap runs slower
+    assert tabled["avg_turnaround"][0] <= tabled["avg_turnaround"][1]
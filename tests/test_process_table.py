@@ -0,0 +1,44 @@
+# tests/test_process_table.py
+import gc
+
+import numpy as np
+import pytest
+
+from process_table import ProcessTable, round2
+from reference import random_workload
+from scheduler import RoundRobinScheduler
+
+
+def test_table_input_runs_like_dicts():
+    processes = random_workload(11)
+    by_dicts = RoundRobinScheduler(processes, quantum=1.3, energy_aware=True)
+    completed = by_dicts.simulate()
+    table = ProcessTable.from_records(processes)
+    by_table = RoundRobinScheduler(table, quantum=1.3, energy_aware=True)
+    done = by_table.simulate()
+    assert by_table.energy == by_dicts.energy
+    assert list(by_table.gantt) == list(by_dicts.gantt)
+    got = [(table.pids[i], table.column("waiting")[i], table.column("turnaround")[i])
+           for i in done]
+    assert got == [(p.pid, p.waiting, p.turnaround) for p in completed]
+
+
+def test_append_with_a_live_view_leaves_the_table_unchanged():
+    table = ProcessTable.from_records(random_workload(2))
+    n = len(table)
+    view = table.column("waiting")
+    with pytest.raises(BufferError, match="view"):
+        table.append("X", 1.0, 2.0)
+    assert len(table) == n
+    assert all(len(col) == n for col in table._cols.values())
+    del view
+    gc.collect()
+    assert table.append("X", 1.0, 2.0) == n
+    assert table.column("remaining")[n] == 2.0
+
+
+def test_round2_matches_python_round():
+    values = np.array([8.895, 0.125, 2.675, 1.005, -0.004999999, 3.14159, 1e6 + 0.005])
+    assert round2(values).tolist() == [round(v, 2) for v in values.tolist()]
+    grid = values.reshape(7, 1) + np.zeros((1, 3))
+    assert round2(grid).tolist() == [[round(v, 2)] * 3 for v in values.tolist()]
@@ -0,0 +1,77 @@
+# tests/test_scheduler.py
+import random
+
+import pytest
+
+from reference import random_workload, reference_simulate
+from scheduler import RoundRobinScheduler, _add_ticks, idle_until
+
+QUANTA = (0.7, 1, 1.3, 2, 3.5)
+
+
+def run(processes, quantum, energy_aware):
+    sched = RoundRobinScheduler(processes, quantum=quantum, energy_aware=energy_aware)
+    completed = sched.simulate()
+    metrics = [(p.pid, p.completion, p.waiting, p.turnaround) for p in completed]
+    return sched, metrics
+
+
+def collapse_idle(trace, p_idle=0.1):
+    # The reference records one idle sample per tick; the engine one per gap
+    out = []
+    for t, p in trace:
+        if out and p == p_idle and out[-1][1] == p_idle and out[-1][2]:
+            out[-1] = (t, p, True)
+        else:
+            out.append((t, p, p == p_idle))
+    return [(t, p) for t, p, _ in out]
+
+
+@pytest.mark.parametrize("fractional", [False, True])
+def test_matches_original_loop(fractional):
+    for seed in range(300):
+        processes = random_workload(seed, fractional)
+        for quantum in QUANTA:
+            for aware in (False, True):
+                energy, gantt, power_trace, metrics = reference_simulate(processes, quantum, aware)
+                sched, got = run(processes, quantum, aware)
+                case = (seed, quantum, aware)
+                assert sched.energy == energy, case
+                assert list(sched.gantt) == gantt, case
+                assert got == metrics, case
+                assert list(sched.power_trace) == collapse_idle(power_trace), case
+
+
+def test_waiting_is_never_negative_zero():
+    # completion - arrival lands a hair below the burst here
+    processes = [{"pid": "P1", "arrival": 0.1, "burst": 0.7},
+                 {"pid": "P2", "arrival": 0.3, "burst": 0.2}]
+    for quantum in QUANTA:
+        _, metrics = run(processes, quantum, True)
+        for _, _, waiting, _ in metrics:
+            assert waiting >= 0 and str(waiting) != "-0.0"
+
+
+def test_add_ticks_matches_repeated_addition():
+    rng = random.Random(0)
+    for _ in range(5000):
+        t = rng.choice([0.0, rng.random(), rng.uniform(0, 100), round(rng.uniform(0, 70), 2),
+                        rng.uniform(0, 1e6)])
+        k = rng.randint(0, 2000)
+        expected = t
+        for _ in range(k):
+            expected += 1
+        assert _add_ticks(t, k) == expected
+
+
+def test_idle_until_is_the_first_tick_reaching_the_arrival():
+    rng = random.Random(1)
+    for _ in range(5000):
+        start = round(rng.uniform(0, 500), rng.choice([0, 1, 2]))
+        due = start + rng.choice([1e-9, 0.5, 1, 2.5, rng.uniform(0, 300)])
+        t = start
+        while True:
+            t += 1
+            if t >= due:
+                break
+        assert idle_until(start, due) == t
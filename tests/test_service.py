@@ -0,0 +1,203 @@
+# tests/test_service.py
+import asyncio
+import json
+import os
+import time
+
+import pytest
+
+from service import Job, ServiceClient, SimulationService, job_id, normalize
+
+GENERATE = {"generate": {"n": 30, "seed": 1}}
+
+
+# ---------------------------------------------------------------------------
+# REQUEST VALIDATION
+# ---------------------------------------------------------------------------
+@pytest.mark.parametrize("spec", [
+    [1, 2], "simulate", None, 3,
+    {"workload": ["n", 5]},
+    {"workload": {"generate": [30]}},
+    {"workload": {"records": {"pid": "P1"}}},
+    {"workload": {"records": [1, 2]}},
+    {"workload": GENERATE, "quantum": "2"},
+    {"workload": GENERATE, "quantum": 0},
+    {"kind": "sweep", "workloads": {"a": GENERATE}, "policies": "RR"},
+    {"kind": "sweep", "workloads": {"a": GENERATE}, "quanta": 2},
+    {"kind": "sweep", "workloads": ["a"]},
+    {"workload": {"generate": {"n": 30, "seed": 1, "bursts": "pareto"}}},
+    {"workload": {"generate": {"n": 30, "model": {}}}},
+])
+def test_malformed_requests_are_value_errors(spec):
+    with pytest.raises(ValueError):
+        normalize(spec)
+
+
+def test_unseeded_generate_workloads_get_a_seed():
+    seeded = normalize({"workload": {"generate": {"n": 30, "seed": 1, "arrival": "mmpp"}}})
+    assert seeded["workload"]["generate"] == {"n": 30, "seed": 1, "arrival": "mmpp"}
+    first, second = (normalize({"workload": {"generate": {"n": 30, "seed": None}}})
+                     for _ in range(2))
+    assert isinstance(first["workload"]["generate"]["seed"], int)
+    # Two unseeded requests are two samples, not one deduplicated run
+    assert job_id(first) != job_id(second)
+    # ...but a normalized spec keeps the seed it was given
+    assert normalize(first) == first
+
+
+def test_path_workloads_stay_in_the_workload_dir(tmp_path):
+    inside = tmp_path / "jobs"
+    inside.mkdir()
+    (inside / "a.csv").write_text("pid,arrival,burst\nP1,0,2\n")
+    (tmp_path / "secret.csv").write_text("pid,arrival,burst\n")
+    os.symlink(tmp_path / "secret.csv", inside / "link.csv")
+
+    with pytest.raises(ValueError, match="disabled"):
+        normalize({"workload": {"path": "a.csv"}})
+    spec = normalize({"workload": {"path": "a.csv"}}, inside)
+    assert spec["workload"]["path"] == str(inside / "a.csv")
+    # Normalized specs go through again unchanged (sweep children)
+    assert normalize(spec, inside)["workload"] == spec["workload"]
+    for escape in ("../secret.csv", str(tmp_path / "secret.csv"), "link.csv"):
+        with pytest.raises(ValueError, match="outside"):
+            normalize({"workload": {"path": escape}}, inside)
+    with pytest.raises(ValueError):
+        normalize({"workload": {"path": ["a.csv"]}}, inside)
+
+
+# ---------------------------------------------------------------------------
+# HTTP
+# ---------------------------------------------------------------------------
+async def request(port, method, path, body=None):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    data = b"" if body is None else body.encode()
+    writer.write(f"{method} {path} HTTP/1.1\r\nContent-Length: {len(data)}\r\n\r\n".encode()
+                 + data)
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+    head, _, payload = response.partition(b"\r\n\r\n")
+    return int(head.split()[1]), json.loads(payload)
+
+
+def test_bad_bodies_get_400_and_bugs_get_500():
+    async def main():
+        service = SimulationService(workers=1)
+        server = await asyncio.start_server(service._handle, "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        async with server:
+            for body in ("[1, 2]", "null", "\"x\"", "{not json", '{"workload": {"records": 5}}'):
+                status, payload = await request(port, "POST", "/jobs", body)
+                assert status == 400 and payload["error"], body
+
+            def broken(spec):
+                raise RuntimeError("boom")
+            service.submit = broken
+            status, payload = await request(port, "POST", "/jobs", "{}")
+            assert (status, payload["error"]) == (500, "RuntimeError: boom")
+            # The server is still up
+            status, payload = await request(port, "GET", "/health")
+            assert status == 200 and payload["status"] == "ok"
+
+    asyncio.run(main())
+
+
+# ---------------------------------------------------------------------------
+# EVICTION
+# ---------------------------------------------------------------------------
+def finished_job(service, tmp_path, name, age=10.0, kind="simulate", rows=()):
+    job = Job(name, {"kind": kind})
+    if kind == "simulate":
+        trace = tmp_path / f"{name}.trace"
+        trace.write_text("x")
+        job.result = {"trace": str(trace)}
+    else:
+        job.result = {"rows": list(rows)}
+    job.status = "done"
+    job.ended = time.time() - age
+    service.jobs[name] = job
+    return job
+
+
+def test_eviction_spares_pinned_referenced_and_recent_jobs(tmp_path):
+    service = SimulationService(workers=1, data_dir=str(tmp_path), max_jobs=2, trace_ttl=5)
+    old = finished_job(service, tmp_path, "old")
+    pinned = finished_job(service, tmp_path, "pinned")
+    pinned.pins = 1
+    child = finished_job(service, tmp_path, "child")
+    finished_job(service, tmp_path, "sweep", kind="sweep", rows=[child.result])
+    recent = finished_job(service, tmp_path, "recent", age=0.0)
+    running = Job("running", {"kind": "simulate"})
+    service.jobs["running"] = running
+
+    service._evict()
+    assert set(service.jobs) == {"pinned", "child", "recent", "running"}
+    assert not os.path.exists(old.result["trace"])
+    for job in (pinned, child, recent):
+        assert os.path.exists(job.result["trace"])
+
+    # Once the sweep is gone (and nothing waits on them), its runs can go too
+    pinned.pins = 0
+    service._evict()
+    assert set(service.jobs) == {"recent", "running"}
+    assert os.path.exists(recent.result["trace"])
+
+
+def test_eviction_goes_by_finish_time(tmp_path):
+    service = SimulationService(workers=1, data_dir=str(tmp_path), max_jobs=2, trace_ttl=0)
+    # Submitted first but finished last
+    finished_job(service, tmp_path, "late", age=1.0)
+    finished_job(service, tmp_path, "early", age=30.0)
+    finished_job(service, tmp_path, "middle", age=20.0)
+    service._evict()
+    assert set(service.jobs) == {"late", "middle"}
+
+
+def test_quiet_jobs_stream_heartbeats():
+    async def main():
+        service = SimulationService(workers=1)
+        service.heartbeat = 0.05
+        job = service.jobs["quiet"] = Job("quiet", {"kind": "simulate"})
+        job.update(status="running", progress={"arrived": 3})
+        server = await asyncio.start_server(service._handle, "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        client = ServiceClient(f"http://127.0.0.1:{port}", timeout=0.5)
+
+        def read():
+            return list(client.events("quiet"))
+
+        async with server:
+            loop = asyncio.get_running_loop()
+            reading = loop.run_in_executor(None, read)
+            # Longer than the client's timeout without a real update
+            await asyncio.sleep(1.2)
+            job.update(status="done", result={"energy": 1.0})
+            return await reading
+
+    events = asyncio.run(main())
+    assert len(events) > 10
+    assert all(e["status"] == "running" and e["progress"] == {"arrived": 3}
+               for e in events[:-2])
+    assert events[-1]["status"] == "done" and events[-1]["result"] == {"energy": 1.0}
+
+
+def test_sweep_runs_end_to_end(tmp_path):
+    async def main():
+        service = SimulationService(workers=2, data_dir=str(tmp_path / "data"), max_jobs=1,
+                                    trace_ttl=0, workload_dir=str(tmp_path))
+        (tmp_path / "jobs.csv").write_text(
+            "pid,arrival,burst\n" + "".join(f"P{i},{i},{1 + i % 3}\n" for i in range(20)))
+        await service.start()
+        try:
+            job = service.submit({"kind": "sweep", "quanta": [1, 2],
+                                  "workloads": {"gen": GENERATE, "file": {"path": "jobs.csv"}}})
+            await asyncio.wait_for(job.finished.wait(), 60)
+            assert job.status == "done", job.error
+            rows = job.result["rows"]
+            assert len(rows) == 8
+            # max_jobs is 1, but nothing a retained sweep lists is deleted
+            assert all(os.path.exists(row["trace"]) for row in rows)
+        finally:
+            await service.close()
+
+    asyncio.run(main())
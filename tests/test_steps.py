@@ -0,0 +1,59 @@
+# tests/test_steps.py
+import pytest
+
+from disciplines import DISCIPLINES
+from multicore import MultiCoreScheduler
+from powercap import PowerCapGovernor
+from scheduler import RoundRobinScheduler, Scheduler
+from workload import generate_workload
+
+# Bursty arrivals, so runs go idle between busy periods
+PROCESSES = generate_workload(80, arrival="mmpp", seed=5)
+
+MAKERS = {
+    "rr": lambda: RoundRobinScheduler(PROCESSES, quantum=1.3),
+    "earr": lambda: RoundRobinScheduler(PROCESSES, quantum=1.3, energy_aware=True),
+    **{f"discipline-{name}": (lambda name=name: Scheduler(PROCESSES, discipline=name,
+                                                        energy_aware=True))
+       for name in DISCIPLINES},
+    "ondemand": lambda: Scheduler(PROCESSES, governor="ondemand"),
+    "power-cap": lambda: Scheduler(PROCESSES, governor=PowerCapGovernor(joules=8, window=10)),
+    "multicore": lambda: MultiCoreScheduler(PROCESSES, n_cores=3, energy_aware=True),
+    "streamed": lambda: RoundRobinScheduler(iter(PROCESSES), quantum=2, energy_aware=True),
+}
+
+
+def outcome(sched, completed):
+    traces = getattr(sched, "core_traces", None) or [sched.trace]
+    return (sched.energy, sched.time, sched.n_completed, sched.total_turnaround,
+            [(p.pid, p.completion, p.waiting, p.turnaround) for p in completed],
+            [list(t.gantt) for t in traces])
+
+
+@pytest.mark.parametrize("kind", sorted(MAKERS))
+def test_steps_to_completion_match_simulate(kind):
+    make = MAKERS[kind]
+    whole = make()
+    expected = outcome(whole, whole.simulate())
+    stepped = make()
+    reports = list(stepped.steps(events=9))
+    assert len(reports) > 1
+    assert reports[-1]["finished"] and stepped.finished
+    assert reports[-1]["completed"] == len(PROCESSES)
+    assert outcome(stepped, stepped.simulate()) == expected
+
+
+@pytest.mark.parametrize("kind", sorted(MAKERS))
+def test_checkpoint_resume_matches_uninterrupted_run(kind, tmp_path):
+    make = MAKERS[kind]
+    whole = make()
+    expected = outcome(whole, whole.simulate())
+    sched = make()
+    sched.advance(events=25)
+    sched.advance(until=whole.time / 2)
+    assert not sched.finished
+    path = tmp_path / "run.ckpt"
+    sched.checkpoint(path)
+    source = iter(PROCESSES) if kind == "streamed" else None
+    resumed = type(sched).restore(path, source=source)
+    assert outcome(resumed, resumed.simulate()) == expected
@@ -0,0 +1,36 @@
+# tests/test_sweep.py
+from reference import random_workload, reference_simulate
+from sweep import config_key, load_results, run_sweep, sweep_grid
+
+SETS = {"a": random_workload(1), "b": random_workload(2)}
+
+
+def test_keys_ignore_the_set_name():
+    first = {c["key"] for c in sweep_grid({"a": SETS["a"]}, [1, 2])}
+    renamed = {c["key"] for c in sweep_grid({"z": SETS["a"]}, [1, 2])}
+    assert first == renamed and len(first) == 4
+
+
+def test_rows_match_the_original_loop(tmp_path):
+    out = tmp_path / "sweep.csv"
+    assert run_sweep(sweep_grid(SETS, [0.7, 2]), out, workers=2, chunksize=3) == 8
+    df = load_results(out)
+    assert len(df) == 8
+    for row in df.itertuples():
+        energy, _, _, metrics = reference_simulate(SETS[row.process_set], row.quantum,
+                                                   row.energy_aware)
+        assert row.energy == energy
+        assert row.n_processes == len(metrics)
+
+
+def test_resumes_after_a_torn_row(tmp_path):
+    out = tmp_path / "sweep.csv"
+    configs = list(sweep_grid(SETS, [1, 3]))
+    run_sweep(configs[:5], out, workers=1)
+    # Simulate a crash mid-write: the last row loses its tail
+    text = out.read_text()
+    out.write_text(text[:-10])
+    assert run_sweep(configs, out, workers=1) == 4
+    df = load_results(out)
+    assert sorted(df["key"]) == sorted(config_key(c) for c in configs)
+    assert run_sweep(configs, out, workers=1) == 0
@@ -0,0 +1,109 @@
+# tests/test_trace_index.py
+import numpy as np
+import pytest
+
+from scheduler import RoundRobinScheduler
+from trace_index import TraceIndex
+from trace_io import TraceFile, write_trace
+from trace_recorder import IDLE
+from workload import generate_workload
+
+
+@pytest.fixture(scope="module")
+def run():
+    sched = RoundRobinScheduler(generate_workload(120, arrival="mmpp", seed=7),
+                                energy_aware=True)
+    sched.simulate()
+    return sched
+
+
+def brute(trace, t1, t2):
+    # Segment by segment, clipped to [t1, t2)
+    energy = busy = 0.0
+    for start, end, power, level in zip(trace.column("start"), trace.column("end"),
+                                        trace.column("power"), trace.column("level")):
+        overlap = max(0.0, min(end, t2) - max(start, t1))
+        energy += overlap * power
+        if level != IDLE:
+            busy += overlap
+    return energy, busy
+
+
+def test_windows_match_brute_force(run):
+    index = TraceIndex(run.trace)
+    lo, hi = index.span
+    rng = np.random.default_rng(0)
+    for _ in range(300):
+        t1, t2 = np.sort(rng.uniform(lo - 5, hi + 5, 2))
+        energy, busy = brute(run.trace, t1, t2)
+        assert index.energy(t1, t2) == pytest.approx(energy, abs=1e-9)
+        assert index.busy_time(t1, t2) == pytest.approx(busy, abs=1e-9)
+        assert index.utilization(t1, t2) == pytest.approx(busy / (t2 - t1), abs=1e-12)
+        assert index.average_power(t1, t2) == pytest.approx(energy / (t2 - t1), abs=1e-12)
+
+
+def test_whole_run(run):
+    index = TraceIndex(run.trace)
+    lo, hi = index.span
+    assert index.energy(lo, hi) == pytest.approx(brute(run.trace, lo, hi)[0])
+    busy = index.level != IDLE
+    assert index.energy(lo, hi) - index.energy(lo, lo) == pytest.approx(
+        float(((index.end - index.start) * index.power).sum()))
+    assert index.busy_time(lo, hi) == pytest.approx(float((index.end - index.start)[busy].sum()))
+    assert index.utilization(3, 3) == 0 and index.average_power(3, 3) == 0
+
+
+def test_vectorized_queries_match_scalar_ones(run):
+    index = TraceIndex(run.trace)
+    lo, hi = index.span
+    edges = np.linspace(lo, hi, 41)
+    stats = index.window_stats(edges)
+    assert len(stats) == 40
+    for i, row in enumerate(stats.itertuples()):
+        assert row.energy == index.energy(edges[i], edges[i + 1])
+        assert row.busy_time == index.busy_time(edges[i], edges[i + 1])
+    assert stats["energy"].sum() == pytest.approx(index.energy(lo, hi))
+    rows = index.locate(edges[:-1])
+    assert [index.locate(t) for t in edges[:-1]] == list(rows)
+
+
+def test_point_lookups(run):
+    index = TraceIndex(run.trace)
+    gantt = list(run.gantt)
+    start, pid, level = gantt[10]
+    row = int(index.locate(start))
+    assert index.start[row] == start
+    info = index.at(start)
+    assert (info["pid"], info["level"]) == (pid, level)
+    idle = int(np.flatnonzero(index.level == IDLE)[0])
+    assert index.at(index.start[idle])["pid"] is None
+    assert index.at(index.start[idle])["level"] == "IDLE"
+    assert index.at(-1) is None and index.at(index.span[1]) is None
+    assert index.locate(index.span[1] + 10) == -1
+
+
+def test_rows_are_the_overlapping_segments(run):
+    index = TraceIndex(run.trace)
+    t1, t2 = index.start[20] + 0.01, index.end[35] - 0.01
+    lo, hi = index.rows(t1, t2)
+    assert (lo, hi) == (20, 36)
+    assert index.rows(t2, t1)[1] >= index.rows(t2, t1)[0]
+
+
+def test_trace_files_and_windows(run, tmp_path):
+    saved = TraceFile(write_trace(tmp_path / "run.trace", run))
+    index, direct = TraceIndex(saved), TraceIndex(run.trace)
+    lo, hi = direct.span
+    mid = (lo + hi) / 2
+    assert index.energy(lo, mid) == direct.energy(lo, mid)
+    # An index over a window answers for the segments it holds
+    view = TraceIndex(saved.window(lo, mid))
+    assert view.energy(lo, mid) == pytest.approx(direct.energy(lo, mid))
+
+
+def test_empty_trace():
+    sched = RoundRobinScheduler([])
+    sched.simulate()
+    index = TraceIndex(sched.trace)
+    assert len(index) == 0 and index.span == (0.0, 0.0)
+    assert index.energy(0, 10) == 0 and index.locate(1) == -1 and index.at(1) is None
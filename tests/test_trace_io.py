@@ -0,0 +1,120 @@
+# tests/test_trace_io.py
+import numpy as np
+import pytest
+
+from process_table import ProcessTable
+from reference import random_workload
+from scheduler import RoundRobinScheduler
+from trace_io import MAGIC, SEGMENT_COLUMNS, TraceFile, compare_traces, write_trace
+from workload import generate_arrays, generate_workload
+
+
+def finished_run(seed=4, **kwargs):
+    sched = RoundRobinScheduler(random_workload(seed), quantum=1.3, energy_aware=True, **kwargs)
+    done = sched.simulate()
+    return sched, done
+
+
+def test_round_trip(tmp_path):
+    sched, done = finished_run()
+    saved = TraceFile(write_trace(tmp_path / "run.trace", sched, meta={"policy": "EARR"}))
+    assert len(saved) == len(sched.trace)
+    for name, _ in SEGMENT_COLUMNS:
+        assert isinstance(saved.column(name), np.memmap)
+        np.testing.assert_array_equal(saved.column(name), sched.trace.column(name))
+    assert list(saved.gantt) == list(sched.gantt)
+    assert list(saved.power_trace) == list(sched.power_trace)
+    assert saved.levels == list(sched.trace.levels) and saved.meta == {"policy": "EARR"}
+
+    procs = saved.processes()
+    assert list(procs["pid"]) == [p.pid for p in done]
+    assert list(procs["completion"]) == [p.completion for p in done]
+    assert list(procs["waiting"]) == [p.waiting for p in done]
+    assert list(procs["turnaround"]) == [p.turnaround for p in done]
+
+    summary = saved.summary()
+    assert summary["policy"] == "EARR" and summary["energy"] == sched.energy
+    assert summary["makespan"] == sched.time and summary["n_completed"] == len(done)
+    assert saved.total_energy == sched.energy_report().total
+    assert saved.energy_report().total == pytest.approx(sched.energy_report().total)
+
+
+def test_table_runs_with_numpy_pids(tmp_path):
+    arrivals, bursts = generate_arrays(200, "poisson", seed=1)
+    table = ProcessTable.from_arrays(np.arange(200), arrivals, bursts)
+    sched = RoundRobinScheduler(table)
+    sched.simulate()
+    saved = TraceFile(write_trace(tmp_path / "run.trace", sched))
+    assert saved.pids == list(range(200))
+    assert list(saved.gantt) == list(sched.gantt)
+    np.testing.assert_array_equal(saved.processes()["turnaround"],
+                                  table.column("turnaround")[sched._result])
+
+
+def test_unfinished_run(tmp_path):
+    sched = RoundRobinScheduler(generate_workload(60, seed=2))
+    sched.advance(events=40)
+    saved = TraceFile(write_trace(tmp_path / "part.trace", sched))
+    progress = sched.progress()
+    assert not saved.header["finished"]
+    assert saved.header["n_completed"] == progress["completed"] > 0
+    assert saved.summary()["avg_turnaround"] == progress["avg_turnaround"]
+    assert len(saved.processes()) == progress["completed"]
+    assert (saved.processes()["waiting"] >= 0).all()
+
+
+def test_window_views(tmp_path):
+    sched = RoundRobinScheduler(generate_workload(100, seed=3), energy_aware=True)
+    sched.simulate()
+    saved = TraceFile(write_trace(tmp_path / "run.trace", sched))
+    start, end = saved.column("start"), saved.column("end")
+    t0, t1 = float(start[30]) + 0.01, float(end[70]) - 0.01
+    view = saved.window(t0, t1)
+    assert view.rows == (30, 71) and len(view) == 41
+    assert view.span == (float(start[30]), float(end[70]))
+    np.testing.assert_array_equal(view.column("pid"), saved.column("pid")[30:71])
+    # Windows of windows keep file row numbers
+    inner = view.window(float(start[40]), float(start[50]))
+    assert inner.rows == (40, 50)
+    assert len(saved.window(-10, -5)) == 0 and saved.window(5, 5).rows[1] >= 0
+    # The whole-run figures do not shrink with the view
+    assert view.total_energy == saved.total_energy
+
+
+def test_empty_and_untraced_runs(tmp_path):
+    sched = RoundRobinScheduler([])
+    sched.simulate()
+    saved = TraceFile(write_trace(tmp_path / "empty.trace", sched))
+    assert len(saved) == 0 and saved.span == (0.0, 0.0) and len(saved.processes()) == 0
+    with pytest.raises(ValueError):
+        write_trace(tmp_path / "none.trace", finished_run(record_trace=False)[0])
+
+
+def test_bad_magic(tmp_path):
+    path = tmp_path / "junk.trace"
+    path.write_bytes(b"not a trace at all")
+    with pytest.raises(ValueError):
+        TraceFile(path)
+
+
+def test_old_files_recompute_total_energy(tmp_path):
+    sched, _ = finished_run(seed=9)
+    path = write_trace(tmp_path / "run.trace", sched)
+    data = path.read_bytes()
+    # Same length, so the column offsets stay valid
+    path.write_bytes(data.replace(b'"total_energy"', b'"total_energx"', 1))
+    old = TraceFile(path)
+    assert "total_energy" not in old.header
+    assert old.total_energy == pytest.approx(sched.energy_report().total)
+    assert path.read_bytes()[:len(MAGIC)] == MAGIC
+
+
+def test_compare_traces(tmp_path):
+    paths = []
+    for aware in (False, True):
+        sched = RoundRobinScheduler(random_workload(11), energy_aware=aware)
+        sched.simulate()
+        paths.append(write_trace(tmp_path / f"{aware}.trace", sched, meta={"aware": aware}))
+    df = compare_traces(paths[0], TraceFile(paths[1]))
+    assert list(df["aware"]) == [False, True]
+    assert df["energy"][1] < df["energy"][0]
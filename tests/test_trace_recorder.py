@@ -0,0 +1,97 @@
+# tests/test_trace_recorder.py
+import pickle
+
+import pytest
+
+from energy_module import PowerModel
+from governors import Governor
+from reference import random_workload
+from scheduler import RoundRobinScheduler, Scheduler
+from trace_io import TraceFile, write_trace
+from trace_recorder import IDLE, TraceRecorder
+
+
+class CycleGovernor(Governor):
+    """Walks through every level in turn, so a run touches all of them."""
+
+    def reset(self, model):
+        super().reset(model)
+        self._i = -1
+
+    def select(self, state):
+        self._i = (self._i + 1) % len(self.levels)
+        return self.levels[self._i]
+
+
+def many_levels(n):
+    return PowerModel({f"P{i}": 0.5 + i / n for i in range(n)})
+
+
+def test_tuple_views_match_recorded_segments():
+    sched = RoundRobinScheduler(random_workload(3), quantum=1.3, energy_aware=True)
+    sched.simulate()
+    trace = sched.trace
+    level = trace.column("level")
+    assert len(trace.gantt) == int((level != IDLE).sum())
+    assert len(trace.power_trace) == len(trace)
+    assert [p for _, p in trace.power_trace] == list(trace.column("power"))
+
+
+def test_gantt_indexing_matches_iteration():
+    sched = RoundRobinScheduler(random_workload(7), quantum=0.7, energy_aware=True)
+    sched.simulate()
+    gantt = sched.gantt
+    items = list(gantt)
+    assert any(lv == IDLE for lv in sched.trace.column("level"))
+    for i in range(-len(items), len(items)):
+        assert gantt[i] == items[i]
+    assert gantt[2:7] == items[2:7]
+    assert gantt[::-3] == items[::-3]
+    with pytest.raises(IndexError):
+        gantt[len(items)]
+
+
+def test_gantt_view_and_its_index_are_kept():
+    sched = RoundRobinScheduler(random_workload(5), quantum=1, energy_aware=True)
+    sched.simulate()
+    trace = sched.trace
+    assert sched.gantt is trace.gantt
+    first = sched.gantt[0]
+    rows = trace.gantt._rows
+    for i in range(len(trace.gantt)):
+        sched.gantt[i]
+    assert trace.gantt._rows is rows
+    # Recording more rebuilds it
+    trace.record(sched.time, sched.time + 1, first[1], first[2], 1.0)
+    assert sched.gantt[-1] == (sched.time, first[1], first[2])
+    assert trace.gantt._rows is not rows
+    copy = pickle.loads(pickle.dumps(trace))
+    assert copy.gantt is not trace.gantt and list(copy.gantt) == list(trace.gantt)
+
+
+def test_more_than_127_levels():
+    model = many_levels(300)
+    processes = [{"pid": f"J{i}", "arrival": i, "burst": 5} for i in range(150)]
+    sched = Scheduler(processes, quantum=1, model=model, governor=CycleGovernor())
+    sched.simulate()
+    ordered = sorted(model.freq_levels, key=model.freq_levels.get)
+    labels = [label for _, _, label in sched.gantt]
+    assert len(labels) > 300
+    # The governor cycles through the table, so slice i ran at level i % 300
+    assert labels == [ordered[i % 300] for i in range(len(labels))]
+    assert sched.trace.column("level").max() == 299
+
+
+def test_trace_file_keeps_wide_levels(tmp_path):
+    model = many_levels(200)
+    processes = [{"pid": f"J{i}", "arrival": i, "burst": 4} for i in range(100)]
+    sched = Scheduler(processes, quantum=1, model=model, governor=CycleGovernor())
+    sched.simulate()
+    saved = TraceFile(write_trace(tmp_path / "run.trace", sched))
+    assert list(saved.gantt) == list(sched.gantt)
+    assert saved.gantt[250] == sched.gantt[250]
+
+
+def test_level_table_too_large():
+    with pytest.raises(ValueError):
+        TraceRecorder([f"L{i}" for i in range(TraceRecorder.MAX_LEVELS + 1)])
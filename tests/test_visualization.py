@@ -0,0 +1,53 @@
+# tests/test_visualization.py
+import matplotlib
+import numpy as np
+import pytest
+
+matplotlib.use("Agg")
+
+from reference import random_workload  # noqa: E402
+from scheduler import RoundRobinScheduler  # noqa: E402
+from visualization import Visualizer  # noqa: E402
+from workload import generate_table  # noqa: E402
+
+
+def run(processes, **options):
+    sched = RoundRobinScheduler(processes, energy_aware=True, **options)
+    sched.simulate()
+    return sched
+
+
+def test_segments_use_true_slice_ends():
+    sched = run(random_workload(6), quantum=1.3)
+    start, end, row, level, rows, levels = Visualizer.gantt_segments(sched.gantt)
+    busy = sched.trace.column("level") != -1
+    # Merging adjacent slices keeps every busy instant and adds none
+    assert (end - start).sum() == pytest.approx(
+        (sched.trace.column("end") - sched.trace.column("start"))[busy].sum())
+    assert sorted(rows) == sorted({p for _, p, _ in sched.gantt})
+    assert set(levels) == {"LOW", "MED", "HIGH"}
+
+
+def test_level_of_detail_bounds_rectangles():
+    sched = run(generate_table(5000, seed=1), quantum=1, record_trace=True)
+    start, end, row, level, rows, _ = Visualizer.gantt_segments(
+        sched.gantt, pixels=200, max_rows=50, max_segments=2000)
+    assert len(rows) <= 50
+    assert len(start) <= 50 * 201
+    assert np.all(end >= start)
+
+
+def test_plain_gantt_lists_still_plot():
+    gantt = [(0, "P1", "LOW"), (2, "P2", "HIGH"), (3.5, "P1", "MED")]
+    fig = Visualizer.plot_gantt_chart(gantt, "list")
+    assert fig.axes[0].collections
+    start, end, *_ = Visualizer.gantt_segments(gantt)
+    # Sorted by row: P1 at 0 and 3.5, then P2
+    assert list(end - start) == [2, 1, 1.5]
+
+
+def test_dashboard_renders():
+    rr = RoundRobinScheduler(random_workload(2), quantum=2)
+    earr = RoundRobinScheduler(random_workload(2), quantum=2, energy_aware=True)
+    fig = Visualizer.generate_dashboard(rr, earr, rr.simulate(), earr.simulate())
+    assert len(fig.axes) == 4
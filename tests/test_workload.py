@@ -0,0 +1,126 @@
+# tests/test_workload.py
+import json
+
+import numpy as np
+import pytest
+
+from scheduler import RoundRobinScheduler
+from workload import (ARRIVALS, BURSTS, generate_arrays, generate_table, generate_workload,
+                      read_trace, sort_by_arrival, stream_workload)
+
+
+def write_jsonl(path, rows):
+    path.write_text("\n".join(r if isinstance(r, str) else json.dumps(r) for r in rows) + "\n")
+    return path
+
+
+def test_reads_csv_and_jsonl(tmp_path):
+    csv_path = tmp_path / "jobs.csv"
+    csv_path.write_text("pid,arrival,burst,deadline\nA,0,3,\nB,1.5,2,9\n")
+    jsonl_path = write_jsonl(tmp_path / "jobs.jsonl", [
+        {"pid": "A", "arrival": 0, "burst": 3}, "", {"pid": "B", "arrival": 1.5, "burst": 2,
+                                                     "deadline": 9}])
+    expected = [{"pid": "A", "arrival": 0, "burst": 3},
+                {"pid": "B", "arrival": 1.5, "burst": 2, "deadline": 9.0}]
+    assert list(read_trace(csv_path)) == expected
+    assert list(read_trace(jsonl_path)) == expected
+
+
+@pytest.mark.parametrize("line, message", [
+    ('{"pid": "B", "arrival": 1', "invalid JSON"),
+    ('[1, 2, 3]', "expected a JSON object, got list"),
+    ('7', "expected a JSON object, got int"),
+    ('{"pid": "B", "arrival": -1, "burst": 2}', "arrival must be finite and >= 0"),
+    ('{"pid": "B", "arrival": Infinity, "burst": 2}', "arrival must be finite"),
+    ('{"pid": "B", "arrival": 1, "burst": NaN}', "burst must be finite"),
+    ('{"pid": "B", "arrival": 1, "burst": 2, "deadline": "inf"}', "deadline must be finite"),
+    ('{"pid": "B", "burst": 2}', "missing column 'arrival'"),
+])
+def test_bad_jsonl_rows_report_path_and_line(tmp_path, line, message):
+    path = write_jsonl(tmp_path / "bad.jsonl", [{"pid": "A", "arrival": 0, "burst": 1}, "", line])
+    with pytest.raises(ValueError, match=f"bad.jsonl:3: {message}"):
+        list(read_trace(path))
+
+
+def test_infinite_csv_rows_are_rejected(tmp_path):
+    path = tmp_path / "jobs.csv"
+    path.write_text("pid,arrival,burst\nA,0,3\nB,inf,2\n")
+    with pytest.raises(ValueError, match="jobs.csv:3: arrival must be finite"):
+        list(read_trace(path))
+
+
+def test_external_sort_is_stable_across_runs(tmp_path):
+    records = [{"pid": i, "arrival": (i * 7) % 10} for i in range(95)]
+    got = list(sort_by_arrival(iter(records), run_size=8, tmpdir=tmp_path))
+    assert got == sorted(records, key=lambda r: r["arrival"])
+    assert not list(tmp_path.iterdir())
+
+
+def test_streamed_workload_runs_like_a_list(tmp_path):
+    rows = [{"pid": f"P{i}", "arrival": (i * 3) % 17, "burst": 1 + i % 4} for i in range(40)]
+    path = write_jsonl(tmp_path / "jobs.jsonl", rows)
+    streamed = RoundRobinScheduler(stream_workload(path, run_size=7, tmpdir=tmp_path), quantum=2)
+    streamed.simulate()
+    listed = RoundRobinScheduler(sorted(rows, key=lambda r: r["arrival"]), quantum=2)
+    listed.simulate()
+    assert streamed.energy == listed.energy
+    assert list(streamed.gantt) == list(listed.gantt)
+
+
+# ---------------------------------------------------------------------------
+# SYNTHETIC GENERATION
+# ---------------------------------------------------------------------------
+@pytest.mark.parametrize("arrival", ARRIVALS)
+def test_generated_arrivals_are_sorted_seeded_and_at_rate(arrival):
+    arrivals, bursts = generate_arrays(20_000, arrival, "uniform", rate=0.5, seed=1,
+                                       decimals=None)
+    again, _ = generate_arrays(20_000, arrival, "uniform", rate=0.5, seed=1, decimals=None)
+    np.testing.assert_array_equal(arrivals, again)
+    assert (np.diff(arrivals) >= 0).all() and len(bursts) == 20_000
+    # Same long-run rate whatever the pattern
+    assert len(arrivals) / arrivals[-1] == pytest.approx(0.5, rel=0.15)
+
+
+@pytest.mark.parametrize("burst", BURSTS)
+def test_generated_bursts(burst):
+    _, bursts = generate_arrays(50_000, "poisson", burst, burst_mean=4.0, seed=2, decimals=None)
+    if burst == "uniform":
+        assert set(np.unique(bursts)) <= set(range(2, 9))
+    elif burst != "pareto":
+        assert bursts.mean() == pytest.approx(4.0, rel=0.05)
+    _, capped = generate_arrays(1000, "poisson", burst, max_burst=3, seed=2)
+    assert capped.max() <= 3 and capped.min() >= 0.01
+
+
+def test_table_and_dicts_hold_the_same_jobs():
+    table = generate_table(50, "mmpp", seed=3, pid_prefix="J")
+    jobs = generate_workload(50, "mmpp", seed=3, pid_prefix="J")
+    assert table.pids == [j["pid"] for j in jobs]
+    assert table.column("arrival").tolist() == [j["arrival"] for j in jobs]
+    assert generate_workload(0) == []
+    assert len(generate_table(np.int64(5), seed=3)) == 5
+
+
+@pytest.mark.parametrize("options, message", [
+    ({"n": -1}, "n must be"),
+    ({"n": 2.5}, "n must be an integer"),
+    ({"n": "10"}, "n must be an integer"),
+    ({"n": True}, "n must be an integer"),
+    ({"rate": 0}, "rate must be"),
+    ({"rate": -2.0}, "rate must be"),
+    ({"load": 0}, "rate must be"),
+    ({"arrival": "diurnal", "amplitude": 1.0}, "amplitude"),
+    ({"arrival": "diurnal", "amplitude": -0.1}, "amplitude"),
+    ({"arrival": "diurnal", "period": 0}, "period"),
+    ({"arrival": "mmpp", "burstiness": 0}, "burstiness"),
+    ({"arrival": "mmpp", "burstiness": -3.0}, "burstiness"),
+    ({"arrival": "mmpp", "dwell": (100.0, 0)}, "dwell"),
+    ({"arrival": "mmpp", "dwell": (-1.0, 10.0)}, "dwell"),
+    ({"arrival": "mmpp", "dwell": (100.0,)}, "dwell"),
+    ({"arrival": "weekly"}, "Unknown arrival"),
+    ({"burst": "pareto", "alpha": 1.0}, "alpha"),
+])
+def test_generator_rejects_bad_parameters(options, message):
+    options = {"n": 100, **options}
+    with pytest.raises(ValueError, match=message):
+        generate_arrays(options.pop("n"), **options)
@@ -0,0 +1,139 @@
+# trace_index.py
+import numpy as np
+
+from trace_recorder import IDLE
+
+
+class TraceIndex:
+    """Time-window queries over a finished trace in O(log n) each.
+
+       Works on anything with TraceRecorder columns (a TraceRecorder, a
+       trace_io.TraceFile or one of its windows). Segments are in time
+       order and never overlap, so their start and end columns are both
+       sorted; a query is a binary search plus prefix sums of energy
+       and busy time. Every query method also takes arrays of times and
+       answers them all in one vectorized pass.
+
+       Energy here is segment energy (busy and idle); frequency-switch
+       energy is not spread over time (see energy_accounting)."""
+
+    def __init__(self, trace):
+        self.trace = trace
+        self.pids = list(trace.pids)
+        self.levels = list(trace.levels)
+        self.start = np.asarray(trace.column("start"))
+        self.end = np.asarray(trace.column("end"))
+        self.level = np.asarray(trace.column("level"))
+        self.pid = np.asarray(trace.column("pid"))
+        self.power = np.asarray(trace.column("power"))
+
+        duration = self.end - self.start
+        busy = self.level != IDLE
+        self._busy = busy.astype(float)
+        # Prefix sums: _energy[i] / _busy_time[i] cover segments [0, i)
+        self._energy = np.concatenate([[0.0], np.cumsum(duration * self.power)])
+        self._busy_time = np.concatenate([[0.0], np.cumsum(np.where(busy, duration, 0.0))])
+
+    def __len__(self):
+        return len(self.start)
+
+    @property
+    def span(self):
+        if not len(self):
+            return (0.0, 0.0)
+        return (float(self.start[0]), float(self.end[-1]))
+
+    # -----------------------------------------------------------------------
+    # POINT LOOKUPS
+    # -----------------------------------------------------------------------
+    def locate(self, t):
+        """Row of the segment covering time `t` (start <= t < end), or -1
+           where no segment does (before the run, after it, in a gap)."""
+        t = np.asarray(t, dtype=float)
+        row = np.searchsorted(self.start, t, side="right") - 1
+        safe = np.clip(row, 0, max(len(self) - 1, 0))
+        covered = (row >= 0) & (t < self.end[safe]) if len(self) else np.zeros(t.shape, bool)
+        return np.where(covered, row, -1)
+
+    def at(self, t):
+        """What the CPU was doing at time `t`: a dict with pid (None when
+           idle), level ("IDLE" when idle) and power, or None when no
+           segment covers `t`."""
+        row = int(self.locate(t))
+        if row < 0:
+            return None
+        lv = int(self.level[row])
+        idle = lv == IDLE
+        return {
+            "time": float(t),
+            "pid": None if idle else self.pids[self.pid[row]],
+            "level": "IDLE" if idle else self.levels[lv],
+            "power": float(self.power[row]),
+            "segment": (float(self.start[row]), float(self.end[row])),
+        }
+
+    # -----------------------------------------------------------------------
+    # WINDOW QUERIES
+    # -----------------------------------------------------------------------
+    def _cumulative(self, t, prefix, weight):
+        # prefix value at time t: whole segments before t, plus the part
+        # of the segment t falls in
+        t = np.asarray(t, dtype=float)
+        if not len(self):
+            return np.zeros(t.shape)
+        row = np.searchsorted(self.start, t, side="right") - 1
+        safe = np.clip(row, 0, len(self) - 1)
+        partial = np.clip(np.minimum(t, self.end[safe]) - self.start[safe], 0, None) * weight[safe]
+        return np.where(row >= 0, prefix[safe] + partial, 0.0)
+
+    def energy(self, t1, t2):
+        """Energy consumed over [t1, t2), segments clipped at both ends."""
+        out = (self._cumulative(t2, self._energy, self.power)
+               - self._cumulative(t1, self._energy, self.power))
+        return float(out) if out.ndim == 0 else out
+
+    def busy_time(self, t1, t2):
+        """Time the CPU spent running jobs over [t1, t2)."""
+        out = (self._cumulative(t2, self._busy_time, self._busy)
+               - self._cumulative(t1, self._busy_time, self._busy))
+        return float(out) if out.ndim == 0 else out
+
+    def utilization(self, t1, t2):
+        """Busy fraction of [t1, t2) (0 for an empty window)."""
+        width = np.asarray(t2, dtype=float) - np.asarray(t1, dtype=float)
+        busy = np.asarray(self.busy_time(t1, t2))
+        out = np.divide(busy, width, out=np.zeros(width.shape), where=width > 0)
+        return float(out) if out.ndim == 0 else out
+
+    def average_power(self, t1, t2):
+        """Mean power over [t1, t2) (0 for an empty window)."""
+        width = np.asarray(t2, dtype=float) - np.asarray(t1, dtype=float)
+        energy = np.asarray(self.energy(t1, t2))
+        out = np.divide(energy, width, out=np.zeros(width.shape), where=width > 0)
+        return float(out) if out.ndim == 0 else out
+
+    def rows(self, t1, t2):
+        """(lo, hi): the rows of segments overlapping [t1, t2)."""
+        lo = int(np.searchsorted(self.end, t1, side="right"))
+        hi = int(np.searchsorted(self.start, t2, side="left"))
+        return lo, max(lo, hi)
+
+    def window_stats(self, edges):
+        """Energy, busy time, utilization and average power for each
+           consecutive window between sorted `edges`, as a DataFrame --
+           e.g. edges = np.linspace(t0, t1, 101) for 100 equal windows."""
+        import pandas as pd
+
+        edges = np.asarray(edges, dtype=float)
+        t1, t2 = edges[:-1], edges[1:]
+        return pd.DataFrame({
+            "start": t1,
+            "end": t2,
+            "energy": self.energy(t1, t2),
+            "busy_time": self.busy_time(t1, t2),
+            "utilization": self.utilization(t1, t2),
+            "avg_power": self.average_power(t1, t2),
+        })
+
+    def __repr__(self):
+        return f"TraceIndex({len(self)} segments, span={self.span})"
@@ -0,0 +1,251 @@
+# trace_io.py
+import json
+import os
+
+from energy_accounting import account
+from energy_module import PowerModel
+from trace_recorder import IDLE, GanttView, PowerTraceView
+
+MAGIC = b"EARRTRC1"
+ALIGN = 64
+
+# Fixed-width little-endian columns, each stored contiguously
+SEGMENT_COLUMNS = (("start", "<f8"), ("end", "<f8"), ("power", "<f8"),
+                   ("pid", "<i8"), ("level", "<i2"))
+PROCESS_COLUMNS = (("pid", "<i8"), ("arrival", "<f8"), ("burst", "<f8"),
+                   ("completion", "<f8"), ("waiting", "<f8"), ("turnaround", "<f8"))
+
+
+# ---------------------------------------------------------------------------
+# WRITING
+# ---------------------------------------------------------------------------
+def _plain(value):
+    # NumPy scalars (pids from from_arrays) are not JSON serializable
+    return value.item() if hasattr(value, "item") else value
+
+
+def _layout(columns, n, offset):
+    import numpy as np
+
+    layout = {}
+    for name, dtype in columns:
+        offset = -(-offset // ALIGN) * ALIGN
+        layout[name] = [offset, dtype]
+        offset += n * np.dtype(dtype).itemsize
+    return layout, offset
+
+
+def _write_column(f, offset, values, dtype, chunk=1 << 20):
+    import numpy as np
+
+    f.seek(offset)
+    for i in range(0, len(values), chunk):
+        np.asarray(values[i:i + chunk], dtype=dtype).tofile(f)
+
+
+def write_trace(path, sched, meta=None):
+    """Save a run's segments and completed-process metrics to `path`.
+
+       The file is a JSON header (levels, pids, power model, totals and
+       column offsets) followed by one contiguous fixed-width column per
+       field, each 64-byte aligned, so TraceFile can memory-map them.
+       `meta` is any extra JSON-serializable info (policy, quantum...).
+       Per-process rows recycled by a keep_completed=False run are not
+       kept, but the run's averages are."""
+    import numpy as np
+
+    trace = sched.trace
+    if trace is None:
+        raise ValueError("write_trace() needs a run with record_trace=True")
+
+    n = len(trace)
+    table = sched.table
+    done = np.asarray(sched.completed_rows(), dtype=np.int64)
+    table_pids = table.pids
+    proc = {
+        "pid": [trace.pid_index(table_pids[row]) for row in done.tolist()],
+        "arrival": table.column("arrival")[done],
+        "burst": table.column("burst")[done],
+        "completion": table.column("completion")[done],
+    }
+    if sched.finished:
+        proc["waiting"] = table.column("waiting")[done]
+        proc["turnaround"] = table.column("turnaround")[done]
+    else:
+        # Metrics are only filled in when the run finishes
+        turnaround = proc["completion"] - proc["arrival"]
+        proc["waiting"] = (turnaround - proc["burst"]).clip(0)
+        proc["turnaround"] = turnaround
+
+    progress = sched.progress()
+    header = {
+        "version": 1,
+        "levels": list(trace.levels),
+        "pids": [_plain(p) for p in trace.pids],
+        "model": sched.model.to_dict(),
+        "energy": sched.energy,
+        "total_energy": sched.energy_report().total,
+        "time": sched.time,
+        "finished": sched.finished,
+        "n_completed": progress["completed"],
+        "avg_waiting": progress["avg_waiting"],
+        "avg_turnaround": progress["avg_turnaround"],
+        "meta": meta or {},
+        "n_segments": n,
+        "n_processes": len(done),
+    }
+    # The header's own length shifts the columns, so lay them out
+    # against a generous upper bound on it
+    body = json.dumps(header).encode()
+    start = -(-(len(MAGIC) + 8 + len(body) + 4096) // ALIGN) * ALIGN
+    header["segments"], offset = _layout(SEGMENT_COLUMNS, n, start)
+    header["processes"], end = _layout(PROCESS_COLUMNS, len(done), offset)
+    body = json.dumps(header).encode()
+
+    tmp = f"{path}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(MAGIC)
+        f.write(len(body).to_bytes(8, "little"))
+        f.write(body)
+        for name, dtype in SEGMENT_COLUMNS:
+            _write_column(f, header["segments"][name][0], trace.column(name), dtype)
+        for name, dtype in PROCESS_COLUMNS:
+            _write_column(f, header["processes"][name][0], proc[name], dtype)
+        f.truncate(end)
+    os.replace(tmp, path)
+    return path
+
+
+# ---------------------------------------------------------------------------
+# READING
+# ---------------------------------------------------------------------------
+class TraceFile:
+    """A trace written by write_trace(), memory-mapped read-only.
+
+       Nothing is read until a column is touched, so multi-GB runs open
+       instantly; window() narrows to a time range without copying.
+       It quacks like a TraceRecorder (column(), pids, levels, gantt,
+       power_trace), so the Visualizer and energy_accounting take it
+       as is."""
+
+    def __init__(self, path):
+        import numpy as np
+
+        self.path = path
+        with open(path, "rb") as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"{path} is not a trace file (bad magic)")
+            size = int.from_bytes(f.read(8), "little")
+            header = json.loads(f.read(size))
+
+        self.header = header
+        self.levels = header["levels"]
+        self.pids = header["pids"]
+        self.model = PowerModel(**header["model"])
+        self.meta = header["meta"]
+        self.energy = header["energy"]
+        self.time = header["time"]
+
+        def mapped(layout, n):
+            if n == 0:
+                return {name: np.empty(0, dtype=dtype) for name, (_, dtype) in layout.items()}
+            return {name: np.memmap(path, dtype=dtype, mode="r", offset=offset, shape=(n,))
+                    for name, (offset, dtype) in layout.items()}
+
+        self._cols = mapped(header["segments"], header["n_segments"])
+        self._procs = mapped(header["processes"], header["n_processes"])
+        self._n = header["n_segments"]
+        # File rows [first, last) this view covers
+        self.rows = (0, self._n)
+
+    def __len__(self):
+        return self._n
+
+    @property
+    def _busy(self):
+        return int((self.column("level") != IDLE).sum())
+
+    def column(self, name):
+        return self._cols[name]
+
+    def columns(self):
+        return dict(self._cols)
+
+    @property
+    def gantt(self):
+        return GanttView(self)
+
+    @property
+    def power_trace(self):
+        return PowerTraceView(self)
+
+    @property
+    def span(self):
+        """(start, end) time covered by the segments in view."""
+        if not self._n:
+            return (0.0, 0.0)
+        return (float(self._cols["start"][0]), float(self._cols["end"][-1]))
+
+    def window(self, t0, t1):
+        """A view of the segments overlapping [t0, t1). Segments are in
+           time order, so this is two binary searches; segments are kept
+           whole, not clipped at the edges."""
+        import copy
+
+        lo = int(self._cols["end"].searchsorted(t0, side="right"))
+        hi = max(lo, int(self._cols["start"].searchsorted(t1, side="left")))
+        view = copy.copy(self)
+        view._cols = {name: col[lo:hi] for name, col in self._cols.items()}
+        view._n = hi - lo
+        base = self.rows[0]
+        view.rows = (base + lo, base + hi)
+        return view
+
+    def processes(self):
+        """Completed-process metrics as a DataFrame (pid, arrival, burst,
+           completion, waiting, turnaround), for the whole run."""
+        import pandas as pd
+
+        cols = dict(self._procs)
+        cols["pid"] = pd.Categorical.from_codes(cols["pid"], self.pids) \
+            if len(self.pids) else cols["pid"]
+        return pd.DataFrame(cols)
+
+    def energy_report(self):
+        """energy_accounting.account() over the segments in view."""
+        return account(self, self.model)
+
+    @property
+    def total_energy(self):
+        """Whole-run energy with idle time and switches (see energy_accounting)."""
+        total = self.header.get("total_energy")
+        if total is None:
+            # Files written before the header kept it
+            total = account(TraceFile(self.path), self.model).total
+        return total
+
+    def summary(self):
+        """Headline numbers of the whole run, without touching the segments."""
+        header = self.header
+        return {
+            "path": self.path,
+            **self.meta,
+            "energy": self.energy,
+            "total_energy": self.total_energy,
+            "makespan": self.time,
+            "n_segments": header["n_segments"],
+            "n_completed": header["n_completed"],
+            "avg_waiting": header["avg_waiting"],
+            "avg_turnaround": header["avg_turnaround"],
+        }
+
+    def __repr__(self):
+        return f"TraceFile({self.path!r}, {self._n} segments)"
+
+
+def compare_traces(*traces):
+    """summary() of several saved runs (paths or TraceFiles) as a DataFrame."""
+    import pandas as pd
+
+    rows = [(t if isinstance(t, TraceFile) else TraceFile(t)).summary() for t in traces]
+    return pd.DataFrame(rows)
@@ -0,0 +1,227 @@
+# trace_recorder.py
+from array import array
+from itertools import islice
+
+IDLE = -1
+
+
+class TraceRecorder:
+    """Columnar record of every CPU segment of a simulation run.
+
+       Each segment stores start, end, pid index, frequency level
+       index and power in typed `array` columns, so a run costs a
+       few dozen bytes per slice instead of two tuples. Idle
+       segments use IDLE (-1) for pid and level. Level indices are
+       16-bit, so a P-state table may have up to MAX_LEVELS entries."""
+
+    COLUMNS = (("start", "d"), ("end", "d"), ("pid", "l"),
+               ("level", "h"), ("power", "d"))
+    MAX_LEVELS = 32767
+
+    def __init__(self, levels, pids=(), capacity=1024):
+        self.levels = list(levels)
+        if len(self.levels) > self.MAX_LEVELS:
+            raise ValueError(f"A trace holds at most {self.MAX_LEVELS} frequency levels, "
+                             f"got {len(self.levels)}")
+        self.pids = []
+        self._level_ids = {label: i for i, label in enumerate(self.levels)}
+        self._pid_ids = {}
+        for pid in pids:
+            self.pid_index(pid)
+
+        self._n = 0
+        self._busy = 0
+        self._capacity = capacity
+        self._cols = {name: array(code, bytes(array(code).itemsize * capacity))
+                      for name, code in self.COLUMNS}
+        self._gantt = None
+
+    def __len__(self):
+        return self._n
+
+    def pid_index(self, pid):
+        idx = self._pid_ids.get(pid)
+        if idx is None:
+            idx = self._pid_ids[pid] = len(self.pids)
+            self.pids.append(pid)
+        return idx
+
+    # -----------------------------------------------------------------------
+    # RECORDING
+    # -----------------------------------------------------------------------
+    def _grow(self):
+        # Growing always builds new arrays, so NumPy views handed out
+        # earlier keep pointing at valid (if stale) memory.
+        extra = max(self._capacity, 16)
+        for name, code in self.COLUMNS:
+            col = self._cols[name]
+            self._cols[name] = col + array(code, bytes(col.itemsize * extra))
+        self._capacity += extra
+
+    def record(self, start, end, pid, level, power):
+        """Append a busy segment for `pid` at frequency label `level`."""
+        n = self._n
+        if n == self._capacity:
+            self._grow()
+        cols = self._cols
+        cols["start"][n] = start
+        cols["end"][n] = end
+        idx = self._pid_ids.get(pid)
+        cols["pid"][n] = self.pid_index(pid) if idx is None else idx
+        cols["level"][n] = self._level_ids[level]
+        cols["power"][n] = power
+        self._n = n + 1
+        self._busy += 1
+
+    def record_idle(self, start, end, power):
+        n = self._n
+        if n == self._capacity:
+            self._grow()
+        cols = self._cols
+        cols["start"][n] = start
+        cols["end"][n] = end
+        cols["pid"][n] = IDLE
+        cols["level"][n] = IDLE
+        cols["power"][n] = power
+        self._n = n + 1
+
+    # -----------------------------------------------------------------------
+    # VIEWS
+    # -----------------------------------------------------------------------
+    def column(self, name):
+        """Read-only NumPy view of one column, without copying."""
+        import numpy as np
+
+        col = self._cols[name]
+        view = np.frombuffer(col, dtype=col.typecode)[:self._n]
+        view.flags.writeable = False
+        return view
+
+    def columns(self):
+        return {name: self.column(name) for name, _ in self.COLUMNS}
+
+    def to_frame(self):
+        """All segments as a DataFrame backed by the trace columns."""
+        import pandas as pd
+
+        return pd.DataFrame(self.columns(), copy=False)
+
+    @property
+    def gantt(self):
+        # One view per recorder, so its busy-row index survives between
+        # lookups; the view rebuilds it itself when the trace grows.
+        if self._gantt is None:
+            self._gantt = GanttView(self)
+        return self._gantt
+
+    @property
+    def power_trace(self):
+        return PowerTraceView(self)
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_cols"] = {name: col[:self._n] for name, col in self._cols.items()}
+        state["_capacity"] = self._n
+        state["_gantt"] = None
+        return state
+
+
+class GanttView:
+    """Busy segments as (start, pid, freq_label) tuples."""
+
+    def __init__(self, trace):
+        self.trace = trace
+        self._rows = None
+
+    def __len__(self):
+        return self.trace._busy
+
+    def _busy_rows(self):
+        # Trace row of each busy segment, rebuilt when the trace grows
+        import numpy as np
+
+        t = self.trace
+        if self._rows is None or self._rows[0] != len(t):
+            self._rows = (len(t), np.flatnonzero(t.column("level") != IDLE))
+        return self._rows[1]
+
+    def _item(self, row):
+        t = self.trace
+        cols = t._cols
+        return (cols["start"][row], t.pids[cols["pid"][row]], t.levels[cols["level"][row]])
+
+    def __iter__(self):
+        t = self.trace
+        cols = t._cols
+        start, pid, level = cols["start"], cols["pid"], cols["level"]
+        for i in range(t._n):
+            lv = level[i]
+            if lv != IDLE:
+                yield (start[i], t.pids[pid[i]], t.levels[lv])
+
+    def __getitem__(self, index):
+        rows = self._busy_rows()
+        if isinstance(index, slice):
+            return [self._item(row) for row in rows[index].tolist()]
+        if index < 0:
+            index += len(rows)
+        if not 0 <= index < len(rows):
+            raise IndexError("gantt index out of range")
+        return self._item(int(rows[index]))
+
+    def __eq__(self, other):
+        return list(self) == list(other)
+
+    def __repr__(self):
+        return f"GanttView({len(self)} slices)"
+
+    def to_frame(self):
+        """Busy segments as a DataFrame with start, end, pid and freq columns."""
+        import pandas as pd
+
+        t = self.trace
+        busy = t.column("level") != IDLE
+        return pd.DataFrame({
+            "start": t.column("start")[busy],
+            "end": t.column("end")[busy],
+            "pid": pd.Categorical.from_codes(t.column("pid")[busy], t.pids),
+            "freq": pd.Categorical.from_codes(t.column("level")[busy], t.levels),
+        })
+
+
+class PowerTraceView:
+    """All segments as (end_time, power) tuples."""
+
+    def __init__(self, trace):
+        self.trace = trace
+
+    def __len__(self):
+        return self.trace._n
+
+    def __iter__(self):
+        cols = self.trace._cols
+        return islice(zip(cols["end"], cols["power"]), self.trace._n)
+
+    def __getitem__(self, index):
+        n = self.trace._n
+        cols = self.trace._cols
+        if isinstance(index, slice):
+            return list(zip(cols["end"][:n][index], cols["power"][:n][index]))
+        if index < 0:
+            index += n
+        if not 0 <= index < n:
+            raise IndexError("power trace index out of range")
+        return (cols["end"][index], cols["power"][index])
+
+    def __eq__(self, other):
+        return list(self) == list(other)
+
+    def __repr__(self):
+        return f"PowerTraceView({len(self)} samples)"
+
+    def to_frame(self):
+        """(time, power) DataFrame sharing memory with the trace."""
+        import pandas as pd
+
+        return pd.DataFrame({"time": self.trace.column("end"),
+                             "power": self.trace.column("power")}, copy=False)
@@ -40,19 +40,39 @@ import matplotlib.pyplot as plt
 import pandas as pd
 import numpy as np
 
+from downsampling import minmax_downsample
+from energy_accounting import total_energy
+
 class Visualizer:
 
+    @staticmethod
+    def _power_frame(power_trace, max_points=None):
+        # Array-backed traces hand over their columns without a copy;
+        # plain lists of (time, power) tuples still work.
+        if hasattr(power_trace, "to_frame"):
+            df = power_trace.to_frame()
+        else:
+            df = pd.DataFrame(power_trace, columns=["time", "power"])
+        if max_points is None:
+            return df
+        keep = minmax_downsample(df["time"].to_numpy(), df["power"].to_numpy(), max_points)
+        return df.iloc[keep]
+
     # -----------------------------------------------------------------------
     # POWER TRACE (RR vs EARR)
     # -----------------------------------------------------------------------
     @staticmethod
-    def plot_power_trace(power_trace_rr, power_trace_earr):
-        df_rr = pd.DataFrame(power_trace_rr, columns=["time", "power"])
-        df_earr = pd.DataFrame(power_trace_earr, columns=["time", "power"])
+    def plot_power_trace(power_trace_rr, power_trace_earr, max_points=4000):
+        # Each sample holds its power since the previous one, so the
+        # traces are drawn as steps, downsampled to `max_points` each.
+        df_rr = Visualizer._power_frame(power_trace_rr, max_points)
+        df_earr = Visualizer._power_frame(power_trace_earr, max_points)
 
         fig, ax = plt.subplots(figsize=(8, 4))
-        ax.plot(df_rr["time"], df_rr["power"], label="Traditional RR", linestyle="--")
-        ax.plot(df_earr["time"], df_earr["power"], label="Energy-Aware RR")
+        ax.plot(df_rr["time"], df_rr["power"], label="Traditional RR", linestyle="--",
+                drawstyle="steps-pre")
+        ax.plot(df_earr["time"], df_earr["power"], label="Energy-Aware RR",
+                drawstyle="steps-pre")
         ax.set_xlabel("Time (ms)")
         ax.set_ylabel("Power (W)")
         ax.set_title("Power Consumption Over Time")
@@ -81,8 +101,93 @@ class Visualizer:
     # -----------------------------------------------------------------------
     # GANTT CHART (with DVFS frequency colors)
     # -----------------------------------------------------------------------
+    @staticmethod
+    def _gantt_segments(gantt):
+        # Array-backed gantt views carry true slice ends; for plain
+        # (start, pid, freq) lists a slice lasts until the next one
+        # starts, and the last one lasts 1.
+        trace = getattr(gantt, "trace", None)
+        if trace is not None:
+            busy = trace.column("level") != -1
+            return (trace.column("start")[busy], trace.column("end")[busy],
+                    trace.column("pid")[busy], list(trace.pids),
+                    trace.column("level")[busy], list(trace.levels))
+
+        gantt = list(gantt)
+        start = np.array([g[0] for g in gantt], dtype=float)
+        end = np.append(start[1:], start[-1] + 1) if len(start) else start
+        pid_labels, pid = np.unique([str(g[1]) for g in gantt], return_inverse=True)
+        level_labels, level = np.unique([str(g[2]) for g in gantt], return_inverse=True)
+        return start, np.maximum(end, start), pid, list(pid_labels), level, list(level_labels)
+
+    @staticmethod
+    def _merge_segments(start, end, row, level, gap=0.0):
+        """Join consecutive slices of one row at one level that are at
+           most `gap` apart. Input is sorted by (row, start)."""
+        if len(start) < 2:
+            return start, end, row, level
+        new = np.ones(len(start), dtype=bool)
+        new[1:] = ((row[1:] != row[:-1]) | (level[1:] != level[:-1])
+                   | (start[1:] > end[:-1] + gap))
+        firsts = np.flatnonzero(new)
+        return (start[firsts], np.maximum.reduceat(end, firsts),
+                row[firsts], level[firsts])
+
+    @staticmethod
+    def gantt_segments(gantt, pixels=1000, max_rows=400, max_segments=20_000):
+        """Rectangles to draw for a gantt: (start, end, row, level,
+           row_labels, level_labels).
+
+           Rows are processes in order of first appearance, folded
+           together when there are more than `max_rows`. Adjacent slices
+           at the same frequency are merged; beyond `max_segments`, each
+           row is bucketed to `pixels` columns and every bucket is drawn
+           once, in its dominant frequency."""
+        start, end, pid, pid_labels, level, level_labels = Visualizer._gantt_segments(gantt)
+        if not len(start):
+            return start, end, pid, level, [], level_labels
+
+        # Rows in order of first appearance, like a categorical axis
+        used, first = np.unique(pid, return_index=True)
+        used = used[np.argsort(first)]
+        rank = np.empty(int(used.max()) + 1, dtype=np.intp)
+        rank[used] = np.arange(len(used))
+        row = rank[pid]
+        row_labels = [pid_labels[i] for i in used]
+        if len(row_labels) > max_rows:
+            fold = -(-len(row_labels) // max_rows)
+            row = row // fold
+            row_labels = row_labels[::fold]
+
+        order = np.lexsort((start, row))
+        start, end, row, level = start[order], end[order], row[order], level[order]
+        start, end, row, level = Visualizer._merge_segments(start, end, row, level)
+
+        if len(start) > max_segments:
+            t0 = start.min()
+            dt = max(end.max() - t0, 1e-12) / pixels
+            start, end, row, level = Visualizer._merge_segments(start, end, row, level, gap=dt)
+
+        if len(start) > max_segments:
+            # Level of detail: one rectangle per (row, pixel column)
+            n_levels = len(level_labels)
+            key = row * (pixels + 1) + ((start - t0) / dt).astype(np.int64)
+            new = np.ones(len(key), dtype=bool)
+            new[1:] = key[1:] != key[:-1]
+            firsts = np.flatnonzero(new)
+            bucket = np.cumsum(new) - 1
+            weight = np.bincount(bucket * n_levels + level, weights=end - start,
+                                 minlength=len(firsts) * n_levels)
+            level = weight.reshape(len(firsts), n_levels).argmax(axis=1)
+            start, end, row = start[firsts], np.maximum.reduceat(end, firsts), row[firsts]
+            start, end, row, level = Visualizer._merge_segments(start, end, row, level, gap=dt)
+
+        return start, end, row, level, row_labels, level_labels
+
     @staticmethod
     def plot_gantt_chart(gantt, title):
+        from matplotlib.collections import PolyCollection
+
         fig, ax = plt.subplots(figsize=(9, 4))
 
         # Updated color mapping (supports IDLE, LOW, MED, HIGH)
@@ -93,8 +198,23 @@ class Visualizer:
             "HIGH": "red"
         }
 
-        for start, pid, freq in gantt:
-            ax.barh(y=pid, width=1, left=start, color=colors.get(freq, "blue"))
+        # All slices go into one PolyCollection, drawn with true
+        # durations and downsampled to the axes' pixel width.
+        start, end, row, level, row_labels, level_labels = Visualizer.gantt_segments(
+            gantt, pixels=int(fig.get_figwidth() * fig.dpi), max_rows=int(fig.get_figheight() * fig.dpi))
+        if len(start):
+            lo, hi = row - 0.4, row + 0.4
+            verts = np.stack([np.column_stack([start, lo]), np.column_stack([start, hi]),
+                              np.column_stack([end, hi]), np.column_stack([end, lo])], axis=1)
+            palette = np.array([colors.get(label, "blue") for label in level_labels], dtype=object)
+            ax.add_collection(PolyCollection(verts, facecolors=palette[level], linewidths=0))
+            ax.set_xlim(start.min(), end.max())
+            ax.set_ylim(-0.5, len(row_labels) - 0.5)
+
+            # Label every row while the labels still fit
+            step = max(1, len(row_labels) // 20)
+            ax.set_yticks(np.arange(0, len(row_labels), step))
+            ax.set_yticklabels(row_labels[::step])
 
         ax.set_title(f"Gantt Chart - {title}")
         ax.set_xlabel("Time (ms)")
@@ -108,7 +228,7 @@ class Visualizer:
     # 2x2 FULL DASHBOARD (Power, Energy, Performance, Summary Table)
     # -----------------------------------------------------------------------
     @staticmethod
-    def generate_dashboard(rr, earr, completed_rr, completed_earr):
+    def generate_dashboard(rr, earr, completed_rr, completed_earr, max_points=4000):
 
         def avg_metrics(completed):
             avg_wait = sum(p.waiting for p in completed) / len(completed)
@@ -117,12 +237,14 @@ class Visualizer:
 
         avg_wait_rr, avg_turn_rr = avg_metrics(completed_rr)
         avg_wait_earr, avg_turn_earr = avg_metrics(completed_earr)
+        # Idle and switch energy included
+        energy_rr, energy_earr = total_energy(rr), total_energy(earr)
 
         # Construct comparison DataFrame
         comparison_df = pd.DataFrame({
             "Metric": ["Avg Waiting Time", "Avg Turnaround Time", "Total Energy (J)"],
-            "Traditional RR": [round(avg_wait_rr, 2), round(avg_turn_rr, 2), round(rr.energy, 2)],
-            "Energy-Aware RR": [round(avg_wait_earr, 2), round(avg_turn_earr, 2), round(earr.energy, 2)]
+            "Traditional RR": [round(avg_wait_rr, 2), round(avg_turn_rr, 2), round(energy_rr, 2)],
+            "Energy-Aware RR": [round(avg_wait_earr, 2), round(avg_turn_earr, 2), round(energy_earr, 2)]
         })
 
         # Create dashboard (2x2)
@@ -131,11 +253,12 @@ class Visualizer:
                      fontsize=16, fontweight='bold')
 
         # 1️⃣ POWER vs TIME (Top-left)
-        df_rr = pd.DataFrame(rr.power_trace, columns=["time", "power"])
-        df_earr = pd.DataFrame(earr.power_trace, columns=["time", "power"])
+        df_rr = Visualizer._power_frame(rr.power_trace, max_points)
+        df_earr = Visualizer._power_frame(earr.power_trace, max_points)
 
-        axs[0, 0].plot(df_rr["time"], df_rr["power"], linestyle="--", label="Traditional RR")
-        axs[0, 0].plot(df_earr["time"], df_earr["power"], label="EARR")
+        axs[0, 0].plot(df_rr["time"], df_rr["power"], linestyle="--", label="Traditional RR",
+                       drawstyle="steps-pre")
+        axs[0, 0].plot(df_earr["time"], df_earr["power"], label="EARR", drawstyle="steps-pre")
         axs[0, 0].set_title("Power Consumption Over Time")
         axs[0, 0].set_xlabel("Time (ms)")
         axs[0, 0].set_ylabel("Power (W)")
@@ -143,7 +266,7 @@ class Visualizer:
         axs[0, 0].grid(alpha=0.3)
 
         # 2️⃣ ENERGY BAR (Top-right)
-        axs[0, 1].bar(["Traditional RR", "EARR"], [rr.energy, earr.energy],
+        axs[0, 1].bar(["Traditional RR", "EARR"], [energy_rr, energy_earr],
                       color=["red", "green"])
         axs[0, 1].set_title("Total Energy Consumption")
         axs[0, 1].set_ylabel("Energy (J)")
@@ -0,0 +1,296 @@
+# workload.py
+import csv
+import heapq
+import itertools
+import json
+import math
+import numbers
+import os
+import pickle
+import tempfile
+
+FIELDS = ("pid", "arrival", "burst", "deadline")
+
+
+# ---------------------------------------------------------------------------
+# READING
+# ---------------------------------------------------------------------------
+def _rows(path, fmt):
+    with open(path, newline="") as f:
+        if fmt == "csv":
+            # Line 1 is the header
+            for lineno, row in enumerate(csv.DictReader(f), start=2):
+                yield lineno, row
+        else:
+            for lineno, line in enumerate(f, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    row = json.loads(line)
+                except json.JSONDecodeError as e:
+                    raise ValueError(f"{path}:{lineno}: invalid JSON ({e.msg})") from None
+                if not isinstance(row, dict):
+                    raise ValueError(f"{path}:{lineno}: expected a JSON object, "
+                                     f"got {type(row).__name__}")
+                yield lineno, row
+
+
+def _validate(row, columns, where):
+    try:
+        pid = row[columns["pid"]]
+        arrival = float(row[columns["arrival"]])
+        burst = float(row[columns["burst"]])
+    except KeyError as e:
+        raise ValueError(f"{where}: missing column {e.args[0]!r}") from None
+    except (TypeError, ValueError):
+        raise ValueError(f"{where}: arrival and burst must be numbers") from None
+
+    if not (math.isfinite(arrival) and arrival >= 0):
+        raise ValueError(f"{where}: arrival must be finite and >= 0, got {arrival}")
+    if not (math.isfinite(burst) and burst > 0):
+        raise ValueError(f"{where}: burst must be finite and > 0, got {burst}")
+
+    # Keep integral values as ints so results match hand-written workloads
+    if arrival.is_integer():
+        arrival = int(arrival)
+    if burst.is_integer():
+        burst = int(burst)
+    record = {"pid": pid, "arrival": arrival, "burst": burst}
+
+    # Deadlines are optional
+    deadline = row.get(columns["deadline"])
+    if deadline not in (None, ""):
+        try:
+            deadline = float(deadline)
+        except (TypeError, ValueError):
+            raise ValueError(f"{where}: deadline must be a number") from None
+        if not math.isfinite(deadline):
+            raise ValueError(f"{where}: deadline must be finite, got {deadline}")
+        record["deadline"] = deadline
+    return record
+
+
+def read_trace(path, fmt=None, columns=None):
+    """Lazily yield validated {pid, arrival, burst[, deadline]} dicts
+       from a CSV or JSONL job trace, in file order.
+
+       `fmt` defaults to the file extension; `columns` maps our field
+       names to the trace's own column names."""
+    if fmt is None:
+        fmt = "csv" if str(path).lower().endswith(".csv") else "jsonl"
+    if fmt not in ("csv", "jsonl"):
+        raise ValueError(f"Unsupported trace format {fmt!r}")
+    columns = {**{f: f for f in FIELDS}, **(columns or {})}
+
+    for lineno, row in _rows(path, fmt):
+        yield _validate(row, columns, f"{path}:{lineno}")
+
+
+# ---------------------------------------------------------------------------
+# SORTING
+# ---------------------------------------------------------------------------
+def _spill(run, tmpdir):
+    fd, name = tempfile.mkstemp(suffix=".run", dir=tmpdir)
+    with os.fdopen(fd, "wb") as f:
+        for item in run:
+            pickle.dump(item, f, pickle.HIGHEST_PROTOCOL)
+    return name
+
+
+def _replay(name):
+    with open(name, "rb") as f:
+        while True:
+            try:
+                yield pickle.load(f)
+            except EOFError:
+                return
+
+
+def sort_by_arrival(records, run_size=1_000_000, tmpdir=None):
+    """Yield `records` in arrival order, stable for equal arrivals.
+
+       Up to `run_size` records are sorted in memory; longer inputs are
+       split into sorted runs spilled to temporary files and merged back
+       lazily (external merge sort)."""
+    counter = itertools.count()
+    records = ((r["arrival"], next(counter), r) for r in records)
+
+    first = sorted(itertools.islice(records, run_size))
+    if len(first) < run_size:
+        for _, _, r in first:
+            yield r
+        return
+
+    runs = [_spill(first, tmpdir)]
+    del first
+    readers = []
+    try:
+        while True:
+            run = sorted(itertools.islice(records, run_size))
+            if not run:
+                break
+            runs.append(_spill(run, tmpdir))
+        readers = [_replay(name) for name in runs]
+        for _, _, r in heapq.merge(*readers):
+            yield r
+    finally:
+        for reader in readers:
+            reader.close()
+        for name in runs:
+            os.remove(name)
+
+
+def stream_workload(path, fmt=None, columns=None, presorted=False,
+                    run_size=1_000_000, tmpdir=None):
+    """Lazy, arrival-ordered process stream for RoundRobinScheduler.
+
+       With `presorted=True` the trace is passed through as-is; the
+       scheduler still rejects out-of-order arrivals."""
+    records = read_trace(path, fmt=fmt, columns=columns)
+    if presorted:
+        return records
+    return sort_by_arrival(records, run_size=run_size, tmpdir=tmpdir)
+
+
+# ---------------------------------------------------------------------------
+# SYNTHETIC GENERATION
+# ---------------------------------------------------------------------------
+ARRIVALS = ("periodic", "poisson", "mmpp", "diurnal")
+BURSTS = ("uniform", "exponential", "lognormal", "pareto")
+
+
+def _arrival_times(rng, n, pattern, rate, burstiness, dwell, period, amplitude):
+    import numpy as np
+
+    if pattern == "periodic":
+        return np.arange(n) / rate
+    if pattern == "poisson":
+        return np.cumsum(rng.exponential(1 / rate, n))
+
+    if pattern == "mmpp":
+        # Two-state Markov-modulated Poisson: alternating quiet and busy
+        # periods with exponential lengths. Given its length, a period's
+        # arrival count is Poisson and its arrivals are uniform in it,
+        # so whole periods are drawn at once.
+        if not burstiness > 0:
+            raise ValueError(f"mmpp arrivals need burstiness > 0, got {burstiness}")
+        if not (len(dwell) == 2 and dwell[0] > 0 and dwell[1] > 0):
+            raise ValueError(f"mmpp arrivals need two dwell times > 0, got {dwell}")
+        d_quiet, d_busy = dwell[0] / rate, dwell[1] / rate
+        quiet_rate = rate * (d_quiet + d_busy) / (d_quiet + burstiness * d_busy)
+        per_cycle = quiet_rate * (d_quiet + burstiness * d_busy)
+        times = np.empty(0)
+        offset = 0.0
+        while len(times) < n:
+            cycles = int((n - len(times)) / per_cycle * 1.2) + 1
+            length = np.empty(2 * cycles)
+            length[0::2] = rng.exponential(d_quiet, cycles)
+            length[1::2] = rng.exponential(d_busy, cycles)
+            rates = np.tile([quiet_rate, quiet_rate * burstiness], cycles)
+            counts = rng.poisson(rates * length)
+            starts = offset + np.concatenate([[0.0], np.cumsum(length)[:-1]])
+            batch = np.repeat(starts, counts) + rng.random(counts.sum()) * np.repeat(length, counts)
+            times = np.concatenate([times, np.sort(batch)])
+            offset += length.sum()
+        return times[:n]
+
+    if pattern == "diurnal":
+        if not 0 <= amplitude < 1:
+            raise ValueError(f"diurnal arrivals need 0 <= amplitude < 1, got {amplitude}")
+        if not period > 0:
+            raise ValueError(f"diurnal arrivals need period > 0, got {period}")
+        # Rate follows rate * (1 + amplitude * sin(2 pi t / period)).
+        # Unit-rate Poisson points are mapped through the inverse of the
+        # integrated rate (time rescaling), interpolated on a fine grid.
+        # The integrated rate is at least rate * t, which bounds the grid
+        unit = np.cumsum(rng.exponential(1.0, n))
+        horizon = (unit[-1] if n else 0.0) / rate + period
+        grid = np.linspace(0, horizon, int(horizon / period * 64) + 2)
+        w = 2 * np.pi / period
+        integrated = rate * (grid + amplitude / w * (1 - np.cos(w * grid)))
+        return np.interp(unit, integrated, grid)
+
+    raise ValueError(f"Unknown arrival pattern {pattern!r}; expected one of {ARRIVALS}")
+
+
+def _burst_sizes(rng, n, dist, mean, low, high, sigma, alpha):
+    # Continuous distributions are scaled to have mean `mean`
+    import numpy as np
+
+    if dist == "uniform":
+        return rng.integers(low, high + 1, n).astype(float)
+    if dist == "exponential":
+        return rng.exponential(mean, n)
+    if dist == "lognormal":
+        return rng.lognormal(np.log(mean) - sigma ** 2 / 2, sigma, n)
+    if dist == "pareto":
+        if not alpha > 1:
+            raise ValueError(f"pareto bursts need alpha > 1 for a finite mean, got {alpha}")
+        scale = mean * (alpha - 1) / alpha
+        return scale * (1 + rng.pareto(alpha, n))
+    raise ValueError(f"Unknown burst distribution {dist!r}; expected one of {BURSTS}")
+
+
+def generate_arrays(n, arrival="poisson", burst="lognormal", load=0.7, rate=None, seed=None,
+                    burst_mean=5.0, burst_range=(2, 8), sigma=1.0, alpha=1.5,
+                    burstiness=10.0, dwell=(100.0, 10.0), period=1000.0, amplitude=0.8,
+                    max_burst=None, decimals=2, model=None):
+    """(arrival, burst) NumPy arrays for `n` synthetic jobs, sorted by
+       arrival and reproducible from `seed`.
+
+       arrival -- periodic   one job every 1/rate
+                  poisson    exponential inter-arrival times
+                  mmpp       quiet / busy periods (mean lengths `dwell`,
+                             in mean inter-arrival times), the busy rate
+                             `burstiness` times the quiet one
+                  diurnal    Poisson with a sinusoidal rate of the given
+                             `period` and relative `amplitude` (0 to < 1)
+       burst   -- uniform integers in `burst_range` (the old Simulator
+                  workload), or exponential, lognormal (`sigma`) or
+                  pareto (`alpha` > 1) with mean `burst_mean`
+
+       `rate` is jobs per time unit; by default it gives the CPU `load`
+       at its top frequency for the mean burst. Every pattern has the
+       same long-run rate. Bursts are capped at `max_burst` if given
+       (pareto tails are very long), and values are rounded to
+       `decimals`, keeping bursts positive."""
+    import numpy as np
+    from energy_module import DEFAULT_MODEL
+
+    if isinstance(n, bool) or not isinstance(n, numbers.Integral) or n < 0:
+        raise ValueError(f"n must be an integer >= 0, got {n!r}")
+    rng = np.random.default_rng(seed)
+    model = DEFAULT_MODEL if model is None else model
+    low, high = burst_range
+    mean = (low + high) / 2 if burst == "uniform" else burst_mean
+    if rate is None:
+        rate = load * max(model.freq_levels.values()) / mean
+    if not rate > 0:
+        raise ValueError(f"arrival rate must be > 0, got {rate} (check rate / load / burst_mean)")
+
+    bursts = _burst_sizes(rng, n, burst, mean, low, high, sigma, alpha)
+    if max_burst is not None:
+        bursts = np.minimum(bursts, max_burst)
+    arrivals = _arrival_times(rng, n, arrival, rate, burstiness, dwell, period, amplitude)
+    if decimals is not None:
+        arrivals = np.round(arrivals, decimals)
+        bursts = np.maximum(np.round(bursts, decimals), 10.0 ** -decimals)
+    return arrivals, bursts
+
+
+def generate_table(n, arrival="poisson", burst="lognormal", pid_prefix=None, **options):
+    """A ProcessTable of `n` synthetic jobs (see generate_arrays for the
+       options). Pids are row numbers, or "<prefix><i>" strings."""
+    from process_table import ProcessTable
+
+    arrivals, bursts = generate_arrays(n, arrival, burst, **options)
+    pids = range(n) if pid_prefix is None else [f"{pid_prefix}{i + 1}" for i in range(n)]
+    return ProcessTable.from_arrays(pids, arrivals, bursts)
+
+
+def generate_workload(n, arrival="poisson", burst="lognormal", pid_prefix="P", **options):
+    """The same jobs as {pid, arrival, burst} dicts, the scheduler's list
+       input format (P1, P2, ...)."""
+    arrivals, bursts = generate_arrays(n, arrival, burst, **options)
+    return [{"pid": f"{pid_prefix}{i + 1}", "arrival": a, "burst": b}
+            for i, (a, b) in enumerate(zip(arrivals.tolist(), bursts.tolist()))]